@@ -1,41 +1,131 @@
 import streamlit as st
 import pandas as pd
-from io import BytesIO
 import asyncio
 import nest_asyncio
-from datetime import datetime
+from datetime import datetime, timedelta
 import re
 import os
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 import json
 import base64
+import time
+import uuid
 
 # Import modules
-from scraper import NewsScraper
-from sentiment_analyzer import SentimentAnalyzer
-from journalist_detector import JournalistDetector
-from summarizer import ArticleSummarizer
-from category_analyzer import CategoryAnalyzer
+from news_processor import NewsProcessor
+from category_classifier import LocalCategoryClassifier, SKLEARN_AVAILABLE
+from model_router import ROUTING_POLICIES
+from checkpoint import CheckpointStore, make_job_id
+from job_manager import Job, JobManager
+from input_reader import TableReader
+from metrics import METRICS, start_metrics_server
+from export_writers import DEFAULT_EXPORT_DIR, EXPORT_FORMATS, available_formats, cleanup_exports, export_dataframe
+from cassette import DEFAULT_CASSETTE_DIR
+from article_store import ArticleStore
+from usage_tracker import BUDGET_SKIPPED
+
+
+@st.cache_resource
+def get_job_manager() -> JobManager:
+    """One job queue per server process, shared by all sessions and surviving reruns"""
+    return JobManager()
+
+
+@st.cache_resource
+def get_local_classifier(category_set_key: str, _categories: List[str]) -> LocalCategoryClassifier:
+    """
+    One classifier per category set, shared by every session and job, so uploaded training and
+    examples learned by a running job go into the same model instead of overwriting each other's file
+    """
+    return LocalCategoryClassifier(_categories)
+
+
+def session_owner() -> str:
+    """
+    Owner tag for the jobs submitted from this browser: the signed-in user if Streamlit auth is set up,
+    otherwise a token kept in the page URL (?sesi=...) so a refresh still finds the same jobs.
+    """
+    try:
+        if st.user.is_logged_in and st.user.get('email'):
+            return st.user.get('email')
+    except Exception:
+        pass
+    token = st.query_params.get('sesi')
+    if not token:
+        token = uuid.uuid4().hex[:12]
+        st.query_params['sesi'] = token
+    return token
+
+
+@st.cache_data(show_spinner=False, max_entries=4)
+def inspect_upload(data: bytes, name: str) -> Tuple[List[str], int]:
+    """Header and row count of an upload, read without loading the sheet into a DataFrame"""
+    reader = TableReader(data, name)
+    return reader.columns, len(reader)
+
+
+def _get_setting(name: str, default=None):
+    """Read an optional setting from Streamlit Secrets, falling back to config.py/.env"""
+    try:
+        value = st.secrets.get(name)
+        if value is not None:
+            return value
+    except Exception:
+        pass
+    import config
+    return getattr(config, name, default)
+
+
+@st.cache_resource
+def get_article_store() -> ArticleStore:
+    """Archive of every scraped article, searchable in the Arsip Artikel tab"""
+    return ArticleStore()
+
+
+@st.cache_resource
+def get_processor() -> NewsProcessor:
+    """
+    One scraper/analyzer set per server process. Building it parses selectors.csv and sets up the HTTP
+    session and AI clients, which used to happen again on every rerun of every session.
+    """
+    return NewsProcessor(
+        _get_setting("GEMINI_API_KEY"), _get_setting("GEMINI_BASE_URL"),
+        api_keys=_get_setting("GEMINI_API_KEYS"),
+        base_urls=_get_setting("GEMINI_BASE_URLS"),
+        endpoints=_get_setting("GEMINI_ENDPOINTS"),
+        model_tiers={
+            'lite': _get_setting("GEMINI_MODEL_LITE"),
+            'standard': _get_setting("GEMINI_MODEL_STANDARD")
+        },
+        article_store=get_article_store()
+    )
+
+
+@st.cache_resource
+def get_metrics_server():
+    """Serve Prometheus metrics on localhost when METRICS_PORT is set (once per server process)"""
+    port = _get_setting("METRICS_PORT")
+    if not port:
+        return None
+    try:
+        return start_metrics_server(int(port))
+    except OSError as e:
+        print(f"⚠️ Metrics server not started on port {port}: {e}")
+        return None
+
+
+@st.cache_resource
+def get_checkpoint_store() -> CheckpointStore:
+    """Journal of finished Excel rows, so an interrupted job can be resumed"""
+    return CheckpointStore()
+
 
 class NewsAnalyzerApp:
     def __init__(self):
-        self.scraper = NewsScraper()
-        
-        try:
-            # Ideal for Streamlit Community Cloud deployment
-            gemini_api_key = st.secrets.get("GEMINI_API_KEY")
-            gemini_base_url = st.secrets.get("GEMINI_BASE_URL")
-        except Exception:
-            # Fallback for local development using .env file
-            from config import GEMINI_API_KEY, GEMINI_BASE_URL
-            gemini_api_key = GEMINI_API_KEY
-            gemini_base_url = GEMINI_BASE_URL
-
-        # Initialize AI modules with credentials
-        self.sentiment_analyzer = SentimentAnalyzer(api_key=gemini_api_key, base_url=gemini_base_url)
-        self.journalist_detector = JournalistDetector()
-        self.summarizer = ArticleSummarizer(api_key=gemini_api_key, base_url=gemini_base_url)
-        self.category_analyzer = CategoryAnalyzer(api_key=gemini_api_key, base_url=gemini_base_url)
+        # Shared across reruns and sessions; jobs run one at a time on the job thread, so per-job settings don't collide
+        self.processor = get_processor()
+        self.checkpoint = get_checkpoint_store()
+        get_metrics_server()
         
         # Apply nest_asyncio to allow running asyncio in Streamlit
         nest_asyncio.apply()
@@ -123,9 +213,17 @@ class NewsAnalyzerApp:
                 enable_categorization = st.checkbox("📊 Kategorisasi Berita", value=False, help="Mengklasifikasikan berita ke dalam kategori custom")
 
             sentiment_context = None
+            sentiment_prefilter = {}
             summarize_config = {}
+            stream_summaries = False
             categorization_config = {}
             scraping_timeout = 30
+            reuse_archived_articles = True
+            compression_config = {}
+            routing_policy = ROUTING_POLICIES[0]
+            hedging_config = {}
+            budget_config = {}
+            pipeline_config = {}
 
             analysis_source_option = st.selectbox(
                 "**Sumber Analisis Utama**",
@@ -135,7 +233,11 @@ class NewsAnalyzerApp:
 
             if enable_sentiment:
                 with st.expander("😊 **Konfigurasi Sentimen**"):
-                    sentiment_context = st.text_area("Konteks Sentimen", placeholder="Contoh: Toyota Avanza, harga mobil", help="Masukkan objek/aspek untuk analisis sentimen")
+                    sentiment_context = st.text_area("Konteks Sentimen (satu per baris)", placeholder="Contoh: Toyota Avanza, harga mobil\nHonda Brio", help="Masukkan objek/aspek untuk analisis sentimen. Setiap baris dianalisis sebagai konteks terpisah dalam satu panggilan AI per artikel.")
+                    sentiment_prefilter = {
+                        'enabled': st.checkbox("Pre-filter Relevansi Lokal", value=True, help="Artikel yang sama sekali tidak menyebut konteks langsung diberi sentimen 'tidak terkait' tanpa memanggil AI. Hanya untuk teks lengkap; baris yang hanya punya judul tetap ke AI."),
+                        'aliases': self.processor.relevance_filter.parse_aliases(st.text_area("Alias Konteks (Opsional)", placeholder="Toyota Avanza: Avanza, TMMIN\nBank Rakyat Indonesia: BRI", help="Format: `Konteks: alias1, alias2`. Alias ikut dicocokkan oleh pre-filter."))
+                    }
 
             if enable_summarize:
                 with st.expander("📝 **Konfigurasi Summarize**"):
@@ -147,6 +249,7 @@ class NewsAnalyzerApp:
                     }
                     if summarize_config['summary_type'] == 'Custom':
                         summarize_config['custom_instruction'] = st.text_area("Instruksi Custom", placeholder="Contoh: Buat ringkasan format bullet points", help="Instruksi khusus")
+                    stream_summaries = st.checkbox("Streaming Ringkasan (URL Manual)", value=True, help="Tampilkan ringkasan kata demi kata saat AI menulisnya, tanpa menunggu semua URL selesai")
 
             if enable_categorization:
                 with st.expander("📊 **Konfigurasi Kategori**"):
@@ -161,219 +264,262 @@ class NewsAnalyzerApp:
                     # For backward compatibility and simple use cases, we can extract just the names
                     categorization_config['categories'] = [cat.split(':', 1)[0].strip() for cat in categories_with_desc]
 
+                    use_local_classifier = st.checkbox("Classifier Lokal (Hemat AI)", value=False, disabled=not SKLEARN_AVAILABLE, help="Jawab kategori dengan model lokal yang dilatih dari hasil export sebelumnya. AI hanya dipanggil untuk baris dengan confidence rendah." if SKLEARN_AVAILABLE else "Install scikit-learn untuk mengaktifkan fitur ini")
+                    if use_local_classifier and categorization_config['categories']:
+                        categories = categorization_config['categories']
+                        classifier = get_local_classifier(LocalCategoryClassifier.category_set_key(categories), categories)
+                        training_files = st.file_uploader("Latih dari Export Sebelumnya (.xlsx, .csv)", type=['xlsx', 'csv'], accept_multiple_files=True, help="File hasil export dengan kolom 'Kategori' untuk daftar kategori yang sama")
+                        trained_files = st.session_state.setdefault('trained_category_files', set())
+                        for training_file in training_files or []:
+                            file_key = (classifier.model_path, training_file.name, training_file.size)
+                            if file_key not in trained_files:
+                                classifier.train_from_export(training_file)
+                                trained_files.add(file_key)
+                        categorization_config['local_classifier'] = classifier
+                        categorization_config['local_confidence_threshold'] = st.slider("Confidence Minimum Classifier Lokal", 0.5, 0.99, 0.8, 0.01, help="Di bawah nilai ini, kategori tetap ditanyakan ke AI")
+                        if classifier.is_ready():
+                            st.caption(f"✅ Model lokal siap ({classifier.n_samples} contoh latih)")
+                        else:
+                            st.caption(f"⏳ Model lokal butuh minimal {classifier.min_samples} contoh latih (saat ini {classifier.n_samples}). Hasil AI dari job ini akan ikut dipakai melatih model.")
+
             if enable_scraping:
                 with st.expander("🔧 **Opsi Scraping**"):
                     scraping_timeout = st.slider("Timeout (detik)", 10, 60, 30, help="Waktu tunggu maksimal untuk setiap URL")
+                    reuse_archived_articles = st.checkbox("Pakai Arsip Artikel", value=True, help="URL yang pernah di-scrape diambil dari arsip lokal tanpa akses internet. Hapus centang untuk scraping ulang semua URL; hasilnya memperbarui arsip.")
+
+            with st.expander("🚦 **Konkurensi (Upload Excel)**"):
+                pipeline_config = {
+                    'fetch_workers': st.slider("Worker Scraping", 1, 32, 8, help="Jumlah URL yang diambil bersamaan"),
+                    'extract_workers': st.slider("Worker Ekstraksi", 1, 8, 2, help="Jumlah artikel yang diolah bersamaan setelah diambil: pemilihan teks analisis dan deteksi jurnalis (yang bisa mengunduh ulang halaman). Parsing HTML sudah terjadi di tahap scraping."),
+                    'analyze_workers': st.slider("Worker AI", 1, 16, 4, help="Jumlah baris yang dianalisis AI bersamaan"),
+                    'extraction_processes': st.slider("Proses Ekstraksi HTML", 0, os.cpu_count() or 1, 0, help="Parsing HTML di proses terpisah agar memakai banyak core CPU. 0 = di proses aplikasi (cocok untuk server kecil)."),
+                    'queue_size': 32
+                }
+
+            with st.expander("🔍 **Diagnostik**"):
+                trace_config = {
+                    'enabled': st.checkbox("Rekam Trace per Baris", value=False, help="Tambahkan kolom Durasi_Detik dan Trace (waktu tiap tahap: scraping, request, ekstraksi, panggilan AI) serta file trace yang bisa dibuka sebagai waterfall di ui.perfetto.dev")
+                }
+                cassette_mode = st.selectbox("Rekam / Putar Ulang Jaringan", ["Nonaktif", "Rekam", "Putar Ulang"], help="Rekam: simpan semua respons website dan AI dari job ke file cassette. Putar Ulang: jalankan job lagi dari cassette tanpa akses internet dan tanpa kuota AI, untuk mereproduksi hasil atau membandingkan kecepatan antar versi.")
+                cassette_config = {'mode': None}
+                if cassette_mode == "Rekam":
+                    cassette_config = {'mode': 'record', 'path': None}
+                    st.caption(f"Cassette disimpan di folder {DEFAULT_CASSETTE_DIR}/ dan bisa diunduh setelah job selesai. Job direkam dari awal, tanpa melanjutkan checkpoint.")
+                elif cassette_mode == "Putar Ulang":
+                    cassettes = sorted((name for name in os.listdir(DEFAULT_CASSETTE_DIR) if name.endswith('.jsonl.gz')), reverse=True) if os.path.isdir(DEFAULT_CASSETTE_DIR) else []
+                    if cassettes:
+                        cassette_file = st.selectbox("File Cassette", cassettes, help="Gunakan file input yang sama dengan saat direkam")
+                        cassette_config = {
+                            'mode': 'replay', 'path': os.path.join(DEFAULT_CASSETTE_DIR, cassette_file),
+                            'replay_latency': st.checkbox("Tiru Latensi Asli", value=False, help="Tunggu selama respons aslinya dulu, termasuk jeda antar request. Nonaktif: secepat mungkin, untuk mengukur pemrosesan saja.")
+                        }
+                    else:
+                        st.caption(f"Belum ada cassette di folder {DEFAULT_CASSETTE_DIR}/")
+
+            if enable_sentiment or enable_summarize or enable_categorization:
+                with st.expander("⚡ **Optimasi Token AI**"):
+                    compression_config = {
+                        'enabled': st.checkbox("Kompresi Konten Sebelum AI", value=True, help="Kirim paragraf pembuka dan kalimat yang menyebut konteks saja, bukan potongan awal artikel"),
+                        'token_budget': st.slider("Budget Token per Panggilan", 200, 1000, 500, 50, help="Batas token input untuk sentimen dan kategori. Ringkasan memakai 2x budget ini.")
+                    }
+                    hedging_config = {
+                        'enabled': st.checkbox("Hedged Request", value=False, help="Jika panggilan AI lebih lambat dari latensi p95 yang teramati, kirim duplikat dan pakai jawaban yang tercepat"),
+                        'max_hedge_ratio': st.slider("Maksimal Rasio Hedge", 0.01, 0.3, 0.1, 0.01, help="Batas proporsi panggilan yang boleh diduplikasi, untuk menjaga biaya")
+                    }
+                    routing_policy = st.selectbox("Routing Model", ROUTING_POLICIES, help="Otomatis: model lite untuk judul, kategori, dan teks pendek; model standard untuk teks panjang dan ringkasan detail")
+                    budget_config = {
+                        'max_cost_usd': st.number_input("Budget Biaya per Job (USD)", min_value=0.0, value=0.0, step=0.5, help="0 = tanpa batas. Jika terlampaui, baris berikutnya dilewati tanpa memanggil AI."),
+                        'max_tokens': int(st.number_input("Budget Token per Job", min_value=0, value=0, step=100000, help="0 = tanpa batas. Total token input + output dari respons AI."))
+                    }
         
         return {
             'enable_scraping': enable_scraping, 'enable_date': enable_date,
             'enable_sentiment': enable_sentiment, 'enable_journalist': enable_journalist,
             'enable_summarize': enable_summarize, 'enable_categorization': enable_categorization,
-            'sentiment_context': sentiment_context,
+            'sentiment_context': sentiment_context, 'sentiment_prefilter': sentiment_prefilter,
+            'sentiment_contexts': [c.strip() for c in (sentiment_context or '').split('\n') if c.strip()],
             'analysis_source_option': analysis_source_option,
             'summarize_config': summarize_config, 'categorization_config': categorization_config,
-            'scraping_timeout': scraping_timeout
+            'stream_summaries': stream_summaries,
+            'scraping_timeout': scraping_timeout, 'reuse_archived_articles': reuse_archived_articles,
+            'compression_config': compression_config,
+            'routing_policy': routing_policy, 'hedging_config': hedging_config,
+            'budget_config': budget_config, 'pipeline_config': pipeline_config,
+            'trace_config': trace_config, 'cassette_config': cassette_config
         }
 
-    def get_column_mapping(self, df: pd.DataFrame):
+    def get_column_mapping(self, columns: List[str]):
         st.subheader("📋 Mapping Kolom")
         st.info("Pilih kolom yang sesuai dari file Excel Anda")
         col1, col2 = st.columns(2)
         with col1:
-            url_column = st.selectbox("Kolom URL", options=df.columns.tolist(), index=0 if 'URL' in df.columns else 0, help="Pilih kolom yang berisi URL")
+            url_column = st.selectbox("Kolom URL", options=columns, index=columns.index('URL') if 'URL' in columns else 0, help="Pilih kolom yang berisi URL")
         with col2:
-            snippet_column = st.selectbox("Kolom Snippet (Opsional)", options=["Tidak Ada"] + df.columns.tolist(), index=df.columns.tolist().index('Snippet') + 1 if 'Snippet' in df.columns else 0, help="Pilih kolom berisi snippet")
+            snippet_column = st.selectbox("Kolom Snippet (Opsional)", options=["Tidak Ada"] + columns, index=columns.index('Snippet') + 1 if 'Snippet' in columns else 0, help="Pilih kolom berisi snippet")
         return {'url_column': url_column, 'snippet_column': snippet_column if snippet_column != "Tidak Ada" else None}
 
-    async def process_single_url_async(self, url_data: Dict, config: Dict, progress_info: Dict):
-        url = url_data['url']
-        manual_title = url_data.get('title')
-        
-        try:
-            result = {'URL': url}
-            if manual_title and config.get('use_manual_title', False):
-                result['Title'] = manual_title
-
-            content, scraping_success, article_data = "", False, {}
-            
-            # --- Smart Scraping Logic ---
-            # Determine if any form of scraping is needed at all.
-            is_full_scrape_needed = config['enable_scraping']
-            is_metadata_needed = config['enable_date'] or config['enable_journalist']
-            is_content_needed_for_analysis = config['analysis_source_option'] == 'Teks Lengkap (Fallback ke Judul)' and (config['enable_sentiment'] or config['enable_summarize'] or config['enable_categorization'])
-
-            needs_scraping = is_full_scrape_needed or is_metadata_needed or is_content_needed_for_analysis
-
-            if needs_scraping:
-                # If full text is explicitly requested, do a full scrape. Otherwise, a basic scrape might suffice.
-                basic_only = not is_full_scrape_needed
-                article_data = await self.scraper.scrape_article(url, timeout=config['scraping_timeout'], basic_only=basic_only)
-                
-                if article_data and article_data.get('content') and len(article_data.get('content', '').strip()) > 100:
-                    if 'Title' not in result: result['Title'] = article_data.get('title', 'Gagal mengambil judul')
-                    if config['enable_date']: result['Publish_Date'] = article_data.get('publish_date', '')
-                    if is_full_scrape_needed: result['Content'] = article_data.get('content', '')
-                    
-                    result['Scraping_Method'] = article_data.get('method', 'unknown')
-                    content, scraping_success = article_data.get('content', ''), True
-                else:
-                    # Even if scraping fails, we might get a title
-                    if 'Title' not in result: result['Title'] = self.scraper.get_title_newspaper3k(url)
-                    result.update({'Content': 'Gagal scraping', 'Scraping_Method': 'failed'})
-            
-            # --- Journalist Detection ---
-            # This can only run if scraping was performed and successful.
-            if config['enable_journalist']:
-                if scraping_success and content:
-                    result['Journalist'] = self.journalist_detector.detect_journalist(article_data, content)
-                else:
-                    result['Journalist'] = 'Tidak diproses (scraping gagal/dilewati)'
-            
-            # --- Smart Text Selection for Analysis ---
-            analysis_text, analysis_source = "", "none"
-            title = result.get('Title', '')
-            has_valid_content = scraping_success and content and len(content.strip()) > 100
-            has_valid_title = title and title != 'Gagal mengambil judul'
-
-            if config['analysis_source_option'] == 'Hanya Judul':
-                if has_valid_title:
-                    analysis_text, analysis_source = title, "title_only"
-            else: # Teks Lengkap (Fallback ke Judul)
-                if has_valid_content:
-                    analysis_text, analysis_source = content, "content"
-                elif has_valid_title:
-                    analysis_text, analysis_source = title, "title_fallback"
-            
-            result['Analysis_Source'] = analysis_source
-
-            # --- Run Analyses on the selected text ---
-            if config['enable_sentiment'] and config['sentiment_context'] and analysis_text:
-                sentiment = self.sentiment_analyzer.analyze_sentiment(analysis_text, config['sentiment_context'])
-                result.update(sentiment or {'Sentiment': 'Gagal analisis AI'})
-            
-            if config['enable_summarize'] and analysis_text and len(analysis_text.strip()) > 50: # Lowered threshold for title summarization
-                summary = self.summarizer.summarize_article(analysis_text, config['summarize_config'])
-                result['Summary'] = summary.get('summary', 'Gagal membuat ringkasan')
-
-            if config['enable_categorization'] and analysis_text and config.get('categorization_config', {}).get('categories_with_desc'):
-                category = self.category_analyzer.analyze_category(analysis_text, config['categorization_config']['categories_with_desc'])
-                result['Category'] = category
-
-            return result
-        except Exception as e:
-            return {'URL': url, 'Title': f'Error: {str(e)}', 'Content': 'Error'}
-        finally:
-            async with progress_info['lock']:
-                progress_info['completed'] += 1
-                progress = progress_info['completed'] / progress_info['total']
-                progress_info['bar'].progress(progress)
-                progress_info['text'].text(f"({progress_info['completed']}/{progress_info['total']}) Selesai: {url[:70]}...")
-
-    async def process_urls_manual_async(self, url_data_list: List[Dict], config: Dict):
-        progress_info = {
-            'lock': asyncio.Lock(), 'completed': 0, 'total': len(url_data_list),
-            'bar': st.progress(0), 'text': st.empty()
-        }
-        tasks = [self.process_single_url_async(url_data, config, progress_info) for url_data in url_data_list]
-        results = await asyncio.gather(*tasks)
-        
-        original_urls = [d['url'] for d in url_data_list]
-        url_map = {res['URL']: res for res in results}
-        ordered_results = [url_map[url] for url in original_urls]
-        
-        progress_info['text'].text("✅ Semua proses selesai!")
-        return ordered_results
-
-    async def process_single_row_async(self, row_tuple, column_mapping: Dict, config: Dict, progress_info: Dict):
-        index, row = row_tuple
-        
-        result = row.to_dict()
-        result['original_index'] = index
-        url = row.get(column_mapping['url_column'], '')
-        
-        if not url:
-            return result
-
-        snippet = str(row.get(column_mapping.get('snippet_column'), '')) if column_mapping.get('snippet_column') else ""
-        content, scraping_success, article_data = "", False, {}
-
-        if config['enable_scraping']:
-            article_data = await self.scraper.scrape_article(url, timeout=config['scraping_timeout'])
-            if article_data and article_data.get('content') and len(article_data.get('content', '').strip()) > 100:
-                # If the user wants to use the title from the Excel file, we don't scrape for a new one.
-                if not config.get('excel_use_existing_title', False):
-                    result['Judul_New'] = article_data.get('title', 'Gagal')
-                result['Publish_Date_New'] = article_data.get('publish_date', '')
-                result['Content_New'] = article_data.get('content', '')
-                result['Scraping_Method_New'] = article_data.get('method', 'unknown')
-                content, scraping_success = article_data.get('content', ''), True
-            else:
-                result.update({'Content_New': 'Gagal scraping', 'Scraping_Method_New': 'failed'})
-        
-        # --- Smart Text Selection for Analysis ---
-        analysis_text, analysis_source = "", "none"
-        title = result.get('Judul_New', row.get('Judul', '')) # Use existing or new title
-        has_valid_content = scraping_success and content and len(content.strip()) > 100
-        has_valid_title = title and title != 'Gagal'
-        
-        if config['analysis_source_option'] == 'Hanya Judul':
-            if has_valid_title:
-                analysis_text, analysis_source = title, "title_only"
-            elif snippet:
-                analysis_text, analysis_source = snippet, "snippet_fallback"
-        else: # Teks Lengkap (Fallback ke Judul)
-            if has_valid_content:
-                analysis_text, analysis_source = content, "content"
-            elif has_valid_title:
-                analysis_text, analysis_source = title, "title_fallback"
-            elif snippet:
-                analysis_text, analysis_source = snippet, "snippet_fallback"
-
-        result['Analysis_Source_New'] = analysis_source
-
-        # --- Run Analyses on the selected text ---
-        if config['enable_journalist'] and analysis_text:
-            result['Journalist_New'] = self.journalist_detector.detect_journalist(article_data, analysis_text)
-
-        if config['enable_sentiment'] and config['sentiment_context'] and analysis_text:
-            sentiment = self.sentiment_analyzer.analyze_sentiment(analysis_text, config['sentiment_context'])
-            if sentiment:
-                result.update({
-                    'Sentiment_New': sentiment.get('sentiment', 'Gagal'), 'Confidence_New': sentiment.get('confidence', ''),
-                    'Reasoning_New': sentiment.get('reasoning', '')
-                })
-            else:
-                result.update({'Sentiment_New': 'Gagal AI'})
-
-        if config['enable_summarize'] and len(analysis_text.strip()) > 50:
-            summary = self.summarizer.summarize_article(analysis_text, config['summarize_config'])
-            result['Summary_New'] = summary.get('summary', 'Gagal') if summary else 'Gagal AI'
-
-        if config['enable_categorization'] and analysis_text and config.get('categorization_config', {}).get('categories_with_desc'):
-            category = self.category_analyzer.analyze_category(analysis_text, config['categorization_config']['categories_with_desc'])
-            result['Category_New'] = category
-        
-        return result
-    
-    async def process_excel_data_async(self, df: pd.DataFrame, column_mapping: Dict, config: Dict) -> pd.DataFrame:
-        progress_info = {
-            'lock': asyncio.Lock(), 'completed': 0, 'total': len(df),
-            'bar': st.progress(0), 'text': st.empty()
-        }
-
-        tasks = []
-        for row_tuple in df.iterrows():
-            task = self.process_single_row_async(row_tuple, column_mapping, config, progress_info)
-            tasks.append(task)
+    def submit_manual_job(self, manager: JobManager, url_data_list: List[Dict], config: Dict, owner: str) -> Job:
+        stream = config['enable_summarize'] and config.get('stream_summaries')
+        return manager.submit(
+            f"URL Manual ({len(url_data_list)} URL)", 'manual', config,
+            lambda job: self.processor.process_urls_async(url_data_list, config, job.update_progress,
+                                                          job.update_summary if stream else None, on_result=job.add_result),
+            owner=owner)
+
+    def submit_excel_job(self, manager: JobManager, source: TableReader, config: Dict, owner: str) -> Job:
+        if config.get('restart_job'):
+            self.checkpoint.delete_job(config['job_id'])
+        return manager.submit(
+            config.get('job_name') or "Upload Excel", 'excel', config,
+            lambda job: self.processor.process_rows_async(source, config['column_mapping'], config, job.update_progress,
+                                                          checkpoint=self.checkpoint, job_id=config.get('job_id'),
+                                                          on_result=job.add_result),
+            owner=owner)
+
+    def _render_job_progress(self, job: Job, manager: JobManager):
+        if job.status == 'queued':
+            ahead = manager.queue_position(job)
+            st.info(f"⏳ Job **{job.name}** menunggu giliran ({ahead} job di depan). Job dijalankan satu per satu di server ini.")
+        else:
+            st.progress(job.completed / job.total if job.total else 0.0)
+            st.text(f"({job.completed}/{job.total or '?'}) Selesai: {job.last_label[:70]}... | {job.usage_text}")
+        if st.button("⛔ Batalkan Job", key=f"cancel_{job.id}"):
+            manager.cancel(job.id, job.owner)
+
+        if job.summaries:
+            st.markdown("**📝 Ringkasan Live**")
+            for summary in list(job.summaries.values()):
+                st.markdown(f"**{summary['label']}**\n\n{summary['text']}{'' if summary['done'] else '▌'}")
+
+        self._render_partial_results(job)
+
+    def display_jobs(self, manager: JobManager, owner: str):
+        """Show the selected job of this session's owner: live progress while it runs (polled), results once it is done"""
+        jobs = manager.jobs(owner)
+        if not jobs:
+            return
 
-        processed_results = await asyncio.gather(*tasks)
-        
-        results_df = pd.DataFrame(processed_results).set_index('original_index').sort_index()
-        
-        progress_info['text'].text("✅ Semua proses selesai!")
-        return results_df
+        st.header("📊 Hasil Analisis")
+        job_ids = [job.id for job in jobs]
+        if st.session_state.get('active_job_id') not in job_ids:
+            st.session_state['active_job_id'] = job_ids[-1]
+        if len(jobs) > 1:
+            with st.expander("🗂️ Antrean Job", expanded=any(job.is_active for job in jobs)):
+                st.dataframe(pd.DataFrame(manager.summary(owner)), use_container_width=True, hide_index=True)
+            labels = {job.id: f"{job.name} ({job.id})" for job in jobs}
+            st.selectbox("Tampilkan Job", job_ids, key='active_job_id', format_func=labels.get)
+
+        job = manager.get(st.session_state['active_job_id'], owner)
+        was_active = job.is_active
+
+        # Only this fragment reruns while the job is active, so the rest of the page stays usable
+        @st.fragment(run_every=2 if was_active else None)
+        def job_panel():
+            current = manager.get(job.id, owner)
+            if current and current.is_active:
+                self._render_job_progress(current, manager)
+            elif was_active:
+                # Finished since the last full run: rerun the page to show the results
+                st.rerun()
+
+        job_panel()
+
+        if not job.is_active:
+            st.session_state.get('partial_exports', {}).pop(job.id, None)
+        if job.status == 'finished':
+            st.success(f"✅ Semua proses selesai! ({job.elapsed():.0f} detik)")
+            result = job.result.copy() if isinstance(job.result, pd.DataFrame) else job.result
+            self.display_results(result, job.config, is_excel_data=job.kind == 'excel', export_key=job.id)
+        elif job.status == 'failed':
+            st.error(f"❌ Job gagal: {job.error}")
+        elif job.status == 'cancelled':
+            st.warning(f"⛔ Job dibatalkan setelah {job.completed}/{job.total or '?'} baris.")
+        if job.status in ('failed', 'cancelled') and job.results:
+            # Keep the rows that did finish reviewable and exportable
+            self.display_results(self._finished_rows_frame(job), job.config, is_excel_data=job.kind == 'excel',
+                                 export_key=f"{job.id}_partial")
+
+    def display_archive_search(self):
+        """Search the local archive of every article scraped so far"""
+        store = self.processor.article_store
+        if store is None:
+            st.info("Arsip artikel tidak aktif.")
+            return
+        stats = store.stats()
+        st.caption(f"🗄️ {stats['articles']:,} artikel dari {stats['domains']} media tersimpan di arsip lokal. Setiap artikel yang berhasil di-scrape otomatis masuk arsip.")
+
+        col1, col2 = st.columns([2, 1])
+        query = col1.text_input("Kata Kunci", placeholder="toyota avanza", help="Semua kata harus ada di judul atau isi artikel. Tambahkan * untuk mencari awalan kata, misalnya mobil* (mobil, mobilnya, mobil-mobil).")
+        domain = col2.selectbox("Media", ["Semua Media"] + [row['domain'] for row in store.domains()])
+        date_from = date_to = None
+        if st.checkbox("Filter Tanggal Terbit", value=False, help="Artikel tanpa tanggal terbit yang terbaca tidak ikut ditampilkan"):
+            today = datetime.now().date()
+            dates = st.date_input("Rentang Tanggal Terbit", value=(today - timedelta(days=30), today))
+            if len(dates) == 2:
+                date_from, date_to = dates[0].isoformat(), dates[1].isoformat()
+        limit = st.slider("Maksimal Hasil", 10, 1000, 100, 10)
+
+        start = time.perf_counter()
+        results = store.search(query, None if domain == "Semua Media" else domain, date_from, date_to, limit)
+        st.caption(f"🔎 {len(results)} artikel ditemukan dalam {(time.perf_counter() - start) * 1000:.0f} ms" + ("" if query else " (terbaru lebih dulu)"))
+        if not results:
+            return
+        found = pd.DataFrame(results)
+        table = pd.DataFrame({
+            'Tanggal Rilis': found['published_on'].fillna(found['publish_date']),
+            'Media': found['domain'],
+            'Judul': found['title'],
+            'Penulis': found['author'],
+            'Cuplikan': found['snippet'],
+            'URL': found['url'],
+            'Diambil': pd.to_datetime(found['fetched_at'], unit='s').dt.strftime('%Y-%m-%d')
+        })
+        st.dataframe(table, use_container_width=True, hide_index=True)
+        csv = table.drop(columns=['Cuplikan']).assign(Isi=found['content']).to_csv(index=False).encode('utf-8')
+        st.download_button("📥 Download Hasil Pencarian (.csv)", csv, file_name=f"arsip_artikel_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv", mime="text/csv")
+
+    def _preview_frame(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Copy of the results with long text columns shortened for the on-screen table"""
+        df_display = df.copy()
+        text_columns = ['Isi', 'Summary', 'Summary_New', 'Reasoning', 'Reasoning_New']
+        text_columns += [col for col in df_display.columns if str(col).startswith('Reasoning [')]
+        for col in text_columns:
+            if col in df_display.columns:
+                df_display[col] = df_display[col].astype(str).apply(lambda x: x[:150] + "..." if len(x) > 150 else x)
+        return df_display
+
+    def _finished_rows_frame(self, job: Job) -> pd.DataFrame:
+        df = pd.DataFrame(list(job.results))
+        if 'original_index' in df.columns:
+            df = df.set_index('original_index').sort_index()
+        return df
+
+    def _render_partial_results(self, job: Job, preview_rows: int = 50):
+        """Show the most recent finished rows; the full partial export is only written to disk on request"""
+        count = len(job.results)
+        if not count:
+            return
 
-    def display_results(self, results, config: Dict, is_excel_data: bool = False):
+        recent = pd.DataFrame(job.results[-preview_rows:])
+        if 'original_index' in recent.columns:
+            recent = recent.set_index('original_index')
+        recent = self.processor.finalize_results(recent, job.config, is_excel_data=job.kind == 'excel')
+        st.markdown(f"**📋 Hasil Sementara ({count}/{job.total or '?'} baris, {len(recent)} terbaru ditampilkan)**")
+        st.dataframe(self._preview_frame(recent), use_container_width=True)
+
+        exports = st.session_state.setdefault('partial_exports', {})
+        if st.button(f"💾 Siapkan CSV Hasil Sementara ({count} baris)", key=f"partial_prepare_{job.id}"):
+            df = self.processor.finalize_results(self._finished_rows_frame(job), job.config, is_excel_data=job.kind == 'excel')
+            cleanup_exports(DEFAULT_EXPORT_DIR)
+            path = os.path.join(DEFAULT_EXPORT_DIR, f"news_analysis_partial_{job.id}_{count}.csv")
+            exports[job.id] = export_dataframe(df, path, 'csv')['main']
+        path = exports.get(job.id)
+        if path and os.path.exists(path):
+            with open(path, 'rb') as f:
+                st.download_button("📥 Download Hasil Sementara (CSV)", f, file_name=os.path.basename(path),
+                                   mime="text/csv", key=f"partial_{job.id}")
+
+    def display_results(self, results, config: Dict, is_excel_data: bool = False, export_key: Optional[str] = None):
         if isinstance(results, pd.DataFrame):
             df = results
         elif results:
@@ -386,84 +532,7 @@ class NewsAnalyzerApp:
             st.warning("Tidak ada hasil untuk ditampilkan.")
             return
 
-        # --- Data Consolidation and Cleaning ---
-        
-        # Determine the primary URL column from the original data
-        original_url_col = config.get('column_mapping', {}).get('url_column', 'URL')
-
-        # If it's from Excel, ensure the original URL column is named 'URL' for consistency
-        if is_excel_data and original_url_col != 'URL' and original_url_col in df.columns:
-            df.rename(columns={original_url_col: 'URL'}, inplace=True)
-
-        # Standardize column names from scraping/analysis (e.g., Judul_New -> Title)
-        rename_map = {
-            'Judul_New': 'Title',
-            'Publish_Date_New': 'Publish_Date',
-            'Journalist_New': 'Journalist',
-            'Content_New': 'Content',
-            'Sentiment_New': 'Sentiment',
-            'Confidence_New': 'Confidence',
-            'Reasoning_New': 'Reasoning',
-            'Summary_New': 'Summary',
-            'Category_New': 'Category',
-            'Analysis_Source_New': 'Analysis_Source',
-            'Scraping_Method_New': 'Scraping_Method'
-        }
-        df.rename(columns={k: v for k, v in rename_map.items() if k in df.columns}, inplace=True)
-
-        # Merge new data into original columns if they exist
-        # For example, update 'Title' with new data, but keep old if new is null
-        for col_name in rename_map.values():
-            if col_name in df.columns:
-                # Find the original column name (case-insensitive search)
-                original_col = next((c for c in df.columns if c.lower() == col_name.lower() and c != col_name), None)
-                if original_col:
-                    df[original_col] = df[col_name].fillna(df[original_col])
-                    df.drop(columns=[col_name], inplace=True)
-                else:
-                    # If no original column, just rename the new one
-                    df.rename(columns={col_name: col_name}, inplace=True) # No real change, just for clarity
-
-        # --- Feature Engineering & Final Formatting ---
-
-        # 1. Create 'Media' column from the 'URL'
-        if 'URL' in df.columns:
-            df['Media'] = df['URL'].apply(lambda x: self.scraper._get_domain(x) if pd.notna(x) else '')
-
-        # 2. Final Rename to Indonesian user-friendly names
-        final_rename_map = {
-            'URL': 'URL',
-            'Media': 'Media',
-            'Title': 'Judul',
-            'Category': 'Kategori',
-            'Publish_Date': 'Tanggal Rilis',
-            'Journalist': 'Reporter',
-            'Content': 'Isi',
-            'Sentiment': 'Sentiment',
-            'Confidence': 'Confidence',
-            'Reasoning': 'Reasoning',
-            'Summary': 'Summary',
-            'Analysis_Source': 'Sumber Analisis',
-            'Scraping_Method': 'Scraping_Method'
-        }
-        
-        # Rename only the columns that actually exist in the DataFrame
-        df.rename(columns={k: v for k, v in final_rename_map.items() if k in df.columns}, inplace=True)
-
-        # 3. Define the final column order based on user request
-        final_desired_order = [
-            'URL', 'Media', 'Judul', 'Kategori', 'Tanggal Rilis', 'Reporter', 'Isi',
-            'Sentiment', 'Confidence', 'Reasoning', 'Summary', 'Sumber Analisis', 'Scraping_Method'
-        ]
-        
-        # Get a list of original columns to keep them at the end
-        original_cols_to_keep = [col for col in df.columns if col not in final_desired_order]
-        
-        # Filter the desired order to only include columns present in the df
-        final_columns_present = [col for col in final_desired_order if col in df.columns]
-        
-        # Combine the ordered columns with the remaining original ones
-        df = df[final_columns_present + original_cols_to_keep]
+        df = self.processor.finalize_results(df, config, is_excel_data)
 
         # --- Display in Streamlit UI ---
         tab1, tab2, tab3 = st.tabs(["📊 Ringkasan & Metrik", "📋 Data Lengkap", "📤 Export"])
@@ -473,16 +542,11 @@ class NewsAnalyzerApp:
 
         with tab2:
             st.subheader("📋 Preview Hasil Analisis")
-            df_display = df.copy()
-            text_columns = ['Isi', 'Summary', 'Summary_New', 'Reasoning', 'Reasoning_New']
-            for col in text_columns:
-                if col in df_display.columns:
-                    df_display[col] = df_display[col].astype(str).apply(lambda x: x[:150] + "..." if len(x) > 150 else x)
-            st.dataframe(df_display, use_container_width=True)
+            st.dataframe(self._preview_frame(df), use_container_width=True)
             st.caption("Data lengkap tersedia di tab Export.")
 
         with tab3:
-            self.display_export_section(df, config, is_excel_data)
+            self.display_export_section(df, config, is_excel_data, export_key)
 
     def display_metrics_and_summary(self, df: pd.DataFrame, config: Dict, is_excel_data: bool):
         st.subheader("📈 Metrik Kinerja")
@@ -499,38 +563,128 @@ class NewsAnalyzerApp:
         if config.get('enable_scraping'):
             success_rate = (scraping_success / total_count * 100) if total_count > 0 else 0
             col2.metric("Scraping Berhasil", f"{scraping_success}/{total_count}", f"{success_rate:.1f}%")
+
+        job_stats = config.get('job_stats', {})
+        if job_stats.get('compressed_calls'):
+            st.metric("Token Input Dihemat (estimasi)", f"{job_stats['tokens_saved']:,}", f"{job_stats['compressed_calls']} panggilan AI dikompresi")
+        if job_stats.get('prefilter_skipped'):
+            st.metric("Sentimen via Pre-filter Lokal", job_stats['prefilter_skipped'], "panggilan AI dilewati (tidak terkait)")
+        if job_stats.get('category_local'):
+            st.metric("Kategori via Classifier Lokal", job_stats['category_local'], f"{job_stats.get('category_llm', 0)} baris tetap memakai AI")
+
+        tracker = job_stats.get('usage')
+        if tracker and tracker.calls:
+            col1, col2 = st.columns(2)
+            col1.metric("Token AI (Input + Output)", f"{tracker.input_tokens + tracker.output_tokens:,}", f"{tracker.calls} panggilan AI")
+            col2.metric("Biaya AI (USD)", f"${tracker.cost:.4f}", f"budget ${tracker.max_cost_usd:.2f}" if tracker.max_cost_usd else None)
+            st.markdown("**🔢 Pemakaian Token per Tugas & Model**")
+            st.dataframe(pd.DataFrame(tracker.summary()), use_container_width=True, hide_index=True)
+        budget_skipped = int(df['AI_Status'].astype(str).str.startswith(BUDGET_SKIPPED).sum()) if 'AI_Status' in df.columns else 0
+        if budget_skipped:
+            st.warning(f"⚠️ Budget AI habis: {budget_skipped} baris dilewati seluruhnya atau sebagian tanpa analisis AI (lihat kolom AI_Status).")
+
+        routing_summary = job_stats['routing'].summary() if job_stats.get('routing') else []
+        if routing_summary:
+            st.markdown("**⚡ Routing Model per Tier**")
+            st.dataframe(pd.DataFrame(routing_summary), use_container_width=True, hide_index=True)
+
+        hedging_stats = job_stats.get('hedging') or {}
+        if hedging_stats.get('hedged'):
+            st.metric("Hedged Request", hedging_stats['hedged'], f"{hedging_stats['hedge_wins']} lebih cepat dari request awal")
+
+        if job_stats.get('pipeline'):
+            st.markdown("**🚦 Tahapan Pipeline**")
+            st.dataframe(pd.DataFrame(job_stats['pipeline']), use_container_width=True, hide_index=True)
+
+        trace_writer = job_stats.get('trace')
+        if trace_writer and os.path.exists(trace_writer.path):
+            st.markdown("**🔍 Trace per Baris**")
+            st.caption("Buka file di https://ui.perfetto.dev atau chrome://tracing untuk melihat waterfall tiap baris. Ringkasannya ada di kolom Trace.")
+            with open(trace_writer.path, 'rb') as f:
+                st.download_button("📥 Download Trace (.json)", f, file_name=os.path.basename(trace_writer.path), mime="application/json")
+
+        cassette = job_stats.get('cassette')
+        if cassette:
+            st.markdown("**📼 Cassette**")
+            if cassette.recording:
+                st.caption(f"{cassette.recorded} respons website dan AI direkam ke {cassette.path}")
+            else:
+                st.caption(f"{cassette.hits} respons diputar ulang dari {cassette.path}" + (f"; {cassette.misses} request tidak ada di cassette dan dianggap gagal" if cassette.misses else ""))
+            if cassette.recording and os.path.exists(cassette.path):
+                with open(cassette.path, 'rb') as f:
+                    st.download_button("📥 Download Cassette (.jsonl.gz)", f, file_name=os.path.basename(cassette.path), mime="application/gzip")
+
+        if len(self.processor.llm_pool.endpoints) > 1:
+            st.markdown("**🔀 Status Endpoint AI**")
+            st.dataframe(pd.DataFrame(self.processor.llm_pool.status()), use_container_width=True, hide_index=True)
+
+        timings = METRICS.summary()
+        if timings:
+            # Process-wide since the server started, not only this job
+            with st.expander("📈 Metrik Performa (sejak server dimulai)"):
+                st.dataframe(pd.DataFrame(timings), use_container_width=True, hide_index=True)
+                st.dataframe(pd.DataFrame(METRICS.counters()), use_container_width=True, hide_index=True)
+                st.download_button("📥 Download Metrik (Prometheus)", METRICS.render_prometheus(), file_name="senticon_metrics.prom",
+                                   mime="text/plain")
         
         active_funcs = {'📄 Full Teks': 'enable_scraping', '📅 Tanggal': 'enable_date', '😊 Sentimen': 'enable_sentiment', '👤 Jurnalis': 'enable_journalist', '📝 Summarize': 'enable_summarize', '📊 Kategori': 'enable_categorization'}
         st.info(f"**Fungsi Aktif:** {' | '.join([f for f, e in active_funcs.items() if config.get(e)])}")
 
-    def display_export_section(self, df: pd.DataFrame, config: Dict, is_excel_data: bool):
-        st.subheader("📤 Export Data ke Excel")
-        
-        excel_buffer = BytesIO()
-        df.to_excel(excel_buffer, index=False, engine='openpyxl')
-        excel_buffer.seek(0)
-        
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        data_type = "excel" if is_excel_data else "manual"
-        features = "_".join(k for k, v in {'ft': 'enable_scraping', 'sent': 'enable_sentiment', 'jour': 'enable_journalist', 'sum': 'enable_summarize', 'cat': 'enable_categorization'}.items() if config.get(v))
-        filename = f"news_analysis_{data_type}_{features}_{timestamp}.xlsx"
-        
-        st.download_button(
-            label="📥 Download Laporan Excel",
-            data=excel_buffer.getvalue(),
-            file_name=filename,
-            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-            use_container_width=True
-        )
+    def display_export_section(self, df: pd.DataFrame, config: Dict, is_excel_data: bool, export_key: Optional[str] = None):
+        st.subheader("📤 Export Data")
+
+        formats = available_formats()
+        col1, col2 = st.columns(2)
+        fmt = col1.radio("Format File", formats, format_func=lambda f: EXPORT_FORMATS[f]['label'], horizontal=True,
+                         key=f"export_format_{export_key}")
+        use_sidecar = col2.checkbox("Simpan kolom Isi di file terpisah", value=False, disabled='Isi' not in df.columns,
+                                    key=f"export_sidecar_{export_key}",
+                                    help="Isi artikel lengkap disimpan sebagai .jsonl.gz terpisah, sehingga file utama tetap kecil dan cepat dibuka.")
+
+        # Each (job, format) is written to disk once, in chunks, and then served from the file on every rerun
+        exports = st.session_state.setdefault('exports', {})
+        cache_key = (export_key or str(id(df)), fmt, use_sidecar)
+        paths = exports.get(cache_key)
+        if not paths or not os.path.exists(paths['main']):
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            data_type = "excel" if is_excel_data else "manual"
+            features = "_".join(k for k, v in {'ft': 'enable_scraping', 'sent': 'enable_sentiment', 'jour': 'enable_journalist', 'sum': 'enable_summarize', 'cat': 'enable_categorization'}.items() if config.get(v))
+            job_tag = f"_{export_key}" if export_key else ""
+            filename = f"news_analysis_{data_type}_{features}_{timestamp}{job_tag}.{fmt}"
+            cleanup_exports(DEFAULT_EXPORT_DIR)
+            with st.spinner(f"Menyiapkan file {EXPORT_FORMATS[fmt]['label']}..."):
+                paths = export_dataframe(df, os.path.join(DEFAULT_EXPORT_DIR, filename), fmt,
+                                         sidecar_columns=['Isi'] if use_sidecar else ())
+            exports[cache_key] = paths
+
+        with open(paths['main'], 'rb') as f:
+            st.download_button(
+                label=f"📥 Download Laporan {EXPORT_FORMATS[fmt]['label']}",
+                data=f,
+                file_name=os.path.basename(paths['main']),
+                mime=EXPORT_FORMATS[fmt]['mime'],
+                use_container_width=True,
+                key=f"export_main_{export_key}"
+            )
+        if paths.get('sidecar'):
+            with open(paths['sidecar'], 'rb') as f:
+                st.download_button(
+                    label="📥 Download Isi Artikel (.jsonl.gz)",
+                    data=f,
+                    file_name=os.path.basename(paths['sidecar']),
+                    mime="application/gzip",
+                    use_container_width=True,
+                    key=f"export_sidecar_file_{export_key}"
+                )
 
     def run(self):
         self.setup_page()
         config = self.setup_sidebar()
         
         st.header("📝 Input Data")
-        tab1, tab2, tab3 = st.tabs(["🔗 URL Manual", "📁 Upload File Excel", "📖 Panduan Penggunaan"])
+        tab1, tab2, tab_archive, tab3 = st.tabs(["🔗 URL Manual", "📁 Upload File Excel", "🗄️ Arsip Artikel", "📖 Panduan Penggunaan"])
         
-        active_input_method, url_data_list, df = None, [], None
+        active_input_method, url_data_list, source = None, [], None
         
         with tab1:
             use_manual_title = st.checkbox("Gunakan Judul dari Input Manual", value=True, help="Format: URL[tab]Judul. Jika tidak dicentang, hanya URL yang akan diproses.")
@@ -549,17 +703,39 @@ class NewsAnalyzerApp:
                 active_input_method = "URL Manual"
 
         with tab2:
-            uploaded_file = st.file_uploader("Upload file Excel (.xlsx, .xls)", type=['xlsx', 'xls'])
+            uploaded_file = st.file_uploader("Upload file Excel (.xlsx, .xls, .csv)", type=['xlsx', 'xls', 'csv'])
             if uploaded_file:
-                df = pd.read_excel(uploaded_file)
-                st.success(f"✅ Berhasil membaca {len(df)} baris dari {uploaded_file.name}")
+                try:
+                    columns, total_rows = inspect_upload(uploaded_file.getvalue(), uploaded_file.name)
+                except UnicodeDecodeError:
+                    st.error("❌ File CSV bukan UTF-8. Simpan ulang sebagai CSV UTF-8 (Excel: \"CSV UTF-8 (Comma delimited)\") lalu upload lagi.")
+                    st.stop()
+                except Exception as e:
+                    st.error(f"❌ File tidak bisa dibaca: {e}")
+                    st.stop()
+                if not columns:
+                    st.error("❌ Baris header (nama kolom) tidak ditemukan di file ini.")
+                    st.stop()
+                st.success(f"✅ Berhasil membaca {total_rows} baris dari {uploaded_file.name}")
                 
                 excel_use_existing_title = st.checkbox("Gunakan Judul dari file excel", value=True, help="Jika dicentang, judul dari file excel akan digunakan. Jika tidak, judul baru akan ditarik dari URL.")
                 config['excel_use_existing_title'] = excel_use_existing_title
 
-                config['column_mapping'] = self.get_column_mapping(df)
+                config['column_mapping'] = self.get_column_mapping(columns)
+                # Rows are streamed from the file while the job runs; the count from the preview saves a pass
+                source = TableReader(uploaded_file.getvalue(), uploaded_file.name, length=total_rows)
+
+                config['job_id'], config['job_name'] = make_job_id(uploaded_file.getvalue(), config), uploaded_file.name
+                job_info = self.checkpoint.job_info(config['job_id'])
+                if job_info and job_info['completed']:
+                    st.info(f"♻️ Checkpoint ditemukan: {job_info['completed']}/{job_info['total']} baris file ini dengan konfigurasi yang sama sudah selesai ({job_info['status']}).")
+                    if not st.checkbox("Lanjutkan dari checkpoint", value=True, help="Baris yang sudah selesai tidak di-scrape dan dianalisis ulang. Hapus centang untuk memproses semua baris dari awal."):
+                        config['restart_job'] = True
                 active_input_method = "Upload File Excel"
         
+        with tab_archive:
+            self.display_archive_search()
+
         with tab3:
             st.header("📖 Panduan Penggunaan Aplikasi")
             try:
@@ -571,16 +747,17 @@ class NewsAnalyzerApp:
         if not active_input_method:
             st.warning("⚠️ Masukkan minimal satu URL atau upload file Excel")
 
+        manager = get_job_manager()
+        owner = session_owner()
         if st.button("🚀 Mulai Analisis", disabled=not active_input_method, use_container_width=True, type="primary"):
-            st.header("📊 Hasil Analisis")
-            with st.spinner("Memproses data..."):
-                loop = asyncio.get_event_loop()
-                if active_input_method == "URL Manual":
-                    results = loop.run_until_complete(self.process_urls_manual_async(url_data_list, config))
-                    self.display_results(results, config)
-                elif df is not None:
-                    results_df = loop.run_until_complete(self.process_excel_data_async(df, config['column_mapping'], config))
-                    self.display_results(results_df, config, is_excel_data=True)
+            # The job runs on a background thread; reruns and refreshes no longer interrupt it
+            if active_input_method == "URL Manual":
+                job = self.submit_manual_job(manager, url_data_list, config, owner)
+            else:
+                job = self.submit_excel_job(manager, source, config, owner)
+            st.session_state['active_job_id'] = job.id
+
+        self.display_jobs(manager, owner)
 
 if __name__ == "__main__":
     app = NewsAnalyzerApp()
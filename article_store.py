@@ -0,0 +1,270 @@
+"""
+Local archive of scraped articles (SQLite with an FTS5 full-text index).
+
+Every successfully extracted article is upserted by canonical URL, and `NewsScraper.scrape_article`
+returns archived articles without touching the network, so URLs fetched for an earlier project are
+not scraped again. The archive can be searched by keyword, media domain and publish date:
+
+    python article_store.py search "toyota avanza" --domain kompas.com --from 2024-05-01 --to 2024-05-31
+    python article_store.py stats
+"""
+import argparse
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+import urllib.parse
+from datetime import datetime
+from typing import Dict, List, Optional
+
+DEFAULT_ARTICLE_STORE_PATH = os.path.join('archive', 'articles.sqlite')
+
+# Query parameters that only track the visitor; every other parameter can change the page (e.g. ?page=all)
+TRACKING_PARAMS = {'fbclid', 'gclid', 'dclid', 'msclkid', 'igshid', 'ref', 'ref_src', 'amp'}
+
+MONTHS = {name: i + 1 for i, name in enumerate(
+    ['januari', 'februari', 'maret', 'april', 'mei', 'juni', 'juli', 'agustus', 'september', 'oktober', 'november', 'desember'])}
+MONTHS.update({'jan': 1, 'feb': 2, 'mar': 3, 'apr': 4, 'may': 5, 'jun': 6, 'jul': 7, 'agu': 8, 'agt': 8, 'aug': 8,
+               'sep': 9, 'okt': 10, 'oct': 10, 'nov': 11, 'des': 12, 'dec': 12, 'january': 1, 'february': 2, 'march': 3,
+               'june': 6, 'july': 7, 'august': 8, 'october': 10, 'december': 12})
+
+
+def canonical_url(url: str) -> str:
+    """The same article under http/https, with or without www, tracking parameters or a trailing slash maps to one key"""
+    parts = urllib.parse.urlsplit(url.strip())
+    host = (parts.hostname or '').lower()
+    if host.startswith('www.'):
+        host = host[4:]
+    if parts.port and parts.port not in (80, 443):
+        host = f"{host}:{parts.port}"
+    query = sorted((key, value) for key, value in urllib.parse.parse_qsl(parts.query, keep_blank_values=True)
+                   if not key.lower().startswith('utm_') and key.lower() not in TRACKING_PARAMS)
+    path = parts.path.rstrip('/') or '/'
+    return urllib.parse.urlunsplit(('https', host, path, urllib.parse.urlencode(query), ''))
+
+
+def normalize_date(value) -> Optional[str]:
+    """YYYY-MM-DD from ISO dates, '01/05/2024' (day first) or text like 'Rabu, 01 Mei 2024 10:15 WIB'"""
+    text = str(value or '')
+    match = re.search(r'(\d{4})-(\d{2})-(\d{2})', text)
+    if match:
+        return match.group(0)
+    match = re.search(r'\b(\d{1,2})[/.-](\d{1,2})[/.-](\d{4})\b', text)
+    if match and 1 <= int(match.group(2)) <= 12:
+        return f"{match.group(3)}-{int(match.group(2)):02d}-{int(match.group(1)):02d}"
+    match = re.search(r'(\d{1,2})\s+([A-Za-z]+)\.?\s+(\d{4})', text)
+    if match and match.group(2).lower() in MONTHS:
+        return f"{match.group(3)}-{MONTHS[match.group(2).lower()]:02d}-{int(match.group(1)):02d}"
+    return None
+
+
+def content_hash(content: str) -> str:
+    return hashlib.sha1(' '.join(content.split()).encode('utf-8')).hexdigest()
+
+
+def _fts_query(query: str) -> str:
+    """Every word must match; `mobil*` matches by prefix. Quoting keeps user input out of the FTS5 syntax."""
+    terms = re.findall(r'\w+\*?', query)
+    return ' '.join(f'"{term[:-1]}"*' if term.endswith('*') else f'"{term}"' for term in terms)
+
+
+class ArticleStore:
+    """
+    SQLite (WAL) archive of articles keyed by canonical URL, with an external-content FTS5 index
+    over title and content kept in sync by triggers. Falls back to LIKE search without FTS5.
+    """
+
+    def __init__(self, path: str = DEFAULT_ARTICLE_STORE_PATH):
+        self.path = path
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Scraping rows write from the job thread while the UI thread searches
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS articles (
+                id INTEGER PRIMARY KEY,
+                canonical_url TEXT NOT NULL UNIQUE,
+                url TEXT,
+                domain TEXT,
+                title TEXT,
+                publish_date TEXT,
+                published_on TEXT,
+                author TEXT,
+                content TEXT,
+                method TEXT,
+                content_hash TEXT,
+                fetched_at REAL
+            );
+            CREATE INDEX IF NOT EXISTS articles_domain ON articles (domain, published_on);
+            CREATE INDEX IF NOT EXISTS articles_published_on ON articles (published_on);
+        """)
+        self.fts = self._create_fts()
+        self._conn.commit()
+        self._lock = threading.Lock()
+
+    def _create_fts(self) -> bool:
+        try:
+            self._conn.executescript("""
+                CREATE VIRTUAL TABLE IF NOT EXISTS articles_fts USING fts5(
+                    title, content, content='articles', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+                );
+                CREATE TRIGGER IF NOT EXISTS articles_fts_insert AFTER INSERT ON articles BEGIN
+                    INSERT INTO articles_fts (rowid, title, content) VALUES (new.id, new.title, new.content);
+                END;
+                CREATE TRIGGER IF NOT EXISTS articles_fts_delete AFTER DELETE ON articles BEGIN
+                    INSERT INTO articles_fts (articles_fts, rowid, title, content) VALUES ('delete', old.id, old.title, old.content);
+                END;
+                CREATE TRIGGER IF NOT EXISTS articles_fts_update AFTER UPDATE ON articles
+                WHEN old.content_hash IS NOT new.content_hash OR old.title IS NOT new.title BEGIN
+                    INSERT INTO articles_fts (articles_fts, rowid, title, content) VALUES ('delete', old.id, old.title, old.content);
+                    INSERT INTO articles_fts (rowid, title, content) VALUES (new.id, new.title, new.content);
+                END;
+            """)
+            return True
+        except sqlite3.OperationalError as e:
+            print(f"⚠️ SQLite without FTS5 ({e}); archive search falls back to LIKE")
+            return False
+
+    def get(self, url: str) -> Optional[Dict]:
+        """The archived article for `url` in the scraper's result format, or None"""
+        with self._lock:
+            row = self._conn.execute("SELECT title, publish_date, author, content FROM articles WHERE canonical_url = ?",
+                                     (canonical_url(url),)).fetchone()
+        if row is None:
+            return None
+        return {'content': row['content'], 'title': row['title'], 'author': row['author'],
+                'publish_date': row['publish_date'], 'url': url, 'method': 'archive'}
+
+    def put(self, article: Dict) -> bool:
+        """Upsert a scraped article; fields a new scrape left empty (e.g. no author from newspaper3k) keep their archived value"""
+        content = (article.get('content') or '').strip()
+        if not content or not article.get('url'):
+            return False
+        url = article['url']
+        key = canonical_url(url)
+        publish_date = str(article.get('publish_date') or '')
+        values = (key, url, urllib.parse.urlsplit(key).hostname, (article.get('title') or '').strip(), publish_date,
+                  normalize_date(publish_date), article.get('author') or '', content, article.get('method', ''),
+                  content_hash(content), time.time())
+        # Committed per article: scraping takes seconds per URL, and a crashed job keeps what it fetched
+        with self._lock:
+            self._conn.execute("""
+                INSERT INTO articles (canonical_url, url, domain, title, publish_date, published_on, author, content, method, content_hash, fetched_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (canonical_url) DO UPDATE SET
+                    url = excluded.url, domain = excluded.domain,
+                    title = COALESCE(NULLIF(excluded.title, ''), articles.title),
+                    publish_date = COALESCE(NULLIF(excluded.publish_date, ''), articles.publish_date),
+                    published_on = COALESCE(excluded.published_on, articles.published_on),
+                    author = COALESCE(NULLIF(excluded.author, ''), articles.author),
+                    content = excluded.content, method = excluded.method, content_hash = excluded.content_hash,
+                    fetched_at = excluded.fetched_at
+            """, values)
+            self._conn.commit()
+        return True
+
+    def search(self, query: str = '', domain: Optional[str] = None, date_from: Optional[str] = None,
+               date_to: Optional[str] = None, limit: int = 100) -> List[Dict]:
+        """
+        Articles matching all words of `query` (best matches first; newest first without a query),
+        from `domain` and its subdomains, published between `date_from` and `date_to` (YYYY-MM-DD, inclusive).
+        Articles whose date could not be read are left out by a date filter.
+        """
+        columns = "a.url, a.domain, a.title, a.publish_date, a.published_on, a.author, a.content, a.method, a.content_hash, a.fetched_at"
+        clauses, params = [], []
+        fts_query = _fts_query(query) if query else ''
+        if fts_query and self.fts:
+            sql = (f"SELECT {columns}, snippet(articles_fts, 1, '«', '»', ' … ', 16) AS snippet "
+                   "FROM articles_fts JOIN articles a ON a.id = articles_fts.rowid")
+            clauses.append("articles_fts MATCH ?")
+            params.append(fts_query)
+            order = "bm25(articles_fts)"
+        else:
+            sql = f"SELECT {columns}, substr(a.content, 1, 200) AS snippet FROM articles a"
+            for term in re.findall(r'\w+', query or ''):
+                clauses.append("(a.title LIKE ? OR a.content LIKE ?)")
+                params += [f"%{term}%", f"%{term}%"]
+            order = "a.published_on DESC, a.fetched_at DESC"
+        if domain:
+            domain = domain.lower().strip()
+            domain = domain[4:] if domain.startswith('www.') else domain
+            clauses.append("(a.domain = ? OR a.domain LIKE ?)")
+            params += [domain, f"%.{domain}"]
+        if date_from:
+            clauses.append("a.published_on >= ?")
+            params.append(str(date_from))
+        if date_to:
+            clauses.append("a.published_on <= ?")
+            params.append(str(date_to))
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += f" ORDER BY {order} LIMIT ?"
+        params.append(limit)
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [dict(row) for row in rows]
+
+    def domains(self, limit: int = 200) -> List[Dict]:
+        """Media domains by number of archived articles"""
+        with self._lock:
+            rows = self._conn.execute("SELECT domain, COUNT(*) AS articles FROM articles GROUP BY domain ORDER BY articles DESC, domain LIMIT ?",
+                                      (limit,)).fetchall()
+        return [dict(row) for row in rows]
+
+    def stats(self) -> Dict:
+        with self._lock:
+            articles, domains, oldest, newest = self._conn.execute(
+                "SELECT COUNT(*), COUNT(DISTINCT domain), MIN(published_on), MAX(published_on) FROM articles").fetchone()
+        return {'articles': articles, 'domains': domains, 'oldest': oldest, 'newest': newest}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Search the local article archive")
+    parser.add_argument('--db', default=DEFAULT_ARTICLE_STORE_PATH)
+    commands = parser.add_subparsers(dest='command', required=True)
+    search = commands.add_parser('search', help="Search by keyword, domain and publish date")
+    search.add_argument('query', nargs='?', default='')
+    search.add_argument('--domain')
+    search.add_argument('--from', dest='date_from', help="YYYY-MM-DD")
+    search.add_argument('--to', dest='date_to', help="YYYY-MM-DD")
+    search.add_argument('--limit', type=int, default=20)
+    search.add_argument('--output', help="Write the results (with content) to this .csv/.xlsx file")
+    commands.add_parser('stats', help="Number of archived articles and media")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.db):
+        print(f"❌ Archive {args.db} not found")
+        return 2
+    store = ArticleStore(args.db)
+    if args.command == 'stats':
+        stats = store.stats()
+        print(f"🗄️ {stats['articles']} articles from {stats['domains']} media, published {stats['oldest'] or '-'} to {stats['newest'] or '-'}")
+        for row in store.domains(20):
+            print(f"  {row['domain']:<30} {row['articles']:>6}")
+        return 0
+
+    start = time.perf_counter()
+    results = store.search(args.query, args.domain, args.date_from, args.date_to, args.limit)
+    print(f"🔎 {len(results)} articles in {(time.perf_counter() - start) * 1000:.1f} ms")
+    for article in results:
+        fetched = datetime.fromtimestamp(article['fetched_at']).strftime('%Y-%m-%d')
+        print(f"\n{article['published_on'] or '????-??-??'}  {article['domain']}  {article['title']}\n  {article['url']} (diambil {fetched})\n  {article['snippet']}")
+    if args.output:
+        import pandas as pd
+        from export_writers import export_dataframe
+        export_dataframe(pd.DataFrame(results).drop(columns=['snippet']), args.output)
+        print(f"💾 Results written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,423 @@
+"""
+Deferred batch inference for large overnight jobs.
+
+Builds every sentiment/summary/category request for an already-scraped file into a JSONL job file,
+submits it to a batch-inference endpoint, polls until it finishes and merges the answers back by row id.
+
+    python batch_runner.py run --input hasil_scraping.xlsx --output hasil_batch.xlsx --context "Toyota Avanza" --summarize
+    python batch_runner.py resume --job-dir batch_jobs/<job_id>
+"""
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import time
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import pandas as pd
+
+from sentiment_analyzer import SentimentAnalyzer
+from summarizer import ArticleSummarizer
+from category_analyzer import CategoryAnalyzer
+from content_compressor import ContentCompressor
+from relevance_filter import PREFILTER_SOURCES, RelevanceFilter
+from model_router import ModelRouter
+from export_writers import write_table
+from input_reader import read_table
+
+TASK_SEPARATOR = '|'
+# Sentiment requests name the contexts they cover by index: "12|sentiment:0,2"
+CONTEXT_SEPARATOR = ':'
+FINAL_STATUSES = ('completed', 'failed', 'expired', 'cancelled')
+
+
+def _request_line(custom_id: str, model: str, prompt: str, temperature: float) -> Dict:
+    return {
+        "custom_id": custom_id,
+        "method": "POST",
+        "url": "/v1/chat/completions",
+        "body": {
+            "model": model,
+            "messages": [{"role": "user", "content": prompt}],
+            "response_format": {"type": "json_object"},
+            "temperature": temperature
+        }
+    }
+
+
+def _local_result_line(custom_id: str, result: Dict) -> Dict:
+    """A result answered without the model, in the shape of a batch output line"""
+    content = json.dumps(result, ensure_ascii=False)
+    return {"custom_id": custom_id, "response": {"status_code": 200, "body": {"choices": [{"message": {"content": content}}]}}, "error": None}
+
+
+class BatchJobBuilder:
+    """
+    Turns rows into batch request lines using the analyzers' own prompt builders, after the same
+    relevance pre-filter and content compression as the interactive pipeline.
+    """
+
+    def __init__(self, sentiment_analyzer: SentimentAnalyzer, summarizer: ArticleSummarizer,
+                 category_analyzer: CategoryAnalyzer, model_router: ModelRouter,
+                 content_compressor: Optional[ContentCompressor] = None, relevance_filter: Optional[RelevanceFilter] = None):
+        self.sentiment_analyzer = sentiment_analyzer
+        self.summarizer = summarizer
+        self.category_analyzer = category_analyzer
+        self.model_router = model_router
+        self.content_compressor = content_compressor or ContentCompressor()
+        self.relevance_filter = relevance_filter or RelevanceFilter()
+        self.stats = {'tokens_saved': 0, 'prefilter_skipped': 0}
+
+    def _prepare_text(self, text: str, task: str, config: Dict) -> str:
+        compressed = self.content_compressor.compress_for_task(text, task, config)
+        if compressed is None:
+            return text
+        self.stats['tokens_saved'] += compressed['tokens_saved']
+        return compressed['text']
+
+    def build_requests(self, rows: Iterable[Tuple[object, str, str]], config: Dict) -> Iterator[Dict]:
+        """
+        Yield request lines for (row_id, analysis_text, analysis_source) tuples. Contexts the pre-filter
+        answers locally are yielded as finished result lines (`custom_id` and `response`, no `body`).
+        """
+        contexts = config.get('sentiment_contexts') or []
+        prefilter = config.get('sentiment_prefilter') or {}
+        categories_with_desc = config.get('categorization_config', {}).get('categories_with_desc') or []
+
+        for row_id, text, source in rows:
+            if not text:
+                continue
+
+            if config.get('enable_sentiment') and contexts:
+                remaining = []
+                for index, context in enumerate(contexts):
+                    local_result = None
+                    if prefilter.get('enabled') and source in PREFILTER_SOURCES:
+                        local_result = self.relevance_filter.check(text, context, prefilter.get('aliases'))
+                    if local_result:
+                        self.stats['prefilter_skipped'] += 1
+                        yield _local_result_line(f"{row_id}{TASK_SEPARATOR}sentiment{CONTEXT_SEPARATOR}{index}", local_result)
+                    else:
+                        remaining.append(index)
+                if remaining:
+                    sentiment_text = self._prepare_text(text, 'sentiment', config)
+                    model = self.model_router.model_for(self.model_router.route('sentiment', len(sentiment_text), source, config))
+                    if len(remaining) == 1:
+                        prompt = self.sentiment_analyzer._create_sentiment_prompt(sentiment_text, contexts[remaining[0]])
+                    else:
+                        prompt = self.sentiment_analyzer._create_multi_sentiment_prompt(sentiment_text, [contexts[i] for i in remaining])
+                    task = f"sentiment{CONTEXT_SEPARATOR}{','.join(map(str, remaining))}"
+                    yield _request_line(f"{row_id}{TASK_SEPARATOR}{task}", model, prompt, 0.2)
+
+            if config.get('enable_summarize') and len(text.strip()) > 50:
+                summary_text = self._prepare_text(text, 'summary', config)
+                model = self.model_router.model_for(self.model_router.route('summary', len(summary_text), source, config))
+                prompt = self.summarizer._create_summary_prompt(summary_text, config.get('summarize_config', {}))
+                yield _request_line(f"{row_id}{TASK_SEPARATOR}summary", model, prompt, 0.5)
+
+            if config.get('enable_categorization') and categories_with_desc:
+                category_text = self._prepare_text(text, 'category', config)
+                model = self.model_router.model_for(self.model_router.route('category', len(category_text), source, config))
+                prompt = self.category_analyzer._create_category_prompt(category_text, categories_with_desc)
+                yield _request_line(f"{row_id}{TASK_SEPARATOR}category", model, prompt, 0.1)
+
+    def write_job_file(self, rows: Iterable[Tuple[object, str, str]], config: Dict, path: str, local_path: str) -> int:
+        """Write the requests to `path` and the locally answered results to `local_path`; returns the request count"""
+        count = 0
+        with open(path, 'w', encoding='utf-8') as f, open(local_path, 'w', encoding='utf-8') as local:
+            for line in self.build_requests(rows, config):
+                if 'body' in line:
+                    f.write(json.dumps(line, ensure_ascii=False) + '\n')
+                    count += 1
+                else:
+                    local.write(json.dumps(line, ensure_ascii=False) + '\n')
+        return count
+
+
+class OpenAIBatchBackend:
+    """Batch API of an OpenAI-compatible provider (files + batches endpoints)"""
+    name = 'openai'
+
+    def __init__(self, client):
+        self.client = client
+
+    def submit(self, job_file: str) -> str:
+        with open(job_file, 'rb') as f:
+            uploaded = self.client.files.create(file=f, purpose='batch')
+        batch = self.client.batches.create(input_file_id=uploaded.id, endpoint='/v1/chat/completions', completion_window='24h')
+        return batch.id
+
+    def status(self, batch_id: str) -> str:
+        return self.client.batches.retrieve(batch_id).status
+
+    def download_results(self, batch_id: str, output_path: str):
+        batch = self.client.batches.retrieve(batch_id)
+        if not batch.output_file_id:
+            raise RuntimeError(f"Batch {batch_id} has no output file (status: {batch.status})")
+        with open(output_path, 'w', encoding='utf-8') as f:
+            f.write(self.client.files.content(batch.output_file_id).text)
+
+
+class LocalFileBatchBackend:
+    """
+    File-based stand-in for a batch endpoint, for testing and small offline runs.
+    Requests are executed with a regular chat-completions client the first time the batch is polled.
+    """
+    name = 'local'
+
+    def __init__(self, work_dir: str, client=None):
+        self.work_dir = work_dir
+        self.client = client
+        os.makedirs(work_dir, exist_ok=True)
+
+    def _batch_dir(self, batch_id: str) -> str:
+        return os.path.join(self.work_dir, batch_id)
+
+    def _write_status(self, batch_id: str, status: str):
+        with open(os.path.join(self._batch_dir(batch_id), 'status'), 'w') as f:
+            f.write(status)
+
+    def submit(self, job_file: str) -> str:
+        with open(job_file, 'rb') as f:
+            digest = hashlib.sha1(f.read()).hexdigest()[:8]
+        batch_id = f"local_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{digest}"
+        os.makedirs(self._batch_dir(batch_id), exist_ok=True)
+        shutil.copy(job_file, os.path.join(self._batch_dir(batch_id), 'input.jsonl'))
+        self._write_status(batch_id, 'validating')
+        return batch_id
+
+    def status(self, batch_id: str) -> str:
+        with open(os.path.join(self._batch_dir(batch_id), 'status')) as f:
+            status = f.read().strip()
+        if status == 'validating':
+            self._process(batch_id)
+            status = 'completed'
+        return status
+
+    def _process(self, batch_id: str):
+        if self.client is None:
+            raise RuntimeError("LocalFileBatchBackend needs a client to execute requests")
+        self._write_status(batch_id, 'in_progress')
+        batch_dir = self._batch_dir(batch_id)
+        with open(os.path.join(batch_dir, 'input.jsonl'), encoding='utf-8') as src, \
+                open(os.path.join(batch_dir, 'output.jsonl'), 'w', encoding='utf-8') as dst:
+            for i, line in enumerate(src):
+                request = json.loads(line)
+                record = {"id": f"{batch_id}_{i}", "custom_id": request['custom_id'], "response": None, "error": None}
+                try:
+                    completion = self.client.chat.completions.create(**request['body'])
+                    body = completion.model_dump() if hasattr(completion, 'model_dump') else completion
+                    record['response'] = {"status_code": 200, "body": body}
+                except Exception as e:
+                    record['error'] = {"message": str(e)}
+                dst.write(json.dumps(record, ensure_ascii=False) + '\n')
+        self._write_status(batch_id, 'completed')
+
+    def download_results(self, batch_id: str, output_path: str):
+        shutil.copy(os.path.join(self._batch_dir(batch_id), 'output.jsonl'), output_path)
+
+
+def select_analysis_rows(df: pd.DataFrame, text_column: str, title_column: str) -> Iterator[Tuple[object, str, str]]:
+    """Pick the scraped content when valid, otherwise the title, like the interactive pipeline"""
+    for row_id, row in zip(df.index, df.to_dict('records')):
+        content = str(row.get(text_column) or '')
+        title = str(row.get(title_column) or '')
+        if len(content.strip()) > 100 and content != 'Gagal scraping':
+            yield row_id, content, 'content'
+        elif title and title not in ('nan', 'Gagal', 'Gagal mengambil judul'):
+            yield row_id, title, 'title_fallback'
+
+
+def _read_lines(paths: List[str]) -> Iterator[str]:
+    for path in paths:
+        if not os.path.exists(path):
+            continue
+        with open(path, encoding='utf-8') as f:
+            yield from f
+
+
+def merge_results(df: pd.DataFrame, output_paths: List[str], config: Dict, sentiment_analyzer: SentimentAnalyzer,
+                  summarizer: ArticleSummarizer, category_analyzer: CategoryAnalyzer) -> pd.DataFrame:
+    """Merge batch answers (and locally answered results) back into the DataFrame by row id"""
+    df = df.copy()
+    index_by_key = {str(i): i for i in df.index}
+    contexts = config.get('sentiment_contexts') or []
+    categories_with_desc = config.get('categorization_config', {}).get('categories_with_desc') or []
+    merged, failed = 0, 0
+
+    for line in _read_lines(output_paths):
+        record = json.loads(line)
+        row_key, task = record['custom_id'].rsplit(TASK_SEPARATOR, 1)
+        task, _, context_indices = task.partition(CONTEXT_SEPARATOR)
+        row_id = index_by_key.get(row_key)
+        if row_id is None:
+            continue
+
+        response = record.get('response') or {}
+        body = response.get('body') or {}
+        choices = body.get('choices') or []
+        error = None
+        if record.get('error') or not choices:
+            error = (record.get('error') or {}).get('message', 'Struktur respons tidak valid.')
+            content = None
+        else:
+            content = (choices[0].get('message') or {}).get('content')
+            if content is None:
+                # e.g. a refusal: the request succeeded but the model returned no text
+                error = 'Konten kosong dari model.'
+        if error:
+            failed += 1
+
+        if task == 'sentiment':
+            # Jobs built before the pre-filter ran in batch mode cover every context in one request
+            request_contexts = [contexts[int(i)] for i in context_indices.split(',')] if context_indices else contexts
+            if content is None:
+                sentiments = {c: {"sentiment": "error", "confidence": "rendah", "reasoning": error} for c in request_contexts}
+            elif len(request_contexts) == 1:
+                sentiments = {request_contexts[0]: sentiment_analyzer._parse_sentiment_response(content)}
+            else:
+                sentiments = sentiment_analyzer._parse_multi_sentiment_response(content, request_contexts)
+            for context, sentiment in sentiments.items():
+                suffix = '' if len(contexts) == 1 else f' [{context}]'
+                df.loc[row_id, f'Sentiment{suffix}'] = sentiment.get('sentiment', 'Gagal')
+                df.loc[row_id, f'Confidence{suffix}'] = sentiment.get('confidence', '')
+                df.loc[row_id, f'Reasoning{suffix}'] = sentiment.get('reasoning', '')
+        elif task == 'summary':
+            df.loc[row_id, 'Summary'] = summarizer._parse_summary_response(content)['summary'] if content else f"Gagal membuat ringkasan: {error}"
+        elif task == 'category':
+            df.loc[row_id, 'Kategori'] = category_analyzer._parse_category_response(content, categories_with_desc) if content else f"Error analisis AI: {error}"
+        merged += 1
+
+    print(f"✅ Merged {merged} batch results ({failed} failed)")
+    return df
+
+
+def wait_for_completion(backend, batch_id: str, poll_interval: float = 60, timeout: Optional[float] = None) -> str:
+    start = time.monotonic()
+    while True:
+        status = backend.status(batch_id)
+        print(f"⏳ Batch {batch_id}: {status}")
+        if status in FINAL_STATUSES:
+            return status
+        if timeout and time.monotonic() - start > timeout:
+            return status
+        time.sleep(poll_interval)
+
+
+def _build_components(state: Dict):
+    from config import GEMINI_API_KEY, GEMINI_BASE_URL, GEMINI_MODEL_LITE, GEMINI_MODEL_STANDARD
+
+    sentiment_analyzer = SentimentAnalyzer(api_key=None, base_url=None)
+    summarizer = ArticleSummarizer(api_key=None, base_url=None)
+    category_analyzer = CategoryAnalyzer(api_key=None, base_url=None)
+    model_router = ModelRouter(model_tiers={'lite': GEMINI_MODEL_LITE, 'standard': GEMINI_MODEL_STANDARD})
+
+    from openai import OpenAI
+    client = OpenAI(api_key=GEMINI_API_KEY, base_url=state.get('base_url') or GEMINI_BASE_URL)
+    if state['backend'] == 'local':
+        backend = LocalFileBatchBackend(os.path.join(state['job_dir'], 'local_backend'), client)
+    else:
+        backend = OpenAIBatchBackend(client)
+    return sentiment_analyzer, summarizer, category_analyzer, model_router, backend
+
+
+def _finish(state: Dict, poll_interval: float):
+    sentiment_analyzer, summarizer, category_analyzer, _, backend = _build_components(state)
+    output_paths = [os.path.join(state['job_dir'], 'local_results.jsonl')]
+    if state.get('batch_id'):
+        status = wait_for_completion(backend, state['batch_id'], poll_interval)
+        if status != 'completed':
+            print(f"❌ Batch ended with status '{status}'")
+            return 1
+        output_jsonl = os.path.join(state['job_dir'], 'output.jsonl')
+        backend.download_results(state['batch_id'], output_jsonl)
+        output_paths.insert(0, output_jsonl)
+
+    df = merge_results(read_table(state['input']), output_paths, state['config'], sentiment_analyzer, summarizer, category_analyzer)
+    write_table(df, state['output'])
+    print(f"✅ Output written to {state['output']}")
+    return 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Deferred batch inference for The Senticon")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    run = sub.add_parser('run', help="Build, submit, wait for and merge a batch job")
+    run.add_argument('--input', required=True, help="Scraped .xlsx/.csv file (e.g. an export with an 'Isi' column)")
+    run.add_argument('--output', required=True, help="Output .xlsx/.csv/.parquet file")
+    run.add_argument('--text-column', default='Isi')
+    run.add_argument('--title-column', default='Judul')
+    run.add_argument('--context', action='append', default=[], help="Sentiment context, repeat for several contexts")
+    run.add_argument('--summarize', action='store_true')
+    run.add_argument('--summary-type', default='Ringkas')
+    run.add_argument('--max-length', type=int, default=150)
+    run.add_argument('--language', default='Bahasa Indonesia')
+    run.add_argument('--focus', default='')
+    run.add_argument('--categories', help="Text file with one 'Kategori: deskripsi' per line")
+    run.add_argument('--no-prefilter', action='store_true', help="Send every context to the AI, even for articles that never mention it")
+    run.add_argument('--no-compression', action='store_true')
+    run.add_argument('--token-budget', type=int, default=500)
+    run.add_argument('--backend', choices=['openai', 'local'], default='openai')
+    run.add_argument('--base-url', help="Override the batch endpoint base URL")
+    run.add_argument('--job-root', default='batch_jobs')
+    run.add_argument('--poll-interval', type=float, default=60)
+
+    resume = sub.add_parser('resume', help="Keep polling a submitted job and merge its results")
+    resume.add_argument('--job-dir', required=True)
+    resume.add_argument('--poll-interval', type=float, default=60)
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'resume':
+        with open(os.path.join(args.job_dir, 'state.json'), encoding='utf-8') as f:
+            return _finish(json.load(f), args.poll_interval)
+
+    categories_with_desc = []
+    if args.categories:
+        with open(args.categories, encoding='utf-8') as f:
+            categories_with_desc = [line.strip() for line in f if line.strip()]
+
+    config = {
+        'enable_sentiment': bool(args.context), 'sentiment_contexts': args.context,
+        'sentiment_context': "\n".join(args.context) or None,
+        'sentiment_prefilter': {'enabled': not args.no_prefilter, 'aliases': {}},
+        'compression_config': {'enabled': not args.no_compression, 'token_budget': args.token_budget},
+        'enable_summarize': args.summarize,
+        'summarize_config': {'summary_type': args.summary_type, 'max_length': args.max_length,
+                             'language': args.language, 'focus_aspect': args.focus},
+        'enable_categorization': bool(categories_with_desc),
+        'categorization_config': {'categories_with_desc': categories_with_desc}
+    }
+
+    job_id = datetime.now().strftime('%Y%m%d_%H%M%S')
+    job_dir = os.path.join(args.job_root, job_id)
+    os.makedirs(job_dir, exist_ok=True)
+    state = {'job_dir': job_dir, 'input': args.input, 'output': args.output, 'backend': args.backend,
+             'base_url': args.base_url, 'config': config}
+
+    sentiment_analyzer, summarizer, category_analyzer, model_router, backend = _build_components(state)
+    builder = BatchJobBuilder(sentiment_analyzer, summarizer, category_analyzer, model_router)
+    job_file = os.path.join(job_dir, 'requests.jsonl')
+    df = read_table(args.input)
+    count = builder.write_job_file(select_analysis_rows(df, args.text_column, args.title_column), config, job_file,
+                                   os.path.join(job_dir, 'local_results.jsonl'))
+    print(f"📝 Wrote {count} requests for {len(df)} rows to {job_file} "
+          f"({builder.stats['prefilter_skipped']} contexts answered by the pre-filter, ~{builder.stats['tokens_saved']:,} tokens saved by compression)")
+    if not count and not builder.stats['prefilter_skipped']:
+        return 1
+
+    if count:
+        state['batch_id'] = backend.submit(job_file)
+    with open(os.path.join(job_dir, 'state.json'), 'w', encoding='utf-8') as f:
+        json.dump(state, f, ensure_ascii=False, indent=2)
+    if count:
+        print(f"🚀 Submitted batch {state['batch_id']} ({args.backend}). Resume with: python batch_runner.py resume --job-dir {job_dir}")
+
+    return _finish(state, args.poll_interval)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,283 @@
+"""
+Offline extraction benchmark and regression gate for the scraper.
+
+Runs every extractor over the saved pages in benchmarks/corpus/ (see make_corpus.py) and reports
+pages/second, p50/p99 latency, peak memory and per-field accuracy, overall and per domain.
+The network is blocked for the whole run, so only parsing and extraction are measured.
+
+    python benchmarks/bench_extraction.py                         # all extractors, 5 rounds
+    python benchmarks/bench_extraction.py --extractor manual --domains
+    python benchmarks/bench_extraction.py --save-baseline benchmarks/extraction_baseline.json
+    python benchmarks/bench_extraction.py --baseline benchmarks/extraction_baseline.json   # exit 1 on regression
+
+Accuracy is gated strictly (any drop beyond --accuracy-tolerance fails); latency is gated with
+--max-slowdown because it depends on the machine, so record the baseline where the gate runs.
+An extractor that is in the baseline but did not run (e.g. not installed) fails the gate with exit 3.
+"""
+import argparse
+import gzip
+import importlib.util
+import json
+import os
+import re
+import socket
+import statistics
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+DEFAULT_CORPUS_DIR = os.path.join(ROOT, 'benchmarks', 'corpus')
+FIELDS = ('title', 'content', 'publish_date', 'author')
+
+# A page's content counts as correct from this token F1 on; "Baca juga" inserts and the like cost a little
+CONTENT_F1_THRESHOLD = 0.9
+
+MONTHS = {name: i + 1 for i, name in enumerate(
+    ['januari', 'februari', 'maret', 'april', 'mei', 'juni', 'juli', 'agustus', 'september', 'oktober', 'november', 'desember'])}
+MONTHS.update({'jan': 1, 'feb': 2, 'mar': 3, 'apr': 4, 'may': 5, 'jun': 6, 'jul': 7, 'agu': 8, 'agt': 8, 'aug': 8,
+               'sep': 9, 'okt': 10, 'oct': 10, 'nov': 11, 'des': 12, 'dec': 12})
+
+
+def _block_network():
+    def refuse(*args, **kwargs):
+        raise RuntimeError("network access is disabled in the extraction benchmark")
+    socket.socket.connect = refuse
+    socket.create_connection = refuse
+
+
+def load_corpus(corpus_dir: str, domains: Optional[List[str]] = None) -> List[Dict]:
+    with open(os.path.join(corpus_dir, 'expected.json'), encoding='utf-8') as f:
+        expected = json.load(f)
+    pages = []
+    for name, entry in sorted(expected.items()):
+        if domains and name not in domains:
+            continue
+        path = os.path.join(corpus_dir, f"{name}.html")
+        if os.path.exists(path + '.gz'):
+            with gzip.open(path + '.gz', 'rb') as f:
+                html = f.read()
+        else:
+            with open(path, 'rb') as f:
+                html = f.read()
+        pages.append({'name': name, 'url': entry['url'], 'html': html, 'expected': entry})
+    return pages
+
+
+# --- Extractors: name -> factory returning extract(html, url) -> {title, content, publish_date, author} ---
+
+def _manual_extractor(parser: str) -> Callable:
+    from scraper import NewsScraper
+    scraper = NewsScraper()
+
+    def extract(html: bytes, url: str) -> Dict:
+        # What the requests and Playwright tiers run on a fetched page (`extract_article`)
+        return scraper._extract_article_from_html(html, url, basic_only=False, parser=parser) or {}
+    return extract
+
+
+def _newspaper_extractor() -> Callable:
+    from newspaper import Article
+
+    def extract(html: bytes, url: str) -> Dict:
+        article = Article(url)
+        article.download(input_html=html.decode('utf-8', errors='replace'))
+        article.parse()
+        return {'title': article.title, 'content': article.text,
+                'publish_date': str(article.publish_date) if article.publish_date else '',
+                'author': ', '.join(article.authors)}
+    return extract
+
+
+EXTRACTORS = {
+    'manual': (lambda: _manual_extractor('html.parser'), 'bs4'),
+    'manual_lxml': (lambda: _manual_extractor('lxml'), 'lxml'),
+    'newspaper3k': (_newspaper_extractor, 'newspaper'),
+}
+
+
+# --- Scoring ---
+
+def _tokens(text: str) -> List[str]:
+    return re.findall(r'\w+', (text or '').lower())
+
+
+def content_f1(extracted: str, expected: str) -> float:
+    got, want = _tokens(extracted), _tokens(expected)
+    if not got or not want:
+        return 0.0
+    counts: Dict[str, int] = {}
+    for token in want:
+        counts[token] = counts.get(token, 0) + 1
+    overlap = 0
+    for token in got:
+        if counts.get(token, 0) > 0:
+            counts[token] -= 1
+            overlap += 1
+    if not overlap:
+        return 0.0
+    precision, recall = overlap / len(got), overlap / len(want)
+    return 2 * precision * recall / (precision + recall)
+
+
+def normalize_date(value) -> Optional[str]:
+    """YYYY-MM-DD from ISO strings or Indonesian/English text like 'Rabu, 01 Mei 2024 10:15 WIB'"""
+    text = str(value or '')
+    match = re.search(r'(\d{4})-(\d{2})-(\d{2})', text)
+    if match:
+        return match.group(0)
+    match = re.search(r'(\d{1,2})\s+([A-Za-z]+)\s+(\d{4})', text)
+    if match and match.group(2).lower() in MONTHS:
+        return f"{match.group(3)}-{MONTHS[match.group(2).lower()]:02d}-{int(match.group(1)):02d}"
+    return None
+
+
+def score(result: Dict, expected: Dict) -> Dict[str, bool]:
+    title = ' '.join((result.get('title') or '').split())
+    author = result.get('author') or ''
+    return {
+        'title': title == expected['title'],
+        'content': content_f1(result.get('content') or '', expected['content']) >= CONTENT_F1_THRESHOLD,
+        'publish_date': normalize_date(result.get('publish_date')) == expected['publish_date'],
+        'author': bool(expected.get('author')) and expected['author'] in author,
+    }
+
+
+# --- Runs ---
+
+def run_extractor(extract: Callable, pages: List[Dict], rounds: int) -> Dict:
+    for page in pages:  # warm-up: selector registry, parser imports
+        extract(page['html'], page['url'])
+
+    latencies, hits = [], {field: 0 for field in FIELDS}
+    per_domain = {}
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for page in pages:
+            page_start = time.perf_counter()
+            result = extract(page['html'], page['url'])
+            latencies.append(time.perf_counter() - page_start)
+            per_domain[page['name']] = score(result, page['expected'])
+    elapsed = time.perf_counter() - start
+
+    # Separate pass: tracemalloc slows allocation-heavy code down, so it is kept out of the timings
+    tracemalloc.start()
+    for page in pages:
+        extract(page['html'], page['url'])
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    for fields in per_domain.values():
+        for field in FIELDS:
+            hits[field] += fields[field]
+    latencies.sort()
+    return {
+        'pages': len(pages),
+        'pages_per_second': round(len(latencies) / elapsed, 2),
+        'p50_ms': round(statistics.median(latencies) * 1000, 2),
+        'p99_ms': round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000, 2),
+        'peak_memory_mb': round(peak / 1024 / 1024, 2),
+        'accuracy': {field: round(hits[field] / len(pages), 3) for field in FIELDS},
+        'per_domain': per_domain,
+    }
+
+
+def missing_extractors(report: Dict, baseline: Dict, selected: Optional[List[str]] = None) -> List[str]:
+    """Baseline extractors (limited to `selected`) that produced no result in `report`, e.g. not installed"""
+    return [name for name in baseline.get('extractors', {})
+            if name not in report['extractors'] and (not selected or name in selected)]
+
+
+def compare(report: Dict, baseline: Dict, accuracy_tolerance: float, max_slowdown: float) -> List[str]:
+    """Regressions of `report` against `baseline` as readable lines; empty when the gate passes"""
+    problems = []
+    for name, base in baseline.get('extractors', {}).items():
+        current = report['extractors'].get(name)
+        if current is None:
+            # Reported separately by missing_extractors
+            continue
+        for field, base_accuracy in base['accuracy'].items():
+            if current['accuracy'].get(field, 0.0) < base_accuracy - accuracy_tolerance:
+                problems.append(f"{name}: {field} accuracy {current['accuracy'][field]:.3f} < baseline {base_accuracy:.3f}")
+        for domain, fields in base.get('per_domain', {}).items():
+            lost = [field for field, ok in fields.items() if ok and not current['per_domain'].get(domain, {}).get(field)]
+            if lost:
+                problems.append(f"{name}: {domain} no longer extracts {', '.join(lost)}")
+        if current['p50_ms'] > base['p50_ms'] * (1 + max_slowdown):
+            problems.append(f"{name}: p50 {current['p50_ms']:.2f} ms > baseline {base['p50_ms']:.2f} ms + {max_slowdown:.0%}")
+    return problems
+
+
+def print_report(report: Dict, show_domains: bool):
+    print(f"{'Extractor':<13} {'pages/s':>8} {'p50 ms':>8} {'p99 ms':>8} {'peak MB':>8}  " + '  '.join(f"{field:>12}" for field in FIELDS))
+    for name, result in report['extractors'].items():
+        accuracy = '  '.join(f"{result['accuracy'][field]:>12.0%}" for field in FIELDS)
+        print(f"{name:<13} {result['pages_per_second']:>8.1f} {result['p50_ms']:>8.2f} {result['p99_ms']:>8.2f} {result['peak_memory_mb']:>8.2f}  {accuracy}")
+    for name, skipped in report.get('skipped', {}).items():
+        print(f"{name:<13} skipped: {skipped}")
+    if show_domains:
+        for name, result in report['extractors'].items():
+            print(f"\n{name}")
+            for domain, fields in result['per_domain'].items():
+                print(f"  {domain:<24} " + ' '.join(f"{field}={'✓' if ok else '✗'}" for field, ok in fields.items()))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Offline extraction speed/accuracy benchmark")
+    parser.add_argument('--corpus', default=DEFAULT_CORPUS_DIR)
+    parser.add_argument('--extractor', choices=sorted(EXTRACTORS), action='append', help="Run only these extractors")
+    parser.add_argument('--domain', action='append', help="Run only these corpus pages")
+    parser.add_argument('--rounds', type=int, default=5)
+    parser.add_argument('--domains', action='store_true', help="Show field accuracy per domain")
+    parser.add_argument('--json', help="Write the full report to this file")
+    parser.add_argument('--save-baseline', help="Write the report as the new baseline")
+    parser.add_argument('--baseline', help="Compare with this baseline; exit 1 on a regression, 3 if a baseline extractor did not run")
+    parser.add_argument('--accuracy-tolerance', type=float, default=0.0)
+    parser.add_argument('--max-slowdown', type=float, default=0.5, help="Allowed p50 increase over the baseline (0.5 = +50%%)")
+    args = parser.parse_args()
+
+    _block_network()
+    os.chdir(ROOT)  # selectors.csv is read relative to the working directory
+    pages = load_corpus(args.corpus, args.domain)
+    if not pages:
+        print("❌ No corpus pages found", file=sys.stderr)
+        return 2
+
+    report = {'corpus_pages': len(pages), 'rounds': args.rounds, 'extractors': {}, 'skipped': {}}
+    for name, (factory, module) in EXTRACTORS.items():
+        if args.extractor and name not in args.extractor:
+            continue
+        if importlib.util.find_spec(module) is None:
+            report['skipped'][name] = f"{module} is not installed"
+            continue
+        report['extractors'][name] = run_extractor(factory(), pages, args.rounds)
+
+    print_report(report, args.domains)
+    for path in (args.json, args.save_baseline):
+        if path:
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(report, f, indent=2, sort_keys=True)
+                f.write('\n')
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        problems = compare(report, baseline, args.accuracy_tolerance, args.max_slowdown)
+        missing = missing_extractors(report, baseline, args.extractor)
+        if problems:
+            print("\n❌ Regression against the baseline:")
+            for problem in problems:
+                print(f"  - {problem}")
+            return 1
+        if missing:
+            print(f"\n❌ Baseline extractor(s) not run: {', '.join(missing)} ({'; '.join(report['skipped'].get(name, 'no result') for name in missing)})")
+            return 3
+        print("\n✅ No regression against the baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,105 @@
+"""
+Cold-start benchmark for The Senticon.
+
+Measures, each in a fresh interpreter so nothing is already imported:
+  - `import app` (everything the Streamlit script pulls in before the first render)
+  - building a NewsProcessor (scraper with selectors.csv, AI clients)
+  - the first script run and a rerun of the page (Streamlit AppTest), i.e. what a widget click costs
+
+    python benchmarks/bench_startup.py --repeat 5
+    python benchmarks/bench_startup.py --importtime   # slowest imports of `app`
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from typing import Dict, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SCENARIOS = {
+    'import app': """
+import time
+start = time.perf_counter()
+import app
+print(time.perf_counter() - start)
+""",
+    'NewsProcessor()': """
+import time
+from news_processor import NewsProcessor
+start = time.perf_counter()
+NewsProcessor('bench-key', 'http://localhost:9/v1')
+print(time.perf_counter() - start)
+""",
+    'first page run': """
+import time
+from streamlit.testing.v1 import AppTest
+start = time.perf_counter()
+AppTest.from_file('app.py', default_timeout=120).run()
+print(time.perf_counter() - start)
+""",
+    'page rerun': """
+import time
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file('app.py', default_timeout=120).run()
+start = time.perf_counter()
+at.run()
+print(time.perf_counter() - start)
+""",
+}
+
+
+def run_scenario(code: str) -> float:
+    env = {**os.environ, 'GEMINI_API_KEY': os.environ.get('GEMINI_API_KEY', 'bench-key'),
+           'GEMINI_BASE_URL': os.environ.get('GEMINI_BASE_URL', 'http://localhost:9/v1')}
+    completed = subprocess.run([sys.executable, '-c', code], cwd=ROOT, env=env, capture_output=True, text=True)
+    if completed.returncode != 0:
+        raise RuntimeError(completed.stderr.strip().splitlines()[-1] if completed.stderr.strip() else 'failed')
+    return float(completed.stdout.strip().splitlines()[-1])
+
+
+def slowest_imports(limit: int = 15) -> List[tuple]:
+    """Top-level packages by cumulative import time, from `python -X importtime -c 'import app'`"""
+    completed = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import app'], cwd=ROOT, capture_output=True, text=True)
+    totals: Dict[str, int] = {}
+    for line in completed.stderr.splitlines():
+        if not line.startswith('import time:') or '|' not in line:
+            continue
+        _, cumulative, name = line.split('|')
+        if not cumulative.strip().isdigit():
+            continue
+        module = name.strip()
+        # Only direct children of the root count, nested imports are included in them
+        if len(name) - len(name.lstrip()) <= 3:
+            totals[module] = max(totals.get(module, 0), int(cumulative))
+    return sorted(totals.items(), key=lambda item: -item[1])[:limit]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Measure app cold start and rerun cost")
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--only', choices=sorted(SCENARIOS), action='append', help="Run only these scenarios")
+    parser.add_argument('--importtime', action='store_true', help="List the slowest imports of `app` instead")
+    args = parser.parse_args()
+
+    if args.importtime:
+        for module, micros in slowest_imports():
+            print(f"{micros / 1000:9.1f} ms  {module}")
+        return 0
+
+    print(f"{'Scenario':<18} {'median (s)':>10} {'min (s)':>9} {'max (s)':>9}")
+    for name, code in SCENARIOS.items():
+        if args.only and name not in args.only:
+            continue
+        try:
+            timings = [run_scenario(code) for _ in range(args.repeat)]
+        except RuntimeError as e:
+            print(f"{name:<18} skipped: {e}")
+            continue
+        print(f"{name:<18} {statistics.median(timings):>10.3f} {min(timings):>9.3f} {max(timings):>9.3f}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,267 @@
+"""
+Local OpenAI-compatible chat-completions stub for load testing the analysis pipeline without using quota.
+
+Answers the prompts of the sentiment (single and multi-context), summary and category analyzers with
+canned JSON in the shape they parse, chosen deterministically from the prompt. Latency, error and
+rate-limit behaviour are configurable, including a provider-style concurrency cap:
+
+    python benchmarks/llm_stub_server.py --port 8399 --latency lognormal:0.8:0.5 --latency summary=lognormal:2.0:0.4 \\
+        --rate-limit-rate 0.02 --error-rate 0.01 --max-concurrent 32
+
+    GEMINI_BASE_URL=http://127.0.0.1:8399/v1 GEMINI_API_KEY=stub streamlit run app.py
+
+Latency specs: `fixed:S`, `uniform:LOW:HIGH`, `normal:MEAN:SD`, `lognormal:MEDIAN:SIGMA` (seconds), optionally
+prefixed with a task (`sentiment=`, `sentiment_multi=`, `summary=`, `category=`). Streaming requests
+(`stream=True`, used for live summaries) are answered as server-sent events. GET /stats returns the
+request counts per task and status.
+"""
+import argparse
+import json
+import math
+import random
+import re
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional
+
+TASKS = ('sentiment', 'sentiment_multi', 'summary', 'category')
+
+
+def parse_latency(spec: str) -> Callable[[random.Random], float]:
+    kind, *values = spec.split(':')
+    values = [float(value) for value in values]
+    if kind == 'fixed' and len(values) == 1:
+        return lambda rng: values[0]
+    if kind == 'uniform' and len(values) == 2:
+        return lambda rng: rng.uniform(values[0], values[1])
+    if kind == 'normal' and len(values) == 2:
+        return lambda rng: max(0.0, rng.gauss(values[0], values[1]))
+    if kind == 'lognormal' and len(values) == 2:
+        return lambda rng: rng.lognormvariate(math.log(values[0]), values[1])
+    raise ValueError(f"Invalid latency spec: {spec}")
+
+
+def detect_task(prompt: str) -> str:
+    if '"results"' in prompt and 'DAFTAR KONTEKS' in prompt:
+        return 'sentiment_multi'
+    if 'Analisis sentimen' in prompt:
+        return 'sentiment'
+    if 'CATEGORY LIST' in prompt:
+        return 'category'
+    return 'summary'
+
+
+def _pick(options: List[str], prompt: str) -> str:
+    # Same prompt, same answer: reruns of a load test compare like with like
+    return options[zlib.crc32(prompt.encode('utf-8')) % len(options)]
+
+
+def _section(prompt: str, header: str) -> List[str]:
+    """Non-empty lines after `header` up to the next blank line"""
+    lines, started = [], False
+    for line in prompt.splitlines():
+        if header in line:
+            started = True
+            continue
+        if started:
+            if not line.strip():
+                break
+            lines.append(line.strip())
+    return lines
+
+
+def canned_answer(task: str, prompt: str) -> Dict:
+    sentiment = _pick(['positif', 'negatif', 'netral'], prompt)
+    if task == 'sentiment':
+        return {'sentiment': sentiment, 'confidence': 'tinggi', 'reasoning': f"Jawaban stub: artikel bernada {sentiment}."}
+    if task == 'sentiment_multi':
+        contexts = [re.sub(r'^\d+\.\s*', '', line) for line in _section(prompt, 'DAFTAR KONTEKS')]
+        return {'results': [{'context': context, 'sentiment': _pick(['positif', 'negatif', 'netral'], prompt + context),
+                             'confidence': 'sedang', 'reasoning': "Jawaban stub."} for context in contexts]}
+    if task == 'category':
+        names = [re.split(r'[:(]', line[2:], 1)[0].strip() for line in _section(prompt, 'CATEGORY LIST') if line.startswith('- ')]
+        return {'category': _pick(names or ['Lain-lain'], prompt)}
+    max_words = int((re.search(r'Maximum (\d+) words', prompt) or [None, 60])[1])
+    article = ' '.join(_section(prompt, 'ARTICLE:')) or "Ringkasan stub."
+    return {'summary': ' '.join(article.split()[:max_words])}
+
+
+class StubState:
+    def __init__(self, args: argparse.Namespace):
+        self.rng = random.Random(args.seed)
+        self.rng_lock = threading.Lock()
+        self.latency = {task: parse_latency(args.default_latency) for task in TASKS}
+        for spec in args.latency or []:
+            task, _, value = spec.rpartition('=')
+            for name in ([task] if task else TASKS):
+                if name not in TASKS:
+                    raise ValueError(f"Unknown task in latency spec: {spec}")
+                self.latency[name] = parse_latency(value)
+        self.error_rate = args.error_rate
+        self.rate_limit_rate = args.rate_limit_rate
+        self.malformed_rate = args.malformed_rate
+        self.max_concurrent = args.max_concurrent
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.counts: Dict[str, int] = {}
+        self.lock = threading.Lock()
+
+    def draw(self, task: str) -> tuple:
+        """(latency, roll) for one request"""
+        with self.rng_lock:
+            return self.latency[task](self.rng), self.rng.random()
+
+    def count(self, task: str, status: str):
+        with self.lock:
+            key = f"{task}:{status}"
+            self.counts[key] = self.counts.get(key, 0) + 1
+
+    def enter(self) -> bool:
+        with self.lock:
+            if self.max_concurrent and self.in_flight >= self.max_concurrent:
+                return False
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+            return True
+
+    def leave(self):
+        with self.lock:
+            self.in_flight -= 1
+
+
+def make_handler(state: StubState):
+    class StubHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def log_message(self, *args):
+            pass
+
+        def _send_json(self, status: int, payload: Dict, headers: Optional[Dict] = None):
+            body = json.dumps(payload).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _error(self, status: int, message: str, kind: str, headers: Optional[Dict] = None):
+            self._send_json(status, {'error': {'message': message, 'type': kind, 'code': status}}, headers)
+
+        def do_GET(self):
+            if self.path.rstrip('/').endswith('/models'):
+                self._send_json(200, {'object': 'list', 'data': [{'id': 'stub-model', 'object': 'model'}]})
+            elif self.path.rstrip('/') == '/stats':
+                with state.lock:
+                    self._send_json(200, {'counts': dict(state.counts), 'in_flight': state.in_flight,
+                                          'peak_in_flight': state.peak_in_flight})
+            else:
+                self._error(404, 'not found', 'not_found')
+
+        def do_POST(self):
+            request = json.loads(self.rfile.read(int(self.headers.get('Content-Length') or 0)) or b'{}')
+            if not self.path.rstrip('/').endswith('/chat/completions'):
+                self._error(404, 'not found', 'not_found')
+                return
+            prompt = '\n'.join(str(message.get('content', '')) for message in request.get('messages', []))
+            task = detect_task(prompt)
+            latency, roll = state.draw(task)
+
+            if not state.enter():
+                state.count(task, '429_concurrency')
+                self._error(429, 'Too many concurrent requests (stub)', 'rate_limit_exceeded', {'Retry-After': '1'})
+                return
+            try:
+                if roll < state.rate_limit_rate:
+                    state.count(task, '429')
+                    self._error(429, 'Rate limit reached (stub)', 'rate_limit_exceeded', {'Retry-After': '1'})
+                    return
+                if roll < state.rate_limit_rate + state.error_rate:
+                    time.sleep(latency / 2)
+                    state.count(task, '500')
+                    self._error(500, 'Internal error (stub)', 'server_error')
+                    return
+
+                content = json.dumps(canned_answer(task, prompt), ensure_ascii=False)
+                if roll < state.rate_limit_rate + state.error_rate + state.malformed_rate:
+                    content = content[:len(content) // 2]
+                usage = {'prompt_tokens': max(1, len(prompt) // 4), 'completion_tokens': max(1, len(content) // 4)}
+                usage['total_tokens'] = usage['prompt_tokens'] + usage['completion_tokens']
+                model = request.get('model', 'stub-model')
+                if request.get('stream'):
+                    self._stream(content, model, usage, latency, (request.get('stream_options') or {}).get('include_usage'))
+                else:
+                    time.sleep(latency)
+                    self._send_json(200, {
+                        'id': f"chatcmpl-stub-{zlib.crc32(prompt.encode('utf-8')):x}", 'object': 'chat.completion',
+                        'created': int(time.time()), 'model': model,
+                        'choices': [{'index': 0, 'finish_reason': 'stop', 'message': {'role': 'assistant', 'content': content}}],
+                        'usage': usage
+                    })
+                state.count(task, '200')
+            finally:
+                state.leave()
+
+        def _stream(self, content: str, model: str, usage: Dict, latency: float, include_usage: bool):
+            """Server-sent events: ~30% of the latency before the first token, the rest spread over the chunks"""
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/event-stream')
+            self.send_header('Connection', 'close')
+            self.end_headers()
+            self.close_connection = True
+            pieces = [content[i:i + 24] for i in range(0, len(content), 24)] or ['']
+            time.sleep(latency * 0.3)
+            base = {'id': 'chatcmpl-stub-stream', 'object': 'chat.completion.chunk', 'created': int(time.time()), 'model': model}
+            for i, piece in enumerate(pieces):
+                delta = {'content': piece} if i else {'role': 'assistant', 'content': piece}
+                finish = 'stop' if i == len(pieces) - 1 else None
+                self._event({**base, 'choices': [{'index': 0, 'delta': delta, 'finish_reason': finish}]})
+                time.sleep(latency * 0.7 / len(pieces))
+            if include_usage:
+                self._event({**base, 'choices': [], 'usage': usage})
+            self.wfile.write(b'data: [DONE]\n\n')
+            self.wfile.flush()
+
+        def _event(self, payload: Dict):
+            self.wfile.write(f"data: {json.dumps(payload, ensure_ascii=False)}\n\n".encode('utf-8'))
+            self.wfile.flush()
+
+    return StubHandler
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="OpenAI-compatible stub for load tests")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8399)
+    parser.add_argument('--default-latency', default='lognormal:0.8:0.5', help="Latency of every task without its own spec")
+    parser.add_argument('--latency', action='append', help="[task=]spec, repeatable")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="Share of requests answered with HTTP 500")
+    parser.add_argument('--rate-limit-rate', type=float, default=0.0, help="Share of requests answered with HTTP 429")
+    parser.add_argument('--malformed-rate', type=float, default=0.0, help="Share of answers with truncated (invalid) JSON")
+    parser.add_argument('--max-concurrent', type=int, default=0, help="Answer 429 beyond this many requests in flight (0 = no cap)")
+    parser.add_argument('--seed', type=int, default=1)
+    return parser
+
+
+def start_stub_server(args: argparse.Namespace) -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(StubState(args)))
+    server.daemon_threads = True
+    return server
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    server = start_stub_server(args)
+    print(f"🧪 LLM stub listening on http://{args.host}:{args.port}/v1", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
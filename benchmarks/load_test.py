@@ -0,0 +1,177 @@
+"""
+Load test of the analysis pipeline against the local LLM stub (benchmarks/llm_stub_server.py).
+
+Runs the same pipeline the app's "Upload Excel" jobs and the CLI use (NewsProcessor.process_rows_async:
+multi-context sentiment, summary and category per row) over synthetic title-only rows, once per
+AI worker setting, and reports rows/second, row and AI-call latency percentiles, and what the stub
+answered (200/429/5xx). No quota is used and nothing is scraped.
+
+    python benchmarks/load_test.py --rows 200 --workers 4,8,16,32
+    python benchmarks/load_test.py --workers 8,32 --max-concurrent 16 --rate-limit-rate 0.02   # provider limits
+    python benchmarks/load_test.py --base-url http://127.0.0.1:8399/v1                          # stub already running
+
+The stub runs in its own process so its threads don't compete with the pipeline for the GIL.
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from typing import Dict, List, Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import pandas as pd  # noqa: E402
+
+from metrics import METRICS  # noqa: E402
+from model_router import ROUTING_POLICIES  # noqa: E402
+from news_processor import NewsProcessor  # noqa: E402
+
+SUBJECTS = ['Pemerintah', 'Bank Indonesia', 'Toyota Astra Motor', 'Telkom Indonesia', 'Otoritas Jasa Keuangan', 'Para pedagang']
+TOPICS = ['pertumbuhan ekonomi nasional', 'penjualan mobil listrik', 'harga bahan pokok', 'stabilitas rupiah', 'layanan digital']
+CATEGORIES = ['Ekonomi: berita bisnis, pasar, dan keuangan', 'Otomotif: kendaraan dan industrinya',
+              'Teknologi: digital, telekomunikasi, dan inovasi', 'Politik: pemerintahan dan kebijakan publik']
+
+
+def make_rows(count: int) -> pd.DataFrame:
+    titles = [f"{SUBJECTS[i % len(SUBJECTS)]} optimistis soal {TOPICS[i % len(TOPICS)]} pada kuartal ini, kata pejabat nomor {i}"
+              for i in range(count)]
+    return pd.DataFrame({'URL': [f"https://example.com/berita/{i}" for i in range(count)], 'Judul': titles})
+
+
+def make_config(workers: int, trace_path: str) -> Dict:
+    contexts = ['Toyota', 'Bank Indonesia']
+    return {
+        'enable_scraping': False, 'enable_date': False, 'enable_journalist': False,
+        'enable_sentiment': True, 'enable_summarize': True, 'enable_categorization': True,
+        'sentiment_context': "\n".join(contexts), 'sentiment_contexts': contexts,
+        # Every row has to reach the AI; the local pre-filter would answer most of them
+        'sentiment_prefilter': {'enabled': False, 'aliases': {}},
+        'analysis_source_option': 'Hanya Judul',
+        'summarize_config': {'summary_type': 'Ringkas', 'max_length': 60, 'language': 'Bahasa Indonesia', 'focus_aspect': ''},
+        'categorization_config': {'categories_with_desc': CATEGORIES, 'categories': [c.split(':')[0] for c in CATEGORIES]},
+        'stream_summaries': False, 'scraping_timeout': 10,
+        'compression_config': {'enabled': True, 'token_budget': 500},
+        'routing_policy': ROUTING_POLICIES[0], 'hedging_config': {'enabled': False, 'max_hedge_ratio': 0.1}, 'budget_config': {},
+        'pipeline_config': {'fetch_workers': 8, 'extract_workers': 2, 'analyze_workers': workers, 'queue_size': 32},
+        # Tracing gives the per-row duration (Durasi_Detik)
+        'trace_config': {'enabled': True, 'path': trace_path},
+        'column_mapping': {'url_column': 'URL', 'snippet_column': None},
+    }
+
+
+def _percentile(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+
+def stub_stats(base_url: str) -> Dict[str, int]:
+    root = base_url.rstrip('/')
+    root = root[:-3] if root.endswith('/v1') else root
+    with urllib.request.urlopen(f"{root}/stats", timeout=5) as response:
+        return json.load(response)['counts']
+
+
+def start_stub(args: argparse.Namespace) -> subprocess.Popen:
+    command = [sys.executable, os.path.join(ROOT, 'benchmarks', 'llm_stub_server.py'), '--port', str(args.port),
+               '--default-latency', args.default_latency, '--error-rate', str(args.error_rate),
+               '--rate-limit-rate', str(args.rate_limit_rate), '--max-concurrent', str(args.max_concurrent)]
+    for spec in args.latency or []:
+        command += ['--latency', spec]
+    process = subprocess.Popen(command, stdout=subprocess.DEVNULL)
+    base_url = f"http://127.0.0.1:{args.port}/v1"
+    deadline = time.time() + 15
+    while time.time() < deadline:
+        try:
+            stub_stats(base_url)
+            return process
+        except OSError:
+            time.sleep(0.1)
+    process.kill()
+    raise SystemExit("❌ LLM stub did not start")
+
+
+def run_once(processor: NewsProcessor, base_url: str, rows: pd.DataFrame, workers: int) -> Dict:
+    METRICS.reset()
+    before = stub_stats(base_url)
+    with tempfile.TemporaryDirectory() as tmp:
+        config = make_config(workers, os.path.join(tmp, 'trace.json'))
+        start = time.perf_counter()
+        results = asyncio.run(processor.process_rows_async(rows.copy(), config['column_mapping'], config))
+        elapsed = time.perf_counter() - start
+    after = stub_stats(base_url)
+    answered = {key: after.get(key, 0) - before.get(key, 0) for key in after}
+    by_status: Dict[str, int] = {}
+    for key, count in answered.items():
+        status = key.split(':', 1)[1]
+        by_status[status] = by_status.get(status, 0) + count
+
+    row_seconds = [float(value) for value in results.get('Durasi_Detik_New', pd.Series(dtype=float)).dropna()]
+    call_seconds = config['job_stats']['routing'].latencies()
+    failed_rows = int(results['Error_New'].notna().sum()) if 'Error_New' in results.columns else 0
+    failed_rows += int(results['Summary_New'].isin(['Gagal', 'Gagal AI']).sum()) if 'Summary_New' in results.columns else 0
+    return {
+        'workers': workers,
+        'rows': len(results),
+        'seconds': round(elapsed, 2),
+        'rows_per_second': round(len(results) / elapsed, 2),
+        'row_p50_s': round(_percentile(row_seconds, 0.5), 3),
+        'row_p99_s': round(_percentile(row_seconds, 0.99), 3),
+        'llm_calls': len(call_seconds),
+        'llm_p50_s': round(statistics.median(call_seconds), 3) if call_seconds else 0.0,
+        'llm_p99_s': round(_percentile(call_seconds, 0.99), 3),
+        'http_200': by_status.get('200', 0),
+        'http_429': by_status.get('429', 0) + by_status.get('429_concurrency', 0),
+        'http_5xx': by_status.get('500', 0),
+        'failed_rows': failed_rows,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Load test the analysis pipeline against the local LLM stub")
+    parser.add_argument('--rows', type=int, default=200)
+    parser.add_argument('--workers', default='4,8,16', help="Comma-separated AI worker counts to compare")
+    parser.add_argument('--base-url', help="Use a stub (or any compatible server) that is already running")
+    parser.add_argument('--port', type=int, default=8399)
+    parser.add_argument('--default-latency', default='lognormal:0.8:0.5')
+    parser.add_argument('--latency', action='append', help="[task=]spec, passed to the stub")
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--rate-limit-rate', type=float, default=0.0)
+    parser.add_argument('--max-concurrent', type=int, default=0)
+    parser.add_argument('--json', help="Write the results to this file")
+    args = parser.parse_args(argv)
+
+    stub = None if args.base_url else start_stub(args)
+    base_url = args.base_url or f"http://127.0.0.1:{args.port}/v1"
+    try:
+        # Built once like the app's cached processor; the AI clients are reused across runs
+        processor = NewsProcessor('stub-key', base_url)
+        rows = make_rows(args.rows)
+        results = []
+        for workers in [int(value) for value in args.workers.split(',') if value.strip()]:
+            print(f"▶️ {args.rows} rows with {workers} AI workers...", file=sys.stderr)
+            results.append(run_once(processor, base_url, rows, workers))
+    finally:
+        if stub:
+            stub.terminate()
+            stub.wait()
+
+    columns = list(results[0].keys()) if results else []
+    print(pd.DataFrame(results, columns=columns).to_string(index=False))
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+            f.write('\n')
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,226 @@
+"""
+Builds the offline extraction corpus in benchmarks/corpus/.
+
+One gzipped HTML page per domain plus `expected.json` with the title, content, publish date and author
+each page should yield. Pages for domains with site-specific selectors in selectors.csv are marked up to
+match those selectors; the other popular domains use common CMS layouts that only the generic strategies
+can handle. Every page carries the usual noise of a news site (navigation, inline scripts, ad slots,
+share buttons, related links, "Baca juga" inserts, footer), and the date is published in one of four
+ways (meta tag, <time datetime>, JSON-LD, visible text only).
+
+The output is deterministic, so the corpus only changes when this script does:
+
+    python benchmarks/make_corpus.py
+
+Saved real pages can be added next to the generated ones: drop `<name>.html` (or `.html.gz`) into the
+corpus folder and add an entry with the same name to `expected.json`.
+"""
+import argparse
+import csv
+import gzip
+import json
+import os
+import random
+import re
+from html import escape
+from typing import Dict, List, Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_CORPUS_DIR = os.path.join(ROOT, 'benchmarks', 'corpus')
+
+# Popular domains whose row in selectors.csv has title, author and content selectors
+SELECTOR_DOMAINS = [
+    'antaranews.com', 'kumparan.com', 'tempo.co', 'en.tempo.co', 'travel.detik.com', 'medan.tribunnews.com',
+    'brilio.net', 'medcom.id', 'wartaekonomi.co.id', 'krakatoa.id', 'pikiran-rakyat.com', 'voi.id', 'urbanasia.com',
+]
+
+# Popular domains without usable selectors; their markup follows the layouts these CMSs commonly use
+GENERIC_LAYOUTS = {
+    'detik.com': {'title': 'h1.detail__title', 'author': 'div.detail__author', 'date': 'div.detail__date',
+                  'content': 'div.detail__body-text.itp_bodycontent'},
+    'kompas.com': {'title': 'h1.read__title', 'author': 'div.read__credit__item', 'date': 'div.read__time',
+                   'content': 'div.read__content'},
+    'cnnindonesia.com': {'title': 'h1.mb-2', 'author': 'div.text-cnn_grey.text-sm', 'date': 'div.text-cnn_grey.text-sm',
+                         'content': 'div.detail-text'},
+    'liputan6.com': {'title': 'h1.read-page--header--title', 'author': 'span.read-page--header--author__name',
+                     'date': 'time.read-page--header--author__datetime', 'content': 'div.article-content-body__item-content'},
+    'okezone.com': {'title': 'div.title h1', 'author': 'div.namerep', 'date': 'div.namerep b', 'content': 'div#contentx'},
+    'cnbcindonesia.com': {'title': 'h1', 'author': 'div.author', 'date': 'div.date', 'content': 'div.detail_text'},
+    'republika.co.id': {'title': 'div.max-card__title h1', 'author': 'div.date-post span', 'date': 'div.date-post',
+                        'content': 'div.article-content'},
+}
+
+MONTHS = ['Januari', 'Februari', 'Maret', 'April', 'Mei', 'Juni', 'Juli', 'Agustus', 'September', 'Oktober', 'November', 'Desember']
+DAYS = ['Senin', 'Selasa', 'Rabu', 'Kamis', 'Jumat', 'Sabtu', 'Minggu']
+AUTHORS = ['Budi Santoso', 'Rina Wulandari', 'Ahmad Fauzi', 'Dewi Lestari', 'Yoga Pratama', 'Siti Rahmawati', 'Hendra Gunawan']
+SUBJECTS = ['Pemerintah', 'Bank Indonesia', 'Kementerian Keuangan', 'Toyota Astra Motor', 'Telkom Indonesia', 'Warga Jakarta',
+            'Para pedagang', 'Otoritas Jasa Keuangan', 'Pemerintah daerah', 'Pelaku usaha kecil']
+VERBS = ['mengumumkan', 'menargetkan', 'memperkirakan', 'menyoroti', 'mendorong', 'mengevaluasi', 'menyiapkan', 'menegaskan']
+OBJECTS = ['pertumbuhan ekonomi nasional', 'harga bahan pokok di pasar tradisional', 'penjualan mobil listrik',
+           'program subsidi energi', 'digitalisasi layanan publik', 'stabilitas nilai tukar rupiah',
+           'pembangunan infrastruktur daerah', 'penyaluran kredit usaha rakyat', 'inflasi bulan ini']
+TAILS = ['dalam beberapa bulan ke depan', 'sesuai target yang ditetapkan', 'meski ada tekanan global',
+         'setelah rapat koordinasi di Jakarta', 'menurut data terbaru', 'dengan melibatkan berbagai pihak']
+
+
+def _split_selector(selector: str) -> List[str]:
+    """Compound selectors of a descendant chain; spaces inside [...] don't split"""
+    parts, depth, current = [], 0, ''
+    for char in selector.strip():
+        depth += char == '['
+        depth -= char == ']'
+        if char == ' ' and depth == 0:
+            if current:
+                parts.append(current)
+            current = ''
+        else:
+            current += char
+    if current:
+        parts.append(current)
+    return parts
+
+
+def _open_tag(compound: str) -> tuple:
+    """('div', ' class="a b" id="x"') for e.g. `div#x.a.b` or `div[class="a b"]`"""
+    name = re.match(r'^[a-zA-Z0-9]*', compound).group(0)
+    tag, rest = name or 'div', compound[len(name):]
+    classes, attrs = [], {}
+    for attr, value in re.findall(r'\[([\w-]+)=["\']([^"\']*)["\']\]', rest):
+        if attr == 'class':
+            classes.extend(value.split())
+        else:
+            attrs[attr] = value
+    for kind, value in re.findall(r'([.#])([\w-]+)', re.sub(r'\[.*?\]', '', rest)):
+        if kind == '.':
+            classes.append(value)
+        else:
+            attrs['id'] = value
+    if classes:
+        attrs['class'] = ' '.join(classes)
+    return tag, ''.join(f' {attr}="{escape(value)}"' for attr, value in attrs.items())
+
+
+def markup(selector: str, inner_html: str, extra_attrs: str = '') -> str:
+    """Nested elements that `soup.select(selector)` finds, with `inner_html` in the innermost one"""
+    html = inner_html
+    for i, compound in enumerate(reversed(_split_selector(selector))):
+        tag, attrs = _open_tag(compound)
+        html = f"<{tag}{attrs}{extra_attrs if i == 0 else ''}>{html}</{tag}>"
+    return html
+
+
+def _sentence(rng: random.Random) -> str:
+    return f"{rng.choice(SUBJECTS)} {rng.choice(VERBS)} {rng.choice(OBJECTS)} {rng.choice(TAILS)}."
+
+
+def _paragraph(rng: random.Random) -> str:
+    return ' '.join(_sentence(rng) for _ in range(rng.randint(2, 4)))
+
+
+def _noise(rng: random.Random, domain: str) -> Dict[str, str]:
+    links = ''.join(f'<li><a href="https://{domain}/kanal/{i}">Kanal {i}</a></li>' for i in range(40))
+    # Minified tracking/ad code of a typical page, ~12 KB
+    script = 'var _q=window._q||[];' + ''.join(f'_q.push(["slot{i}","{rng.getrandbits(64):x}",{i}]);' for i in range(400))
+    related = ''.join(f'<li><a href="https://{domain}/berita/{rng.randint(1000, 9999)}">{escape(_sentence(rng))}</a></li>' for _ in range(8))
+    return {
+        'head': f'<script>{script}</script><style>.x{{display:none}}</style>',
+        'header': f'<header><nav class="main-nav"><ul>{links}</ul></nav></header>',
+        'ads': '<div class="ads-slot"><script>googletag.cmd.push(function(){});</script>ADVERTISEMENT</div>',
+        'share': '<div class="share-box"><a href="#">Facebook</a><a href="#">Twitter</a><a href="#">WhatsApp</a></div>',
+        'related': f'<aside class="sidebar"><h3>Berita Terkait</h3><ul>{related}</ul></aside>',
+        'footer': f'<footer><p>Copyright © 2024 {domain}. All rights reserved.</p>{links[:800]}</footer>',
+    }
+
+
+def build_page(domain: str, layout: Dict[str, Optional[str]], index: int) -> tuple:
+    """(html, expected) for one synthetic article"""
+    rng = random.Random(f"{domain}-{index}")
+    day, month, hour = rng.randint(1, 28), rng.randint(1, 12), rng.randint(6, 22)
+    iso_date = f"2024-{month:02d}-{day:02d}"
+    visible_date = f"{rng.choice(DAYS)}, {day:02d} {MONTHS[month - 1]} 2024 {hour:02d}:{rng.randint(0, 59):02d} WIB"
+    title = f"{rng.choice(SUBJECTS)} {rng.choice(VERBS)} {rng.choice(OBJECTS)}"
+    author = rng.choice(AUTHORS)
+    paragraphs = [_paragraph(rng) for _ in range(rng.randint(6, 12))]
+    noise = _noise(rng, domain)
+
+    body_parts = [f"<p>{escape(paragraph)}</p>" for paragraph in paragraphs]
+    body_parts.insert(2, f'<p>Baca juga: <a href="https://{domain}/berita/{rng.randint(1000, 9999)}">{escape(_sentence(rng))}</a></p>')
+    body_parts.insert(5, noise['ads'])
+
+    # The four ways sites publish the date, round-robin over the corpus
+    date_style = ('meta', 'time', 'json_ld', 'text')[index % 4]
+    head = noise['head']
+    if date_style == 'meta':
+        head += f'<meta property="article:published_time" content="{iso_date}T{hour:02d}:00:00+07:00">'
+    elif date_style == 'json_ld':
+        head += ('<script type="application/ld+json">'
+                 + json.dumps({'@type': 'NewsArticle', 'headline': title, 'datePublished': f"{iso_date}T{hour:02d}:00:00+07:00"})
+                 + '</script>')
+    date_attrs = f' datetime="{iso_date}T{hour:02d}:00:00+07:00"' if date_style == 'time' else ''
+    date_selector = layout.get('date') or 'div.article-date'
+    if date_style == 'time' and not date_selector.split()[-1].startswith('time'):
+        date_html = markup(date_selector, f'<time{date_attrs}>{visible_date}</time>')
+    else:
+        date_html = markup(date_selector, visible_date, date_attrs)
+
+    title_selector = layout.get('title') or 'h1'
+    author_selector = layout.get('author') or 'span.author'
+    # Some sites share one element for author and date
+    byline = (markup(author_selector, f"{author} - {date_html}") if author_selector == date_selector
+              else markup(author_selector, author) + date_html)
+    article = (markup(title_selector, escape(title)) + byline + noise['share']
+               + markup(layout.get('content') or 'div.article-content', ''.join(body_parts)) + noise['share'])
+
+    html = (f'<!DOCTYPE html><html lang="id"><head><meta charset="utf-8"><title>{escape(title)} - {domain}</title>{head}</head>'
+            f'<body>{noise["header"]}<main><div class="container">{article}</div>{noise["related"]}</main>{noise["footer"]}</body></html>')
+    expected = {
+        'url': f"https://{domain}/berita/{2024000 + index}/{re.sub(r'[^a-z]+', '-', title.lower()).strip('-')}",
+        'title': title,
+        'content': ' '.join(paragraphs),
+        'publish_date': iso_date,
+        'author': author,
+        'date_style': date_style,
+        'has_site_selectors': domain not in GENERIC_LAYOUTS,
+    }
+    return html, expected
+
+
+def load_selector_layouts(path: str, domains: List[str]) -> Dict[str, Dict[str, str]]:
+    """First selector per field of `domains`, as in selectors.csv"""
+    columns = {'Judul': 'title', 'Tanggal': 'date', 'Reporter': 'author', 'Isi': 'content'}
+    layouts = {}
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        for row in csv.DictReader(f):
+            domain = (row.get('Media') or '').strip()
+            if domain in domains and domain not in layouts:
+                layouts[domain] = {field: (row.get(column) or '').strip() or None for column, field in columns.items()}
+    missing = [domain for domain in domains if domain not in layouts]
+    if missing:
+        raise SystemExit(f"Domains not in {path}: {', '.join(missing)}")
+    return layouts
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Generate the offline extraction benchmark corpus")
+    parser.add_argument('--output', default=DEFAULT_CORPUS_DIR)
+    parser.add_argument('--selectors', default=os.path.join(ROOT, 'selectors.csv'))
+    args = parser.parse_args()
+
+    layouts = load_selector_layouts(args.selectors, SELECTOR_DOMAINS)
+    layouts.update(GENERIC_LAYOUTS)
+    os.makedirs(args.output, exist_ok=True)
+    expected = {}
+    for index, (domain, layout) in enumerate(layouts.items()):
+        html, expected[domain] = build_page(domain, layout, index)
+        # mtime=0 keeps the gzip bytes identical between runs
+        with gzip.GzipFile(os.path.join(args.output, f"{domain}.html.gz"), 'wb', mtime=0) as f:
+            f.write(html.encode('utf-8'))
+    with open(os.path.join(args.output, 'expected.json'), 'w', encoding='utf-8') as f:
+        json.dump(expected, f, ensure_ascii=False, indent=2, sort_keys=True)
+        f.write('\n')
+    print(f"📦 Wrote {len(expected)} pages to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,226 @@
+"""
+Record/replay of a job's network traffic.
+
+In record mode every scraper HTTP response (requests strategies, newspaper3k downloads, Playwright pages)
+and every AI request/response is appended to a gzip-compressed JSON-lines cassette. In replay mode the
+same code paths are served from the cassette instead of the network, so a slow or wrong job can be
+reproduced, profiled and benchmarked offline against exactly the same pages and AI answers.
+"""
+import base64
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional
+
+from metrics import METRICS
+
+CASSETTE_VERSION = 1
+CASSETTE_MODES = ('record', 'replay')
+# Not under exports/: those files are cleaned up after a day, recordings are kept until deleted
+DEFAULT_CASSETTE_DIR = 'cassettes'
+
+
+class CassetteMiss(RuntimeError):
+    """A replayed job made a request that is not in the cassette"""
+
+
+class ReplayedError(RuntimeError):
+    """An error recorded in the cassette, raised again on replay"""
+
+
+def request_key(payload: Dict) -> str:
+    """Stable key of a request body (e.g. chat-completion kwargs)"""
+    return hashlib.sha1(json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str).encode('utf-8')).hexdigest()
+
+
+class Cassette:
+    """
+    Recorded responses by (kind, key). Identical requests are replayed in recording order;
+    once they are used up the last one is repeated. `replay_latency` sleeps the recorded duration of each
+    response, and keeps the scraper's politeness delays, to mimic the original timing.
+    """
+
+    def __init__(self, path: str, mode: str, replay_latency: bool = False):
+        if mode not in CASSETTE_MODES:
+            raise ValueError(f"Unknown cassette mode: {mode}")
+        self.path = path
+        self.mode = mode
+        self.replay_latency = replay_latency
+        self._lock = threading.Lock()
+        self._entries: Dict[tuple, deque] = {}
+        self.recorded = 0
+        self.hits = 0
+        self.misses = 0
+        if mode == 'record':
+            if os.path.dirname(path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+            self._file = gzip.open(path, 'wt', encoding='utf-8')
+            self._file.write(json.dumps({'cassette': CASSETTE_VERSION, 'created': datetime.now().isoformat(timespec='seconds')}) + "\n")
+        else:
+            self._file = None
+            self._load()
+
+    @property
+    def recording(self) -> bool:
+        return self.mode == 'record'
+
+    @property
+    def replaying(self) -> bool:
+        return self.mode == 'replay'
+
+    @property
+    def simulates_time(self) -> bool:
+        """Whether waits that only exist for real websites (random delays, backoff) should still happen"""
+        return not self.replaying or self.replay_latency
+
+    def _load(self):
+        with gzip.open(self.path, 'rt', encoding='utf-8') as f:
+            try:
+                for line in f:
+                    entry = json.loads(line)
+                    if 'kind' in entry:
+                        self._entries.setdefault((entry['kind'], entry['key']), deque()).append(entry)
+            except (EOFError, json.JSONDecodeError):
+                # A recording that was interrupted still replays up to its last complete entry
+                print(f"⚠️ Cassette {self.path} is truncated; replaying the complete entries only")
+
+    def _next(self, kind: str, key: str) -> Optional[Dict]:
+        with self._lock:
+            entries = self._entries.get((kind, key))
+            if not entries:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return entries.popleft() if len(entries) > 1 else entries[0]
+
+    def replay(self, kind: str, key: str, load: Callable[[Any], Any] = lambda value: value,
+               errors: Optional[Dict[str, type]] = None) -> Any:
+        """
+        The recorded result of a request; `load` converts it back from JSON.
+        A recorded error is raised again as the class `errors` maps its type name to, else as `ReplayedError`.
+        """
+        entry = self._next(kind, key)
+        if entry is None:
+            METRICS.inc('cassette_requests_total', kind=kind, outcome='miss')
+            raise CassetteMiss(f"{kind} request not in cassette: {key}")
+        METRICS.inc('cassette_requests_total', kind=kind, outcome='hit')
+        if self.replay_latency:
+            time.sleep(entry.get('elapsed', 0.0))
+        if 'error' in entry:
+            error_class = (errors or {}).get(entry['error']['type'], ReplayedError)
+            raise error_class(f"{entry['error']['type']}: {entry['error']['message']}")
+        return load(entry['value'])
+
+    def record(self, kind: str, key: str, value: Any = None, elapsed: float = 0.0, request: Optional[Dict] = None,
+               error: Optional[Exception] = None):
+        """Append one result (already converted to JSON) or error"""
+        entry = {'kind': kind, 'key': key, 'elapsed': round(elapsed, 4)}
+        if request is not None:
+            entry['request'] = request
+        if error is not None:
+            entry['error'] = {'type': type(error).__name__, 'message': str(error)}
+        else:
+            entry['value'] = value
+        line = json.dumps(entry, ensure_ascii=False, default=str) + "\n"
+        with self._lock:
+            if self._file:
+                self._file.write(line)
+                self.recorded += 1
+        METRICS.inc('cassette_requests_total', kind=kind, outcome='recorded')
+
+    def through(self, kind: str, key: str, fetch: Callable[[], Any], dump: Callable[[Any], Any] = lambda value: value,
+                load: Callable[[Any], Any] = lambda value: value, request: Optional[Dict] = None, stream: bool = False,
+                errors: Optional[Dict[str, type]] = None) -> Any:
+        """
+        Run `fetch` and record its result (converted with `dump`) or error, or replay it.
+        With `stream`, the result is an iterator whose items are recorded once the caller has read it.
+        """
+        if self.replaying:
+            return self.replay(kind, key, load, errors)
+        start = time.perf_counter()
+        try:
+            value = fetch()
+        except Exception as e:
+            self.record(kind, key, elapsed=time.perf_counter() - start, request=request, error=e)
+            raise
+        if stream:
+            return _RecordingStream(value, dump, lambda items: self.record(kind, key, items, time.perf_counter() - start, request))
+        self.record(kind, key, dump(value), time.perf_counter() - start, request)
+        return value
+
+    def close(self):
+        with self._lock:
+            if self._file:
+                self._file.close()
+                self._file = None
+
+    def summary(self) -> str:
+        if self.recording:
+            return f"📼 {self.recorded} responses recorded to {self.path}"
+        return f"📼 Replayed {self.hits} responses from {self.path}" + (f", {self.misses} requests not in the cassette" if self.misses else "")
+
+
+# --- Converters for the recorded response types ---
+
+def dump_response(response) -> Dict:
+    return {'status_code': response.status_code, 'url': response.url, 'headers': dict(response.headers),
+            'encoding': response.encoding, 'content': base64.b64encode(response.content).decode('ascii')}
+
+
+def load_response(data: Dict):
+    import requests
+    response = requests.models.Response()
+    response.status_code = data['status_code']
+    response.url = data['url']
+    response.headers = requests.structures.CaseInsensitiveDict(data['headers'])
+    response.encoding = data['encoding']
+    response._content = base64.b64decode(data['content'])
+    return response
+
+
+def download_article(article, cassette: Optional[Cassette]):
+    """newspaper3k `Article.download()`; with a cassette the downloaded HTML is recorded or replayed"""
+    if cassette is None:
+        article.download()
+        return
+
+    def fetch() -> str:
+        article.download()
+        return article.html
+    html = cassette.through('newspaper3k', article.url, fetch)
+    # A failed download was recorded as empty HTML; `parse()` then fails just like it did
+    if cassette.replaying and html:
+        article.download(input_html=html)
+
+
+def dump_completion(response) -> Dict:
+    """A chat completion, or one chunk of a streamed one"""
+    return response.model_dump(mode='json')
+
+
+def load_completion(data: Any):
+    from openai.types.chat import ChatCompletion, ChatCompletionChunk
+    if isinstance(data, list):
+        return iter([ChatCompletionChunk.model_validate(chunk) for chunk in data])
+    return ChatCompletion.model_validate(data)
+
+
+class _RecordingStream:
+    """Pass streamed items through to the caller and record them all when the stream ends"""
+
+    def __init__(self, stream, dump: Callable[[Any], Any], on_done: Callable[[list], None]):
+        self._stream = stream
+        self._dump = dump
+        self._on_done = on_done
+
+    def __iter__(self):
+        items = []
+        for item in self._stream:
+            items.append(self._dump(item))
+            yield item
+        self._on_done(items)
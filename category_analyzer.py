@@ -1,16 +1,22 @@
 import json
 from typing import Dict, Optional, List
-from openai import OpenAI
 
 class CategoryAnalyzer:
-    def __init__(self, api_key: str, base_url: str):
+    def __init__(self, api_key: str, base_url: str, client=None):
         self.api_key = api_key
         self.base_url = base_url
         self.model_name = 'models/gemini-2.5-flash'
-        self.client = None
-        if self.api_key and self.base_url:
+        # Optional UsageTracker shared by the job; receives `response.usage` of every call
+        self.usage_tracker = None
+        self.client = client
+        if not self.client and self.api_key and self.base_url:
+            from openai import OpenAI
             self.client = OpenAI(api_key=self.api_key, base_url=self.base_url)
 
+    def _record_usage(self, task: str, response, model_name: Optional[str]):
+        if self.usage_tracker and getattr(response, 'usage', None):
+            self.usage_tracker.record(task, getattr(response, 'model', None) or model_name or self.model_name, response.usage)
+
     def _create_category_prompt(self, content: str, categories_with_desc: List[str]) -> str:
         category_lines = []
         for item in categories_with_desc:
@@ -40,7 +46,23 @@ class CategoryAnalyzer:
         }}
         """
 
-    def analyze_category(self, content: str, categories_with_desc: List[str]) -> str:
+    def _parse_category_response(self, response_text: str, categories_with_desc: List[str]) -> str:
+        try:
+            data = json.loads(response_text)
+            category = data.get("category", "Gagal parsing JSON").strip()
+            
+            # Extract just the names for validation
+            valid_category_names = [cat.split(':', 1)[0].strip() for cat in categories_with_desc] + ["Lain-lain"]
+            
+            if category in valid_category_names:
+                return category
+            else:
+                print(f"Warning: Model returned a category not in the list: '{category}'")
+                return category # Return the model's output anyway
+        except (json.JSONDecodeError, AttributeError):
+            return "Gagal parsing JSON"
+
+    def analyze_category(self, content: str, categories_with_desc: List[str], model_name: Optional[str] = None) -> str:
         if not self.client:
             print("OpenAI client not initialized. Check API Key or Base URL.")
             return "Error: Client not initialized"
@@ -52,7 +74,7 @@ class CategoryAnalyzer:
         
         try:
             response = self.client.chat.completions.create(
-                model=self.model_name,
+                model=model_name or self.model_name,
                 messages=[
                     {"role": "user", "content": prompt}
                 ],
@@ -60,23 +82,11 @@ class CategoryAnalyzer:
                 temperature=0.1,
                 timeout=90
             )
-            
+            self._record_usage('category', response, model_name)
+
             if response.choices:
                 response_text = response.choices[0].message.content
-                try:
-                    data = json.loads(response_text)
-                    category = data.get("category", "Gagal parsing JSON").strip()
-                    
-                    # Extract just the names for validation
-                    valid_category_names = [cat.split(':', 1)[0].strip() for cat in categories_with_desc] + ["Lain-lain"]
-                    
-                    if category in valid_category_names:
-                        return category
-                    else:
-                        print(f"Warning: Model returned a category not in the list: '{category}'")
-                        return category # Return the model's output anyway
-                except json.JSONDecodeError:
-                    return "Gagal parsing JSON"
+                return self._parse_category_response(response_text, categories_with_desc)
 
             return "Gagal analisis"
 
@@ -0,0 +1,205 @@
+import hashlib
+import importlib.util
+import os
+import pickle
+import threading
+from typing import List, Optional, Tuple
+
+# Optional dependency: the local classifier is disabled when scikit-learn is missing.
+# Only its presence is checked here; importing it takes most of a second, so that waits for the first classifier.
+SKLEARN_AVAILABLE = all(importlib.util.find_spec(name) is not None for name in ('numpy', 'scipy', 'sklearn'))
+np = diags = HashingVectorizer = SGDClassifier = normalize = None
+
+
+def _import_sklearn():
+    global np, diags, HashingVectorizer, SGDClassifier, normalize
+    if HashingVectorizer is None:
+        import numpy as np
+        from scipy.sparse import diags
+        from sklearn.feature_extraction.text import HashingVectorizer
+        from sklearn.linear_model import SGDClassifier
+        from sklearn.preprocessing import normalize
+
+FALLBACK_CATEGORY = "Lain-lain"
+N_FEATURES = 2 ** 18
+
+
+class LocalCategoryClassifier:
+    """
+    Incremental TF-IDF + linear classifier for one category set.
+    Trained from previous `Kategori` results so stable category lists can be answered without the LLM.
+    Category names are matched case-insensitively, like the model file key; the model keeps the casing
+    it was first trained with and predictions use this instance's casing.
+    """
+
+    def __init__(self, categories: List[str], model_dir: str = 'models', min_samples: int = 30):
+        self.categories = sorted(set(c.strip() for c in categories if c.strip()) | {FALLBACK_CATEGORY})
+        # The model's class names (from the saved model when there is one) and lowercase -> name lookups
+        self.classes = self.categories
+        self._display = {c.lower(): c for c in self.categories}
+        self._canonical = dict(self._display)
+        self.model_dir = model_dir
+        self.min_samples = min_samples
+        self.model_path = os.path.join(model_dir, f"category_{self.category_set_key(self.categories)}.pkl")
+
+        self.n_samples = 0
+        self.n_docs = 0
+        self.doc_freq = None
+        self.model = None
+        self._pending_texts, self._pending_labels = [], []
+        # (mtime, size) of the model file as last loaded or saved, to notice writes by other instances
+        self._file_version = None
+        # predict/train/add_example/flush may be called from several analysis threads
+        self._lock = threading.RLock()
+
+        if SKLEARN_AVAILABLE:
+            _import_sklearn()
+            self.vectorizer = HashingVectorizer(n_features=N_FEATURES, ngram_range=(1, 2), alternate_sign=False, norm=None, lowercase=True)
+            self._load()
+
+    @staticmethod
+    def category_set_key(categories: List[str]) -> str:
+        """Model file key of a category list; case-insensitive and independent of order and the fallback"""
+        names = set(c.strip() for c in categories if c.strip()) | {FALLBACK_CATEGORY}
+        normalized = "|".join(sorted(c.lower() for c in names))
+        return hashlib.sha1(normalized.encode('utf-8')).hexdigest()[:12]
+
+    def _disk_version(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(self.model_path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _load(self):
+        if not os.path.exists(self.model_path):
+            return
+        try:
+            version = self._disk_version()
+            with open(self.model_path, 'rb') as f:
+                state = pickle.load(f)
+            classes = sorted(state.get('categories') or self.categories)
+            if {c.lower() for c in classes} != set(self._display):
+                print(f"⚠️ Local category model {self.model_path} was trained on other categories; ignoring it")
+                return
+            self.classes = classes
+            self._canonical = {c.lower(): c for c in classes}
+            self._file_version = version
+            self.model = state['model']
+            self.doc_freq = state['doc_freq']
+            self.n_docs = state['n_docs']
+            self.n_samples = state['n_samples']
+            print(f"✅ Loaded local category model ({self.n_samples} samples) from {self.model_path}")
+        except Exception as e:
+            print(f"❌ Error loading local category model {self.model_path}: {e}")
+
+    def save(self):
+        if not SKLEARN_AVAILABLE or self.model is None:
+            return
+        os.makedirs(self.model_dir, exist_ok=True)
+        tmp_path = self.model_path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            pickle.dump({'model': self.model, 'doc_freq': self.doc_freq, 'n_docs': self.n_docs,
+                         'n_samples': self.n_samples, 'categories': self.classes}, f)
+        os.replace(tmp_path, self.model_path)
+        self._file_version = self._disk_version()
+
+    def _reload_if_changed(self):
+        """Pick up a model saved by another instance or process, so training adds to it instead of overwriting it"""
+        version = self._disk_version()
+        if version is not None and version != self._file_version:
+            self._load()
+
+    def is_ready(self) -> bool:
+        return SKLEARN_AVAILABLE and self.model is not None and self.n_samples >= self.min_samples
+
+    def _transform(self, texts: List[str], update_idf: bool = False):
+        counts = self.vectorizer.transform(texts)
+        if update_idf:
+            if self.doc_freq is None:
+                self.doc_freq = np.zeros(N_FEATURES, dtype=np.float64)
+            self.doc_freq += np.bincount(counts.indices, minlength=N_FEATURES)
+            self.n_docs += counts.shape[0]
+
+        # Sublinear TF weighted by the running IDF, then L2-normalized per row
+        features = counts.astype(np.float64)
+        features.data = np.log1p(features.data)
+        idf = np.log((1.0 + self.n_docs) / (1.0 + self.doc_freq)) + 1.0
+        return normalize(features @ diags(idf), norm='l2', copy=False)
+
+    def _class_of(self, label) -> Optional[str]:
+        return self._canonical.get(str(label).strip().lower())
+
+    def train(self, texts: List[str], labels: List[str]) -> int:
+        """Partially fit on labelled texts; rows with labels outside the category set are ignored"""
+        if not SKLEARN_AVAILABLE:
+            return 0
+        with self._lock:
+            pairs = [(str(t), self._class_of(l)) for t, l in zip(texts, labels) if t and self._class_of(l)]
+            if not pairs:
+                return 0
+
+            batch_texts, batch_labels = zip(*pairs)
+            features = self._transform(list(batch_texts), update_idf=True)
+            if self.model is None:
+                self.model = SGDClassifier(loss='log_loss', alpha=1e-5, random_state=42)
+            self.model.partial_fit(features, list(batch_labels), classes=self.classes)
+            self.n_samples += len(pairs)
+            return len(pairs)
+
+    def train_from_export(self, file_or_path, name: str = '') -> int:
+        """Train from a previously exported result file (.xlsx or .csv) with a `Kategori` column"""
+        import pandas as pd
+
+        name = name or getattr(file_or_path, 'name', str(file_or_path))
+        df = pd.read_csv(file_or_path) if name.lower().endswith('.csv') else pd.read_excel(file_or_path)
+
+        label_col = next((c for c in ['Kategori', 'Category', 'Category_New'] if c in df.columns), None)
+        if not label_col:
+            print(f"⚠️ No category column found in {name}")
+            return 0
+
+        content = df['Isi'].astype(str) if 'Isi' in df.columns else pd.Series([''] * len(df), index=df.index)
+        title = df['Judul'].astype(str) if 'Judul' in df.columns else pd.Series([''] * len(df), index=df.index)
+        # Use the article body when it was scraped, otherwise the title
+        texts = [c if len(c.strip()) > 100 and c != 'Gagal scraping' else t for c, t in zip(content, title)]
+
+        with self._lock:
+            self._reload_if_changed()
+            trained = self.train(texts, df[label_col].fillna('').tolist())
+            self.save()
+        print(f"✅ Trained local category model on {trained} rows from {name}")
+        return trained
+
+    def predict_many(self, texts: List[str]) -> List[Tuple[str, float]]:
+        """Predict categories with their probability for a batch of texts"""
+        if not self.is_ready() or not texts:
+            return []
+        with self._lock:
+            probabilities = self.model.predict_proba(self._transform([str(t) for t in texts]))
+        best = probabilities.argmax(axis=1)
+        return [(self._display.get(str(self.model.classes_[i]).lower(), str(self.model.classes_[i])), float(probabilities[row, i]))
+                for row, i in enumerate(best)]
+
+    def predict(self, text: str) -> Optional[Tuple[str, float]]:
+        predictions = self.predict_many([text])
+        return predictions[0] if predictions else None
+
+    def add_example(self, text: str, label: str, batch_size: int = 64):
+        """Queue an LLM-labelled example and fit in batches"""
+        if not SKLEARN_AVAILABLE or not text or not self._class_of(label):
+            return
+        with self._lock:
+            self._pending_texts.append(text)
+            self._pending_labels.append(label)
+            if len(self._pending_texts) >= batch_size:
+                self.flush()
+
+    def flush(self):
+        """Fit the queued examples on top of the latest saved model and persist it"""
+        with self._lock:
+            self._reload_if_changed()
+            if self._pending_texts:
+                self.train(self._pending_texts, self._pending_labels)
+                self._pending_texts, self._pending_labels = [], []
+            self.save()
@@ -0,0 +1,129 @@
+import hashlib
+import json
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional, Set
+
+DEFAULT_CHECKPOINT_PATH = os.path.join('checkpoints', 'jobs.sqlite')
+
+# Config keys that change the output of a row; a different value means a different job
+JOB_CONFIG_KEYS = [
+    'enable_scraping', 'enable_date', 'enable_sentiment', 'enable_journalist', 'enable_summarize', 'enable_categorization',
+    'sentiment_contexts', 'analysis_source_option', 'summarize_config', 'column_mapping', 'excel_use_existing_title',
+    # Which rows reach the AI, what text it sees and which model answers
+    'sentiment_prefilter', 'compression_config', 'routing_policy'
+]
+
+
+def make_job_id(input_bytes: bytes, config: Dict) -> str:
+    """Stable id for (input file, analysis settings), so re-running the same job resumes it"""
+    settings = {key: config.get(key) for key in JOB_CONFIG_KEYS}
+    settings['categories'] = (config.get('categorization_config') or {}).get('categories_with_desc')
+    digest = hashlib.sha1(input_bytes)
+    digest.update(json.dumps(settings, sort_keys=True, default=str).encode('utf-8'))
+    return digest.hexdigest()[:16]
+
+
+class CheckpointStore:
+    """
+    SQLite (WAL) journal of finished rows, keyed by job id and `original_index`.
+    Rows are buffered and committed in batches, so the journal costs little even for fast rows.
+    """
+
+    def __init__(self, path: str = DEFAULT_CHECKPOINT_PATH, batch_size: int = 50, max_delay: float = 5.0):
+        self.path = path
+        self.batch_size = batch_size
+        self.max_delay = max_delay
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Jobs may write from a background thread while the UI thread reads
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                job_id TEXT PRIMARY KEY,
+                name TEXT,
+                total INTEGER,
+                status TEXT,
+                created_at REAL,
+                updated_at REAL
+            );
+            CREATE TABLE IF NOT EXISTS rows (
+                job_id TEXT NOT NULL,
+                original_index BLOB NOT NULL,
+                result BLOB NOT NULL,
+                PRIMARY KEY (job_id, original_index)
+            );
+        """)
+        self._conn.commit()
+        self._lock = threading.Lock()
+        self._pending = []
+        self._last_commit = time.monotonic()
+
+    def start_job(self, job_id: str, name: str = '', total: int = 0):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO jobs (job_id, name, total, status, created_at, updated_at) VALUES (?, ?, ?, 'running', ?, ?) "
+                "ON CONFLICT(job_id) DO UPDATE SET status = 'running', total = MAX(total, excluded.total), updated_at = excluded.updated_at",
+                (job_id, name, total, now, now))
+            self._conn.commit()
+
+    def finish_job(self, job_id: str, status: str = 'finished', total: Optional[int] = None):
+        """Mark the job done; `total` records the row count when it was not known at the start"""
+        self.flush()
+        with self._lock:
+            self._conn.execute("UPDATE jobs SET status = ?, total = MAX(total, ?), updated_at = ? WHERE job_id = ?",
+                               (status, total or 0, time.time(), job_id))
+            self._conn.commit()
+
+    def add(self, job_id: str, original_index, result: Dict):
+        """Queue a finished row; commits once `batch_size` rows or `max_delay` seconds have accumulated"""
+        with self._lock:
+            self._pending.append((job_id, pickle.dumps(original_index), pickle.dumps(result)))
+            due = len(self._pending) >= self.batch_size or time.monotonic() - self._last_commit >= self.max_delay
+        if due:
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            if self._pending:
+                self._conn.executemany("INSERT OR REPLACE INTO rows (job_id, original_index, result) VALUES (?, ?, ?)", self._pending)
+                self._conn.commit()
+                self._pending = []
+            self._last_commit = time.monotonic()
+
+    def completed_indices(self, job_id: str) -> Set:
+        with self._lock:
+            rows = self._conn.execute("SELECT original_index FROM rows WHERE job_id = ?", (job_id,)).fetchall()
+        return {pickle.loads(row[0]) for row in rows}
+
+    def load_results(self, job_id: str) -> List[Dict]:
+        with self._lock:
+            rows = self._conn.execute("SELECT result FROM rows WHERE job_id = ?", (job_id,)).fetchall()
+        return [pickle.loads(row[0]) for row in rows]
+
+    def job_info(self, job_id: str) -> Optional[Dict]:
+        with self._lock:
+            job = self._conn.execute("SELECT name, total, status, created_at, updated_at FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+            done = self._conn.execute("SELECT COUNT(*) FROM rows WHERE job_id = ?", (job_id,)).fetchone()[0]
+        if not job:
+            return None
+        name, total, status, created_at, updated_at = job
+        return {'job_id': job_id, 'name': name, 'total': total, 'status': status, 'completed': done,
+                'created_at': created_at, 'updated_at': updated_at}
+
+    def delete_job(self, job_id: str):
+        with self._lock:
+            self._conn.execute("DELETE FROM rows WHERE job_id = ?", (job_id,))
+            self._conn.execute("DELETE FROM jobs WHERE job_id = ?", (job_id,))
+            self._conn.commit()
+
+    def close(self):
+        self.flush()
+        with self._lock:
+            self._conn.close()
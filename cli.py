@@ -0,0 +1,233 @@
+"""
+Headless runner for The Senticon: scrape and analyze an .xlsx/.csv file without the Streamlit UI.
+
+    python cli.py --input berita.xlsx --output hasil.xlsx --url-column URL --scrape \
+        --context "Toyota Avanza" --summarize --categories kategori.txt
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from typing import Dict, List, Optional
+
+import config as settings
+from article_store import DEFAULT_ARTICLE_STORE_PATH, ArticleStore
+from category_classifier import LocalCategoryClassifier
+from checkpoint import DEFAULT_CHECKPOINT_PATH, CheckpointStore, make_job_id
+from export_writers import write_table
+from input_reader import TableReader, missing_columns
+from metrics import METRICS, set_verbose, start_metrics_server
+from model_router import ROUTING_POLICIES
+from news_processor import NewsProcessor
+
+ANALYSIS_SOURCES = {'full': 'Teks Lengkap (Fallback ke Judul)', 'title': 'Hanya Judul'}
+ROUTING_CHOICES = {'auto': ROUTING_POLICIES[0], 'standard': "Selalu Standard", 'lite': "Selalu Lite"}
+
+
+def _pick(flag, base: Dict, key: str, default):
+    """A flag that was passed wins over the `--config` JSON, which wins over the built-in default"""
+    return flag if flag is not None else base.get(key, default)
+
+
+def _merge(base: Dict, key: str, defaults: Dict, flags: Dict) -> Dict:
+    """A config section: built-in defaults, then the `--config` JSON values, then the flags that were passed"""
+    section = {**defaults, **(base.get(key) or {})}
+    section.update({name: value for name, value in flags.items() if value is not None})
+    return section
+
+
+def build_config(args: argparse.Namespace) -> Dict:
+    """Build the same job config the Streamlit sidebar produces; `--config` JSON values are the base"""
+    base = {}
+    if args.config:
+        with open(args.config, encoding='utf-8') as f:
+            base = json.load(f)
+
+    categories_with_desc = base.get('categorization_config', {}).get('categories_with_desc', [])
+    if args.categories:
+        with open(args.categories, encoding='utf-8') as f:
+            categories_with_desc = [line.strip() for line in f if line.strip()]
+    contexts = args.context or base.get('sentiment_contexts') or []
+
+    config = {
+        'enable_scraping': _pick(args.scrape, base, 'enable_scraping', False),
+        'enable_date': _pick(args.date, base, 'enable_date', False),
+        'enable_journalist': _pick(args.journalist, base, 'enable_journalist', False),
+        'enable_sentiment': bool(contexts),
+        'enable_summarize': _pick(args.summarize, base, 'enable_summarize', False),
+        'enable_categorization': bool(categories_with_desc),
+        'sentiment_context': "\n".join(contexts) or None,
+        'sentiment_contexts': contexts,
+        'sentiment_prefilter': _merge(base, 'sentiment_prefilter', {'enabled': True, 'aliases': {}}, {'enabled': args.prefilter}),
+        'analysis_source_option': ANALYSIS_SOURCES[args.analysis_source] if args.analysis_source else base.get('analysis_source_option', ANALYSIS_SOURCES['full']),
+        'summarize_config': _merge(base, 'summarize_config', {
+            'summary_type': 'Ringkas', 'max_length': 150, 'language': 'Bahasa Indonesia', 'focus_aspect': ''
+        }, {
+            'summary_type': args.summary_type, 'max_length': args.max_length, 'language': args.language, 'focus_aspect': args.focus
+        }),
+        'categorization_config': {
+            'categories_with_desc': categories_with_desc,
+            'categories': [c.split(':', 1)[0].strip() for c in categories_with_desc]
+        },
+        'stream_summaries': False,
+        'scraping_timeout': _pick(args.timeout, base, 'scraping_timeout', 30),
+        'reuse_archived_articles': not args.rescrape if args.rescrape is not None else base.get('reuse_archived_articles', True),
+        'compression_config': _merge(base, 'compression_config', {'enabled': True, 'token_budget': 500},
+                                     {'enabled': args.compression, 'token_budget': args.token_budget}),
+        'routing_policy': ROUTING_CHOICES[args.routing] if args.routing else base.get('routing_policy', ROUTING_POLICIES[0]),
+        'hedging_config': _merge(base, 'hedging_config', {'enabled': False, 'max_hedge_ratio': 0.1}, {'enabled': args.hedging}),
+        'budget_config': _merge(base, 'budget_config', {'max_cost_usd': 0.0, 'max_tokens': 0},
+                                {'max_cost_usd': args.max_cost, 'max_tokens': args.max_tokens}),
+        'pipeline_config': _merge(base, 'pipeline_config', {
+            'fetch_workers': 8, 'extract_workers': 2, 'analyze_workers': 4, 'extraction_processes': 0, 'queue_size': 32
+        }, {
+            'fetch_workers': args.fetch_workers, 'extract_workers': args.extract_workers,
+            'analyze_workers': args.analyze_workers, 'extraction_processes': args.extraction_processes
+        }),
+        'trace_config': {'enabled': bool(args.trace), 'path': args.trace},
+        'cassette_config': {'mode': 'record' if args.record else 'replay' if args.replay else None,
+                            'path': args.record or args.replay, 'replay_latency': args.replay_latency},
+        'excel_use_existing_title': _pick(args.use_existing_title, base, 'excel_use_existing_title', False),
+        'column_mapping': {'url_column': args.url_column, 'snippet_column': args.snippet_column}
+    }
+
+    if args.local_classifier and config['categorization_config']['categories']:
+        config['categorization_config']['local_classifier'] = LocalCategoryClassifier(config['categorization_config']['categories'])
+        config['categorization_config']['local_confidence_threshold'] = args.local_threshold
+    return config
+
+
+def build_processor(article_store: Optional[ArticleStore] = None) -> NewsProcessor:
+    return NewsProcessor(
+        settings.GEMINI_API_KEY, settings.GEMINI_BASE_URL,
+        api_keys=getattr(settings, 'GEMINI_API_KEYS', None),
+        base_urls=getattr(settings, 'GEMINI_BASE_URLS', None),
+        model_tiers={'lite': getattr(settings, 'GEMINI_MODEL_LITE', None), 'standard': getattr(settings, 'GEMINI_MODEL_STANDARD', None)},
+        article_store=article_store
+    )
+
+
+def console_progress(every: int = 1, metrics_file: Optional[str] = None):
+    start = time.monotonic()
+
+    def on_progress(completed: int, total: int, label: str, usage_text: str):
+        if completed % every and completed != total:
+            return
+        elapsed = time.monotonic() - start
+        print(f"[{completed}/{total or '?'}] {completed / max(elapsed, 1e-6):.2f} baris/s | {usage_text} | {label[:60]}",
+              file=sys.stderr, flush=True)
+        if metrics_file:
+            METRICS.write_prometheus(metrics_file)
+    return on_progress
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Scrape and analyze news from an .xlsx/.csv file without the web UI")
+    parser.add_argument('--input', required=True, help="Input .xlsx/.csv file (.xls is read whole)")
+    parser.add_argument('--output', required=True, help="Output .xlsx/.csv/.parquet file")
+    parser.add_argument('--sidecar-content', action='store_true',
+                        help="Write the full article text ('Isi') to a separate .jsonl.gz next to the output")
+    parser.add_argument('--config', help="JSON file with a job config (same keys as the app); flags below override it")
+    parser.add_argument('--url-column', default='URL')
+    parser.add_argument('--snippet-column')
+    parser.add_argument('--use-existing-title', action=argparse.BooleanOptionalAction, help="Keep the 'Judul' column instead of the scraped title")
+    parser.add_argument('--analysis-source', choices=sorted(ANALYSIS_SOURCES))
+
+    parser.add_argument('--scrape', action=argparse.BooleanOptionalAction, help="Pull the full article text")
+    parser.add_argument('--date', action=argparse.BooleanOptionalAction)
+    parser.add_argument('--journalist', action=argparse.BooleanOptionalAction)
+    parser.add_argument('--timeout', type=int, help="Scraping timeout per URL in seconds (default 30)")
+    parser.add_argument('--archive', default=DEFAULT_ARTICLE_STORE_PATH, help="Article archive: scraped articles are stored here and reused by later jobs")
+    parser.add_argument('--rescrape', action=argparse.BooleanOptionalAction, help="Scrape every URL again instead of reusing archived articles (the archive is updated)")
+    parser.add_argument('--no-archive', action='store_true', help="Neither read nor write the article archive")
+
+    parser.add_argument('--context', action='append', default=[], help="Sentiment context, repeat for several contexts")
+    parser.add_argument('--prefilter', action=argparse.BooleanOptionalAction,
+                        help="Answer 'tidak terkait' locally for articles that never mention the context (default on)")
+    parser.add_argument('--summarize', action=argparse.BooleanOptionalAction)
+    parser.add_argument('--summary-type', help="Default 'Ringkas'")
+    parser.add_argument('--max-length', type=int, help="Default 150 words")
+    parser.add_argument('--language', help="Default 'Bahasa Indonesia'")
+    parser.add_argument('--focus')
+    parser.add_argument('--categories', help="Text file with one 'Kategori: deskripsi' per line")
+    parser.add_argument('--local-classifier', action='store_true')
+    parser.add_argument('--local-threshold', type=float, default=0.8)
+
+    parser.add_argument('--compression', action=argparse.BooleanOptionalAction, help="Compress article text before AI calls (default on)")
+    parser.add_argument('--token-budget', type=int, help="Default 500")
+    parser.add_argument('--routing', choices=sorted(ROUTING_CHOICES))
+    parser.add_argument('--hedging', action=argparse.BooleanOptionalAction)
+    parser.add_argument('--max-cost', type=float, help="Cost budget in USD (0 = unlimited, the default)")
+    parser.add_argument('--max-tokens', type=int, help="Token budget (0 = unlimited, the default)")
+
+    parser.add_argument('--fetch-workers', type=int, help="Rows scraped at once (default 8; each stage has its own threads)")
+    parser.add_argument('--extract-workers', type=int, help="Rows in text selection and journalist detection at once (default 2)")
+    parser.add_argument('--analyze-workers', type=int, help="Rows in AI analysis at once (default 4)")
+    parser.add_argument('--extraction-processes', type=int, help="Processes for HTML extraction (default 0: in-process)")
+    parser.add_argument('--progress-every', type=int, default=10, help="Print progress every N rows")
+    parser.add_argument('--checkpoint', default=DEFAULT_CHECKPOINT_PATH, help="SQLite journal of finished rows")
+    parser.add_argument('--job-id', help="Checkpoint job id (default: derived from the input file and settings)")
+    parser.add_argument('--no-resume', action='store_true', help="Ignore finished rows from a previous run of this job")
+    parser.add_argument('--verbose', action='store_true', help="Log every selector and request attempt (slow on large jobs)")
+    parser.add_argument('--metrics-file', help="Write Prometheus metrics to this file while the job runs")
+    parser.add_argument('--metrics-port', type=int, help="Serve Prometheus metrics on http://127.0.0.1:PORT/metrics")
+    parser.add_argument('--trace', metavar='TRACE_JSON',
+                        help="Record per-row stage timings (Durasi_Detik/Trace columns) and write a Chrome trace file, viewable in ui.perfetto.dev")
+    cassette = parser.add_mutually_exclusive_group()
+    cassette.add_argument('--record', metavar='CASSETTE', help="Record every scraper and AI response of the job to this .jsonl.gz file")
+    cassette.add_argument('--replay', metavar='CASSETTE', help="Serve scraper and AI responses from a recorded cassette instead of the network")
+    parser.add_argument('--replay-latency', action='store_true', help="With --replay, wait as long as each recorded response took")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+
+    if args.replay and not os.path.exists(args.replay):
+        print(f"❌ Cassette {args.replay} not found", file=sys.stderr)
+        return 2
+    if args.verbose:
+        set_verbose(True)
+    if args.metrics_port:
+        start_metrics_server(args.metrics_port)
+    config = build_config(args)
+    # Only the header is read here; rows are streamed into the pipeline while it runs
+    reader = TableReader(args.input)
+    missing = missing_columns(reader.columns, config['column_mapping'])
+    if missing:
+        print(f"❌ Column(s) {', '.join(map(repr, missing))} not found in {args.input}. Available: {', '.join(reader.columns)}", file=sys.stderr)
+        return 2
+    # Rows are not counted up front (that is a full pass over the file); progress shows no total
+    print(f"📄 Reading {args.input} ({len(reader.columns)} columns)", file=sys.stderr)
+
+    with open(args.input, 'rb') as f:
+        job_id = args.job_id or make_job_id(f.read(), config)
+    config['job_name'] = args.input
+    checkpoint = CheckpointStore(args.checkpoint)
+    if args.no_resume:
+        checkpoint.delete_job(job_id)
+    print(f"🗂️ Job {job_id} (checkpoint: {args.checkpoint})", file=sys.stderr)
+
+    processor = build_processor(None if args.no_archive else ArticleStore(args.archive))
+    try:
+        results_df = asyncio.run(processor.process_rows_async(reader, config['column_mapping'], config, console_progress(args.progress_every, args.metrics_file),
+                                                              checkpoint=checkpoint, job_id=job_id))
+    finally:
+        checkpoint.close()
+        if args.metrics_file:
+            METRICS.write_prometheus(args.metrics_file)
+    paths = write_table(processor.finalize_results(results_df, config, is_excel_data=True), args.output,
+                        ['Isi'] if args.sidecar_content else [])
+    if paths['sidecar']:
+        print(f"📄 Article text written to {paths['sidecar']}", file=sys.stderr)
+
+    usage = config['job_stats'].get('usage')
+    if usage:
+        print(f"✅ Output written to {args.output} | {usage.progress_text()}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
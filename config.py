@@ -14,3 +14,11 @@ GEMINI_API_KEY = os.getenv("GEMINI_API_KEY", "sk-_4expCn9n0sz-jKw_11a7B1ZjxlE4yG
 # (Opsional) Jika Anda menggunakan proxy atau endpoint custom
 # URL Lengkap ke endpoint proxy Gemini
 GEMINI_BASE_URL = os.getenv("GEMINI_BASE_URL", "https://krsbeknjypkg.sg-members-1.clawcloudrun.com/proxy/gemini/v1beta/openai")
+
+# (Opsional) Model per tier untuk routing otomatis
+GEMINI_MODEL_LITE = os.getenv("GEMINI_MODEL_LITE", "models/gemini-2.5-flash-lite")
+GEMINI_MODEL_STANDARD = os.getenv("GEMINI_MODEL_STANDARD", "models/gemini-2.5-flash")
+
+# (Opsional) Beberapa API key dan/atau base URL, dipisahkan koma, untuk membagi beban request
+GEMINI_API_KEYS = os.getenv("GEMINI_API_KEYS", "")
+GEMINI_BASE_URLS = os.getenv("GEMINI_BASE_URLS", "")
@@ -0,0 +1,140 @@
+import re
+from typing import Dict, List, Optional
+
+# Rough heuristic used across the app: ~4 characters per token for Indonesian/English text
+CHARS_PER_TOKEN = 4
+
+STOPWORDS = {
+    'dan', 'yang', 'di', 'ke', 'dari', 'untuk', 'dengan', 'atau', 'pada', 'dalam',
+    'ini', 'itu', 'the', 'of', 'and', 'for', 'to', 'in', 'on', 'a', 'an'
+}
+
+# Common Indonesian clitics and particles attached to names, e.g. "Toyotanya", "Jakartalah"
+INDONESIAN_SUFFIXES = ('nya', 'lah', 'kah', 'pun', 'ku', 'mu')
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate token count of a text without calling the model"""
+    if not text:
+        return 0
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+class ContentCompressor:
+    def __init__(self, token_budget: int = 500):
+        self.token_budget = token_budget
+
+    def extract_keywords(self, context: Optional[str]) -> List[str]:
+        """Split a free-text context into phrases and significant single words"""
+        if not context:
+            return []
+
+        keywords = []
+        for phrase in re.split(r'[,;\n]+', context):
+            phrase = phrase.strip().lower()
+            if not phrase:
+                continue
+            keywords.append(phrase)
+            for word in re.findall(r'\w+', phrase):
+                if len(word) >= 3 and word not in STOPWORDS and word not in keywords:
+                    keywords.append(word)
+        return keywords
+
+    def keyword_pattern(self, keywords: List[str]) -> Optional[re.Pattern]:
+        """Whole-word match of any keyword: "bri" matches "BRI" and "BRI-nya" but not "brilian" """
+        if not keywords:
+            return None
+        alternatives = '|'.join(re.escape(k) for k in sorted(set(keywords), key=len, reverse=True))
+        suffixes = '|'.join(INDONESIAN_SUFFIXES)
+        return re.compile(rf"\b(?:{alternatives})(?:-?(?:{suffixes}))?\b")
+
+    def _split_paragraphs(self, content: str) -> List[str]:
+        return [p.strip() for p in re.split(r'\n\s*\n|\n', content) if p.strip()]
+
+    def _split_sentences(self, text: str) -> List[str]:
+        return [s.strip() for s in re.split(r'(?<=[.!?])\s+', text) if s.strip()]
+
+    def compress(self, content: str, keywords: List[str], token_budget: Optional[int] = None,
+                 baseline_chars: int = 3000) -> Dict:
+        """
+        Keep the lead paragraph plus the sentences mentioning the keywords, up to a token budget.
+        `baseline_chars` is the slice the analyzer would otherwise send, used to report savings.
+        """
+        budget = token_budget or self.token_budget
+        content = content or ""
+        baseline_tokens = estimate_tokens(content[:baseline_chars])
+
+        if estimate_tokens(content) <= budget:
+            return {'text': content, 'original_tokens': baseline_tokens,
+                    'compressed_tokens': estimate_tokens(content),
+                    'tokens_saved': max(0, baseline_tokens - estimate_tokens(content))}
+
+        # Split per paragraph, so a paragraph without closing punctuation never runs into the next one
+        paragraph_sentences = [self._split_sentences(p) for p in self._split_paragraphs(content)]
+        sentences = [sentence for paragraph in paragraph_sentences for sentence in paragraph]
+
+        # Lead: the first paragraph when the text kept its line breaks, otherwise the first two sentences
+        lead_count = len(paragraph_sentences[0]) if len(paragraph_sentences) > 1 else 2
+
+        budget_chars = budget * CHARS_PER_TOKEN
+        selected, used_chars = set(), 0
+
+        def take(i: int) -> bool:
+            nonlocal used_chars
+            if i in selected:
+                return True
+            cost = len(sentences[i]) + 1
+            if used_chars + cost > budget_chars:
+                return False
+            selected.add(i)
+            used_chars += cost
+            return True
+
+        for i in range(min(lead_count, len(sentences))):
+            if not take(i):
+                break
+
+        # Sentences mentioning the context, in document order
+        pattern = self.keyword_pattern(keywords)
+        if pattern:
+            for i, sentence in enumerate(sentences):
+                if pattern.search(sentence.lower()):
+                    take(i)
+
+        # Spend whatever budget is left on the text following the lead
+        for i in range(len(sentences)):
+            if budget_chars - used_chars < 40:
+                break
+            take(i)
+
+        text = ' '.join(sentences[i] for i in sorted(selected))
+        if not text:
+            text = content[:budget_chars]
+
+        compressed_tokens = estimate_tokens(text)
+        return {
+            'text': text,
+            'original_tokens': baseline_tokens,
+            'compressed_tokens': compressed_tokens,
+            'tokens_saved': max(0, baseline_tokens - compressed_tokens)
+        }
+
+    def compress_for_task(self, text: str, task: str, config: Dict) -> Optional[Dict]:
+        """
+        Compress the analysis text for one AI task with the job's `compression_config`,
+        or None when compression is disabled. The summary gets twice the budget and keeps the focus aspect.
+        """
+        compression_config = config.get('compression_config') or {}
+        if not compression_config.get('enabled') or not text:
+            return None
+
+        token_budget = compression_config.get('token_budget', self.token_budget)
+        if task == 'sentiment':
+            keywords = self.extract_keywords(config.get('sentiment_context'))
+            baseline_chars = 3000
+        elif task == 'summary':
+            keywords = self.extract_keywords(config.get('summarize_config', {}).get('focus_aspect'))
+            token_budget, baseline_chars = token_budget * 2, 4000
+        else:
+            keywords, baseline_chars = [], 3000
+        return self.compress(text, keywords, token_budget=token_budget, baseline_chars=baseline_chars)
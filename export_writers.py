@@ -0,0 +1,247 @@
+import abc
+import csv
+import gzip
+import importlib.util
+import json
+import math
+import os
+import time
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import pandas as pd
+from openpyxl import Workbook
+from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
+
+# Optional dependency: Parquet export is disabled when pyarrow is missing; it is imported on first use
+PYARROW_AVAILABLE = importlib.util.find_spec('pyarrow') is not None
+pa = pq = None
+
+
+def _import_pyarrow():
+    global pa, pq
+    if pa is None:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+DEFAULT_EXPORT_DIR = 'exports'
+
+# Excel refuses longer cell values
+EXCEL_MAX_CELL_CHARS = 32767
+
+EXPORT_FORMATS = {
+    'xlsx': {'label': 'Excel (.xlsx)', 'mime': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'},
+    'csv': {'label': 'CSV (.csv)', 'mime': 'text/csv'},
+    'parquet': {'label': 'Parquet (.parquet)', 'mime': 'application/octet-stream'},
+}
+
+
+def available_formats() -> List[str]:
+    return [fmt for fmt in EXPORT_FORMATS if fmt != 'parquet' or PYARROW_AVAILABLE]
+
+
+def _is_missing(value) -> bool:
+    return value is None or (isinstance(value, float) and math.isnan(value)) or value is pd.NaT
+
+
+def _plain_value(value):
+    """Cell value without pandas/numpy wrappers; lists and dicts become JSON text"""
+    if _is_missing(value):
+        return None
+    if isinstance(value, (list, dict)):
+        return json.dumps(value, ensure_ascii=False, default=str)
+    if isinstance(value, pd.Timestamp):
+        return value.to_pydatetime()
+    if hasattr(value, 'item') and not isinstance(value, (str, bytes)):
+        return value.item()
+    return value
+
+
+class ExportWriter(abc.ABC):
+    """Writes rows to a file chunk by chunk, so only one chunk is ever held in memory"""
+
+    def __init__(self, path: str, columns: Sequence[str]):
+        self.path = path
+        self.columns = list(columns)
+        self.rows_written = 0
+
+    @abc.abstractmethod
+    def write_rows(self, rows: Iterable[Dict]):
+        """Append one chunk of rows"""
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class ExcelStreamWriter(ExportWriter):
+    """openpyxl write-only workbook: rows are flushed to a temp file instead of kept as cell objects"""
+
+    def __init__(self, path: str, columns: Sequence[str], sheet_title: str = 'Hasil Analisis'):
+        super().__init__(path, columns)
+        self._workbook = Workbook(write_only=True)
+        self._sheet = self._workbook.create_sheet(sheet_title)
+        self._sheet.append([str(column) for column in self.columns])
+
+    @staticmethod
+    def _cell(value):
+        value = _plain_value(value)
+        if isinstance(value, str):
+            value = ILLEGAL_CHARACTERS_RE.sub('', value)[:EXCEL_MAX_CELL_CHARS]
+        return value
+
+    def write_rows(self, rows: Iterable[Dict]):
+        for row in rows:
+            self._sheet.append([self._cell(row.get(column)) for column in self.columns])
+            self.rows_written += 1
+
+    def close(self):
+        if self._workbook is not None:
+            self._workbook.save(self.path)
+            self._workbook = None
+
+
+class CsvStreamWriter(ExportWriter):
+    def __init__(self, path: str, columns: Sequence[str]):
+        super().__init__(path, columns)
+        # utf-8-sig so Excel opens Indonesian text correctly
+        self._file = open(path, 'w', newline='', encoding='utf-8-sig')
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(self.columns)
+
+    def write_rows(self, rows: Iterable[Dict]):
+        for row in rows:
+            values = [_plain_value(row.get(column)) for column in self.columns]
+            self._writer.writerow(['' if value is None else value for value in values])
+            self.rows_written += 1
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+
+
+class ParquetStreamWriter(ExportWriter):
+    """One Parquet row group per chunk; numeric, boolean and datetime columns keep their type, the rest is text"""
+
+    def __init__(self, path: str, columns: Sequence[str], dtypes: Optional[Dict] = None, compression: str = 'zstd'):
+        if not PYARROW_AVAILABLE:
+            raise RuntimeError("pyarrow is not installed, Parquet export is unavailable")
+        _import_pyarrow()
+        super().__init__(path, columns)
+        self.schema = pa.schema([(str(column), self._arrow_type((dtypes or {}).get(column))) for column in self.columns])
+        self._writer = pq.ParquetWriter(path, self.schema, compression=compression)
+
+    @staticmethod
+    def _arrow_type(dtype):
+        if dtype is None:
+            return pa.string()
+        if pd.api.types.is_bool_dtype(dtype):
+            return pa.bool_()
+        if pd.api.types.is_integer_dtype(dtype):
+            return pa.int64()
+        if pd.api.types.is_float_dtype(dtype):
+            return pa.float64()
+        if pd.api.types.is_datetime64_any_dtype(dtype):
+            return pa.timestamp('us')
+        return pa.string()
+
+    def write_rows(self, rows: Iterable[Dict]):
+        rows = list(rows)
+        if not rows:
+            return
+        arrays = []
+        for column, field in zip(self.columns, self.schema):
+            values = [_plain_value(row.get(column)) for row in rows]
+            if field.type == pa.string():
+                values = [None if value is None else str(value) for value in values]
+            arrays.append(pa.array(values, type=field.type))
+        self._writer.write_table(pa.Table.from_arrays(arrays, schema=self.schema))
+        self.rows_written += len(rows)
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+
+class SidecarWriter(ExportWriter):
+    """Large text columns as gzipped JSON lines ({"row", "URL", <column>: text}), next to a lean main file"""
+
+    def __init__(self, path: str, columns: Sequence[str], key_column: str = 'URL'):
+        super().__init__(path, columns)
+        self.key_column = key_column
+        self._file = gzip.open(path, 'wt', encoding='utf-8')
+
+    def write_rows(self, rows: Iterable[Dict]):
+        for row in rows:
+            record = {'row': self.rows_written + 1, self.key_column: _plain_value(row.get(self.key_column))}
+            record.update({column: _plain_value(row.get(column)) for column in self.columns})
+            self._file.write(json.dumps(record, ensure_ascii=False, default=str) + '\n')
+            self.rows_written += 1
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+
+
+def open_writer(fmt: str, path: str, columns: Sequence[str], dtypes: Optional[Dict] = None) -> ExportWriter:
+    if fmt == 'xlsx':
+        return ExcelStreamWriter(path, columns)
+    if fmt == 'csv':
+        return CsvStreamWriter(path, columns)
+    if fmt == 'parquet':
+        return ParquetStreamWriter(path, columns, dtypes)
+    raise ValueError(f"Unknown export format: {fmt}")
+
+
+def export_dataframe(df: pd.DataFrame, path: str, fmt: Optional[str] = None, sidecar_columns: Sequence[str] = (),
+                     chunk_size: int = 500) -> Dict[str, str]:
+    """
+    Write `df` to `path` in chunks of `chunk_size` rows. Columns in `sidecar_columns` go to
+    `<path>.<column>.jsonl.gz` instead of the main file. Returns {'main': path, 'sidecar': path or None}.
+    """
+    fmt = fmt or os.path.splitext(path)[1].lstrip('.').lower()
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    sidecar_columns = [column for column in sidecar_columns if column in df.columns]
+    main_columns = [column for column in df.columns if column not in sidecar_columns]
+    sidecar_path = f"{os.path.splitext(path)[0]}.{'_'.join(map(str, sidecar_columns))}.jsonl.gz" if sidecar_columns else None
+
+    start = time.perf_counter()
+    writers = [open_writer(fmt, path, main_columns, df.dtypes.to_dict())]
+    if sidecar_path:
+        writers.append(SidecarWriter(sidecar_path, sidecar_columns))
+    try:
+        for offset in range(0, len(df), chunk_size):
+            rows = df.iloc[offset:offset + chunk_size].to_dict('records')
+            for writer in writers:
+                writer.write_rows(rows)
+    finally:
+        for writer in writers:
+            writer.close()
+    print(f"💾 Exported {len(df)} rows to {path} in {time.perf_counter() - start:.1f}s")
+    return {'main': path, 'sidecar': sidecar_path}
+
+
+def write_table(df: pd.DataFrame, path: str, sidecar_columns: Sequence[str] = ()) -> Dict[str, str]:
+    """`export_dataframe` with the format taken from the file extension; unknown extensions are written as .xlsx"""
+    fmt = os.path.splitext(path)[1].lstrip('.').lower()
+    return export_dataframe(df, path, fmt if fmt in EXPORT_FORMATS else 'xlsx', sidecar_columns=sidecar_columns)
+
+
+def cleanup_exports(directory: str = DEFAULT_EXPORT_DIR, max_age_hours: float = 24.0):
+    """Remove export files older than `max_age_hours`"""
+    if not os.path.isdir(directory):
+        return
+    cutoff = time.time() - max_age_hours * 3600
+    for name in os.listdir(directory):
+        path = os.path.join(directory, name)
+        try:
+            if os.path.isfile(path) and os.path.getmtime(path) < cutoff:
+                os.remove(path)
+        except OSError:
+            pass
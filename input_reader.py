@@ -0,0 +1,143 @@
+import csv
+import io
+import os
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+import pandas as pd
+from openpyxl import load_workbook
+
+# (original index, column -> value) for one input row
+RowRecord = Tuple[Any, Dict]
+
+Source = Union[str, bytes]
+
+
+def _header_names(raw: List) -> List[str]:
+    """Column names the way pandas would build them: blanks become 'Unnamed: i', duplicates get '.1', '.2'"""
+    names, seen = [], {}
+    for i, value in enumerate(raw):
+        name = f"Unnamed: {i}" if value is None or str(value).strip() == '' else str(value).strip()
+        if name in seen:
+            seen[name] += 1
+            name = f"{name}.{seen[name]}"
+        else:
+            seen[name] = 0
+        names.append(name)
+    return names
+
+
+def _is_blank(values) -> bool:
+    return all(value is None or (isinstance(value, str) and not value.strip()) for value in values)
+
+
+def dataframe_records(df: pd.DataFrame) -> Iterator[RowRecord]:
+    """(index, dict) records from a DataFrame, without building a Series per row like `iterrows()`"""
+    columns = list(df.columns)
+    for index, *values in df.itertuples(index=True, name=None):
+        yield index, {column: None if pd.api.types.is_scalar(value) and pd.isna(value) else value
+                      for column, value in zip(columns, values)}
+
+
+def missing_columns(columns: List[str], column_mapping: Dict) -> List[str]:
+    """Mapped columns that are not in the header"""
+    return [column for column in (column_mapping.get('url_column'), column_mapping.get('snippet_column'))
+            if column and column not in columns]
+
+
+def read_table(path: str) -> pd.DataFrame:
+    """Load a whole .csv/.xlsx/.xls file, for tools that need every row at once"""
+    return pd.read_csv(path) if path.lower().endswith('.csv') else pd.read_excel(path)
+
+
+class TableReader:
+    """
+    Streams an .xlsx (openpyxl read-only) or .csv input as lightweight (index, dict) row records.
+    Only the header is read up front; rows are parsed while they are consumed, so large files are never
+    loaded whole. Legacy .xls files have no streaming reader and go through pandas.
+    """
+
+    def __init__(self, source: Source, name: Optional[str] = None, length: Optional[int] = None):
+        self.source = source
+        self.name = name or (source if isinstance(source, str) else 'input.xlsx')
+        self.kind = os.path.splitext(self.name)[1].lstrip('.').lower() or 'xlsx'
+        self._frame: Optional[pd.DataFrame] = None
+        # Row count, when the caller already counted the rows (e.g. while previewing the upload)
+        self._length: Optional[int] = length
+        self.columns = self._read_header()
+
+    def _open(self):
+        return io.BytesIO(self.source) if isinstance(self.source, bytes) else self.source
+
+    def _raw_rows(self) -> Iterator[tuple]:
+        """All rows including the header, as tuples of cell values"""
+        if self.kind == 'csv':
+            if isinstance(self.source, bytes):
+                handle = io.StringIO(self.source.decode('utf-8-sig'))
+            else:
+                handle = open(self.source, newline='', encoding='utf-8-sig')
+            with handle:
+                for row in csv.reader(handle):
+                    yield tuple(value if value != '' else None for value in row)
+            return
+
+        workbook = load_workbook(self._open(), read_only=True, data_only=True)
+        try:
+            yield from workbook.worksheets[0].iter_rows(values_only=True)
+        finally:
+            workbook.close()
+
+    def _read_header(self) -> List[str]:
+        if self.kind == 'xls':
+            self._frame = pd.read_excel(self._open())
+            return [str(column) for column in self._frame.columns]
+        rows = self._raw_rows()
+        try:
+            header = next(rows, ())
+        finally:
+            rows.close()
+        # Trailing empty header cells are only formatting
+        header = list(header)
+        while header and header[-1] is None:
+            header.pop()
+        return _header_names(header)
+
+    def iter_records(self) -> Iterator[RowRecord]:
+        """(index, dict) per data row; the index counts data rows from 0 like a default DataFrame index"""
+        if self._frame is not None:
+            yield from dataframe_records(self._frame)
+            return
+        width = len(self.columns)
+        rows = self._raw_rows()
+        try:
+            next(rows, None)
+            for index, values in enumerate(rows):
+                values = values[:width]
+                if _is_blank(values):
+                    continue
+                record = dict(zip(self.columns, values))
+                for column in self.columns[len(values):]:
+                    record[column] = None
+                yield index, record
+        finally:
+            rows.close()
+
+    def iter_chunks(self, chunk_size: int = 500) -> Iterator[List[RowRecord]]:
+        chunk = []
+        for record in self.iter_records():
+            chunk.append(record)
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    def __len__(self) -> int:
+        # One pass over the cell values; far cheaper than building the DataFrame
+        if self._length is None:
+            self._length = len(self._frame) if self._frame is not None else sum(1 for _ in self.iter_records())
+        return self._length
+
+    @property
+    def known_length(self) -> Optional[int]:
+        """Row count if it is known without a pass over the file, else None"""
+        return len(self._frame) if self._frame is not None else self._length
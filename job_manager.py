@@ -0,0 +1,155 @@
+import asyncio
+import queue
+import threading
+import time
+import traceback
+import uuid
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, List, Optional
+
+QUEUED, RUNNING, FINISHED, FAILED, CANCELLED = 'queued', 'running', 'finished', 'failed', 'cancelled'
+ACTIVE_STATUSES = (QUEUED, RUNNING)
+
+STATUS_LABELS = {QUEUED: '⏳ Antre', RUNNING: '🔄 Berjalan', FINISHED: '✅ Selesai', FAILED: '❌ Gagal', CANCELLED: '⛔ Dibatalkan'}
+
+
+class Job:
+    """One analysis run; its progress fields are written by the worker thread and read by the page"""
+
+    def __init__(self, name: str, kind: str, config: Dict, run: Callable[['Job'], Awaitable], owner: str = ''):
+        self.id = uuid.uuid4().hex[:8]
+        # Who submitted the job; only they see and can cancel it
+        self.owner = owner
+        self.name = name
+        self.kind = kind
+        self.config = config
+        self.run = run
+        self.status = QUEUED
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.completed = 0
+        self.total = 0
+        self.last_label = ''
+        self.usage_text = ''
+        self.error = ''
+        self.result = None
+        # Rows in completion order, available while the job is still running
+        self.results: List[Dict] = []
+        # Streamed summaries per URL: {'label', 'text', 'done'}
+        self.summaries: Dict[str, Dict] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def update_progress(self, completed: int, total: int, label: str, usage_text: str):
+        self.completed, self.total, self.last_label, self.usage_text = completed, total, label, usage_text
+
+    def update_summary(self, url: str, label: str, text: str, done: bool):
+        self.summaries[url] = {'label': label, 'text': text, 'done': done}
+
+    def add_result(self, result: Dict):
+        self.results.append(result)
+
+    @property
+    def is_active(self) -> bool:
+        return self.status in ACTIVE_STATUSES
+
+    def elapsed(self) -> float:
+        if not self.started_at:
+            return 0.0
+        return (self.finished_at or time.time()) - self.started_at
+
+
+class JobManager:
+    """
+    Runs analysis jobs one after another on a background thread, each in its own event loop.
+    Jobs keep running across Streamlit reruns and browser refreshes; the page only polls their state.
+    Jobs are serial on purpose: they share one NewsProcessor whose scraper, AI pool and usage tracker
+    hold per-job state (cassette, budget, hedging counts), and the scraping/AI workers already run
+    concurrently inside a job. Other analysts' jobs are hidden, but their place in the queue is shown.
+    """
+
+    def __init__(self, max_history: int = 20):
+        self.max_history = max_history
+        self._jobs: 'OrderedDict[str, Job]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._queue: 'queue.Queue[Job]' = queue.Queue()
+        self._worker = threading.Thread(target=self._run_worker, name='senticon-jobs', daemon=True)
+        self._worker.start()
+
+    def submit(self, name: str, kind: str, config: Dict, run: Callable[[Job], Awaitable], owner: str = '') -> Job:
+        """Queue a job; `run(job)` returns the coroutine that does the work and reports through the job's callbacks"""
+        job = Job(name, kind, config, run, owner)
+        with self._lock:
+            self._jobs[job.id] = job
+            self._evict_old_jobs()
+        self._queue.put(job)
+        print(f"🗂️ Job {job.id} queued: {name}")
+        return job
+
+    def _evict_old_jobs(self):
+        finished = [job_id for job_id, job in self._jobs.items() if not job.is_active]
+        for job_id in finished[:max(0, len(self._jobs) - self.max_history)]:
+            del self._jobs[job_id]
+
+    def get(self, job_id: Optional[str], owner: Optional[str] = None) -> Optional[Job]:
+        """The job, if it exists and (when `owner` is given) belongs to `owner`"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job and owner is not None and job.owner != owner:
+            return None
+        return job
+
+    def jobs(self, owner: Optional[str] = None) -> List[Job]:
+        """All jobs, or only those of `owner`"""
+        with self._lock:
+            return [job for job in self._jobs.values() if owner is None or job.owner == owner]
+
+    def queue_position(self, job: Job) -> int:
+        """Number of active jobs (of any owner) that run before this queued job"""
+        with self._lock:
+            return sum(1 for other in self._jobs.values()
+                       if other.is_active and other is not job and other.created_at <= job.created_at)
+
+    def cancel(self, job_id: str, owner: Optional[str] = None):
+        job = self.get(job_id, owner)
+        if not job:
+            return
+        if job.status == QUEUED:
+            job.status = CANCELLED
+            job.finished_at = time.time()
+        elif job.status == RUNNING and job._loop and job._task:
+            job._loop.call_soon_threadsafe(job._task.cancel)
+
+    def _run_worker(self):
+        while True:
+            job = self._queue.get()
+            if job.status != QUEUED:
+                continue
+            job.status, job.started_at = RUNNING, time.time()
+            loop = asyncio.new_event_loop()
+            job._loop = loop
+            try:
+                job._task = loop.create_task(job.run(job))
+                job.result = loop.run_until_complete(job._task)
+                job.status = FINISHED
+            except asyncio.CancelledError:
+                job.status = CANCELLED
+            except Exception as e:
+                traceback.print_exc()
+                job.status, job.error = FAILED, str(e)
+            finally:
+                job.finished_at = time.time()
+                job._loop, job._task = None, None
+                loop.close()
+            print(f"🗂️ Job {job.id} {job.status} after {job.elapsed():.0f}s")
+
+    def summary(self, owner: Optional[str] = None) -> List[Dict]:
+        return [{
+            'Job': job.id,
+            'Nama': job.name,
+            'Status': STATUS_LABELS.get(job.status, job.status),
+            'Progress': f"{job.completed}/{job.total or '?'}",
+            'Durasi (s)': round(job.elapsed()),
+            'Dibuat': time.strftime('%H:%M:%S', time.localtime(job.created_at))
+        } for job in self.jobs(owner)]
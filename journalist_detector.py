@@ -1,11 +1,13 @@
-from newspaper import Article
 from bs4 import BeautifulSoup
 import re
 from typing import Optional, Dict
 
+from cassette import download_article
+
 class JournalistDetector:
     def __init__(self):
-        pass
+        # Record/replay cassette of the current job, shared with the scraper
+        self.cassette = None
 
     def detect_journalist(self, article_data: Dict, content: str) -> Optional[str]:
         # Method 1: Use pre-extracted author from scraper if available
@@ -25,8 +27,9 @@ class JournalistDetector:
 
     def _detect_with_newspaper3k(self, url: str) -> Optional[str]:
         try:
+            from newspaper import Article
             article = Article(url)
-            article.download()
+            download_article(article, self.cassette)
             article.parse()
             
             if hasattr(article, 'authors') and article.authors:
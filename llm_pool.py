@@ -0,0 +1,328 @@
+import contextvars
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from types import SimpleNamespace
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional, Tuple
+
+from cassette import dump_completion, load_completion, request_key
+from metrics import METRICS
+
+
+@lru_cache(maxsize=None)
+def retriable_errors() -> Tuple[type, ...]:
+    """Errors that say something about the endpoint rather than the request, worth trying elsewhere"""
+    # The openai SDK is slow to import; it is only loaded once a call is actually made
+    import openai
+    return (
+        openai.AuthenticationError,
+        openai.PermissionDeniedError,
+        openai.RateLimitError,
+        openai.APIConnectionError,
+        openai.APITimeoutError,
+        openai.InternalServerError
+    )
+
+
+def _openai_client(api_key: str, base_url: str, max_retries: int):
+    from openai import OpenAI
+    return OpenAI(api_key=api_key, base_url=base_url, max_retries=max_retries)
+
+
+def _as_list(value) -> List[str]:
+    if not value:
+        return []
+    if isinstance(value, str):
+        return [v.strip() for v in value.split(',') if v.strip()]
+    return [str(v).strip() for v in value if str(v).strip()]
+
+
+def parse_endpoints(api_keys, base_urls, endpoints: Optional[List[Dict]] = None) -> List[Dict]:
+    """
+    Build endpoint definitions from settings.
+    `endpoints` (list of {api_key, base_url, name}) wins; otherwise keys and URLs are paired,
+    a single key or URL being shared by all entries of the other list.
+    """
+    if endpoints:
+        return [{'name': e.get('name') or f"endpoint-{i + 1}", 'api_key': e['api_key'], 'base_url': e['base_url']}
+                for i, e in enumerate(endpoints) if e.get('api_key') and e.get('base_url')]
+
+    keys, urls = _as_list(api_keys), _as_list(base_urls)
+    if not keys or not urls:
+        return []
+    if len(keys) == 1:
+        keys = keys * len(urls)
+    if len(urls) == 1:
+        urls = urls * len(keys)
+    return [{'name': f"endpoint-{i + 1}", 'api_key': key, 'base_url': url} for i, (key, url) in enumerate(zip(keys, urls))]
+
+
+class LLMEndpoint:
+    def __init__(self, name: str, api_key: str, base_url: str, client_factory: Callable):
+        self.name = name
+        self.base_url = base_url
+        self.api_key = api_key
+        self._client_factory = client_factory
+        self._client = None
+        self.outstanding = 0
+        self.consecutive_failures = 0
+        self.ejected_until = 0.0
+        self.total_requests = 0
+        self.total_failures = 0
+
+    @property
+    def client(self):
+        # Built on the first call, so starting the app does not pay for the SDK
+        if self._client is None:
+            self._client = self._client_factory(self.api_key, self.base_url)
+        return self._client
+
+    def is_healthy(self, now: float) -> bool:
+        return self.ejected_until <= now
+
+
+class HedgingPolicy:
+    """
+    Issue a duplicate request when a call is slower than the observed p95 latency.
+    The share of hedged calls is capped by `max_hedge_ratio` of the calls made with hedging enabled
+    in the current job, to keep the extra cost bounded. Latency history is kept across jobs.
+    """
+
+    def __init__(self, enabled: bool = False, max_hedge_ratio: float = 0.1, quantile: float = 0.95,
+                 min_samples: int = 20, min_delay: float = 1.0, window: int = 200):
+        self.enabled = enabled
+        self.max_hedge_ratio = max_hedge_ratio
+        self.quantile = quantile
+        self.min_samples = min_samples
+        self.min_delay = min_delay
+        self._latencies: Dict[tuple, deque] = {}
+        self._window = window
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+
+    @staticmethod
+    def latency_key(kwargs: Dict) -> tuple:
+        # Latency depends on the model and roughly on the prompt size
+        prompt_chars = sum(len(str(m.get('content', ''))) for m in kwargs.get('messages', []))
+        return kwargs.get('model'), prompt_chars // 2000
+
+    def observe(self, key: tuple, latency: float):
+        with self._lock:
+            self._latencies.setdefault(key, deque(maxlen=self._window)).append(latency)
+
+    def hedge_delay(self, key: tuple) -> Optional[float]:
+        """Seconds to wait before hedging, or None if there is not enough history yet"""
+        with self._lock:
+            samples = sorted(self._latencies.get(key, ()))
+        if len(samples) < self.min_samples:
+            return None
+        return max(self.min_delay, samples[min(len(samples) - 1, int(len(samples) * self.quantile))])
+
+    def reset_counts(self):
+        with self._lock:
+            self.calls = 0
+            self.hedged = 0
+            self.hedge_wins = 0
+
+    def record_call(self):
+        with self._lock:
+            self.calls += 1
+
+    def record_hedge_win(self):
+        with self._lock:
+            self.hedge_wins += 1
+
+    def try_reserve_hedge(self) -> bool:
+        with self._lock:
+            if self.hedged + 1 > self.max_hedge_ratio * max(self.calls, 1):
+                return False
+            self.hedged += 1
+            return True
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {'calls': self.calls, 'hedged': self.hedged, 'hedge_wins': self.hedge_wins}
+
+
+class _PoolCompletions:
+    def __init__(self, pool: 'LLMEndpointPool'):
+        self._pool = pool
+
+    def create(self, **kwargs):
+        return self._pool.create_chat_completion(**kwargs)
+
+
+class LLMEndpointPool:
+    """
+    Spreads chat-completion calls over several API keys/base URLs by least outstanding requests.
+    Endpoints that fail repeatedly are ejected for a cool-down period.
+    Exposes `chat.completions.create(...)` so it can stand in for an `OpenAI` client in the analyzers.
+    """
+
+    def __init__(self, endpoints: List[Dict], failure_threshold: int = 3, ejection_seconds: float = 30.0,
+                 client_factory: Optional[Callable] = None):
+        if client_factory is None:
+            # With several endpoints the pool retries elsewhere, so the SDK only retries once on the same one
+            max_retries = 1 if len(endpoints) > 1 else 2
+            client_factory = lambda api_key, base_url: _openai_client(api_key, base_url, max_retries)
+        self.endpoints = [LLMEndpoint(e['name'], e['api_key'], e['base_url'], client_factory) for e in endpoints]
+        self.failure_threshold = failure_threshold
+        self.ejection_seconds = ejection_seconds
+        self._lock = threading.Lock()
+        self.hedging = HedgingPolicy()
+        self._hedge_executor = ThreadPoolExecutor(max_workers=32, thread_name_prefix="llm-hedge")
+        self.chat = SimpleNamespace(completions=_PoolCompletions(self))
+        # Record/replay cassette of the current job (set by NewsProcessor.start_job)
+        self.cassette = None
+        # UsageTracker of the current job; charged for the losing request of a hedged call
+        self.usage_tracker = None
+
+    def __bool__(self):
+        return bool(self.endpoints)
+
+    def _acquire(self, exclude: set, avoid: frozenset = frozenset()) -> Optional[LLMEndpoint]:
+        with self._lock:
+            now = time.monotonic()
+            candidates = [e for e in self.endpoints if e.name not in exclude]
+            if not candidates:
+                return None
+            # `avoid` is a soft preference, e.g. a hedge should not land on the endpoint that is already slow
+            preferred = [e for e in candidates if e.name not in avoid]
+            candidates = preferred or candidates
+            healthy = [e for e in candidates if e.is_healthy(now)]
+            if healthy:
+                endpoint = min(healthy, key=lambda e: (e.outstanding, e.total_requests))
+            else:
+                # Everything is ejected: use the endpoint that comes back first rather than failing outright
+                endpoint = min(candidates, key=lambda e: e.ejected_until)
+            endpoint.outstanding += 1
+            endpoint.total_requests += 1
+            return endpoint
+
+    def _release(self, endpoint: LLMEndpoint, success: bool):
+        with self._lock:
+            endpoint.outstanding -= 1
+            if success:
+                endpoint.consecutive_failures = 0
+                return
+            endpoint.consecutive_failures += 1
+            endpoint.total_failures += 1
+            if endpoint.consecutive_failures >= self.failure_threshold:
+                endpoint.ejected_until = time.monotonic() + self.ejection_seconds
+                METRICS.inc('llm_ejections_total', endpoint=endpoint.name)
+                print(f"⚠️ LLM endpoint {endpoint.name} ejected for {self.ejection_seconds:.0f}s after {endpoint.consecutive_failures} failures")
+
+    def configure_hedging(self, enabled: bool, max_hedge_ratio: float = 0.1):
+        """Apply a job's hedging settings; the hedge ratio is counted per job"""
+        self.hedging.enabled = enabled
+        self.hedging.max_hedge_ratio = max_hedge_ratio
+        self.hedging.reset_counts()
+
+    def create_chat_completion(self, **kwargs):
+        """Send a chat completion, or record/replay it when a cassette is set"""
+        if self.cassette is None:
+            return self._create_chat_completion(**kwargs)
+        return self.cassette.through('llm', request_key(kwargs), lambda: self._create_chat_completion(**kwargs),
+                                     dump_completion, load_completion, request=kwargs, stream=bool(kwargs.get('stream')))
+
+    def _create_chat_completion(self, **kwargs):
+        """Send a chat completion, hedging slow calls with a duplicate when hedging is enabled"""
+        if not self.endpoints:
+            raise RuntimeError("LLM endpoint pool is empty")
+
+        key = HedgingPolicy.latency_key(kwargs)
+        if not self.hedging.enabled or kwargs.get('stream'):
+            return self._send(kwargs, key)
+        self.hedging.record_call()
+        delay = self.hedging.hedge_delay(key)
+        if delay is None:
+            return self._send(kwargs, key)
+
+        primary_endpoints = set()
+        primary = self._hedge_executor.submit(self._send, kwargs, key, primary_endpoints)
+        done, _ = wait([primary], timeout=delay)
+        if done or not self.hedging.try_reserve_hedge():
+            return primary.result()
+
+        print(f"⏱️ LLM call slower than p95 ({delay:.1f}s), sending hedged request...")
+        METRICS.inc('llm_hedged_total')
+        hedge = self._hedge_executor.submit(self._send, kwargs, key, None, frozenset(primary_endpoints))
+        pending = {primary, hedge}
+        last_error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if future is hedge:
+                        self.hedging.record_hedge_win()
+                    for loser in pending:
+                        self._charge_loser(loser, kwargs.get('model'))
+                    return future.result()
+                last_error = future.exception()
+        raise last_error
+
+    def _charge_loser(self, future, model: Optional[str]):
+        """
+        Cancel the slower request of a hedged call, or, once it is in flight and will be billed anyway,
+        record its usage under the 'hedge' task when it completes. The usage counts towards the job's
+        budget and cost, and towards the row that made the call if the row is still being processed.
+        """
+        if future.cancel():
+            return
+        tracker = self.usage_tracker
+        if tracker is None:
+            return
+        # The row's usage lives in a context variable; the callback runs on the request's thread
+        context = contextvars.copy_context()
+
+        def charge(done):
+            if done.cancelled() or done.exception() is not None:
+                return
+            response = done.result()
+            if getattr(response, 'usage', None):
+                context.run(tracker.record, 'hedge', getattr(response, 'model', None) or model, response.usage)
+        future.add_done_callback(charge)
+
+    def _send(self, kwargs: Dict, key: tuple, used_endpoints: Optional[set] = None, avoid: frozenset = frozenset()):
+        """Send to the least busy healthy endpoint, retrying elsewhere on endpoint errors"""
+        tried, last_error = set(), None
+        while True:
+            endpoint = self._acquire(tried, avoid)
+            if endpoint is None:
+                raise last_error
+            tried.add(endpoint.name)
+            if used_endpoints is not None:
+                used_endpoints.add(endpoint.name)
+            start = time.monotonic()
+            try:
+                response = endpoint.client.chat.completions.create(**kwargs)
+            except retriable_errors() as e:
+                self._release(endpoint, success=False)
+                last_error = e
+                print(f"🔄 LLM endpoint {endpoint.name} failed ({type(e).__name__}), trying another endpoint...")
+                METRICS.inc('llm_failovers_total', endpoint=endpoint.name, error=type(e).__name__)
+                continue
+            except Exception:
+                # Request-level errors (bad request, invalid JSON schema) are not the endpoint's fault
+                self._release(endpoint, success=True)
+                raise
+            self._release(endpoint, success=True)
+            if not kwargs.get('stream'):
+                self.hedging.observe(key, time.monotonic() - start)
+            return response
+
+    def status(self) -> List[Dict]:
+        now = time.monotonic()
+        with self._lock:
+            return [{
+                'Endpoint': e.name,
+                'Base URL': e.base_url,
+                'Sehat': e.is_healthy(now),
+                'Request Aktif': e.outstanding,
+                'Total Request': e.total_requests,
+                'Total Gagal': e.total_failures
+            } for e in self.endpoints]
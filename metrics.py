@@ -0,0 +1,236 @@
+"""
+Process-wide counters and latency histograms for the scraping and AI hot paths,
+exported in the Prometheus text format (file or a local `/metrics` endpoint).
+"""
+import bisect
+import os
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+
+METRIC_PREFIX = 'senticon_'
+
+# Seconds; covers a selector lookup (ms) up to a Playwright render (tens of seconds)
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+METRIC_HELP = {
+    'fetch_seconds': "Time to fetch and extract an article per scraping tier",
+    'fetch_attempts_total': "HTTP attempts per request strategy and outcome",
+    'fetch_retries_total': "HTTP attempts after the first one for the same URL",
+    'parse_seconds': "HTML parsing time (BeautifulSoup)",
+    'clean_seconds': "Time to strip scripts, ads and navigation from the parsed page",
+    'extract_seconds': "Time to extract one field (content, title, author, date) from the page",
+    'extract_total': "Which selector group produced a field",
+    'extraction_seconds': "End-to-end HTML extraction per mode (process pool or thread)",
+    'llm_seconds': "AI call latency per task and model tier",
+    'llm_failovers_total': "AI calls retried on another endpoint",
+    'llm_hedged_total': "Duplicate (hedged) AI requests sent for slow calls",
+    'llm_ejections_total': "Endpoints ejected after repeated failures",
+    'llm_tokens_total': "Tokens reported by the API per task",
+    'local_answers_total': "Answers produced locally without an AI call (pre-filter, local classifier)",
+    'rows_resumed_total': "Rows restored from a checkpoint instead of being processed again",
+    'rows_total': "Processed rows per outcome",
+    'pipeline_stage_seconds': "Busy time per item in each pipeline stage",
+    'article_store_lookups_total': "Article archive lookups before scraping, per outcome (hit = no network request)",
+    'cassette_requests_total': "Requests recorded to or replayed from a cassette, per kind and outcome",
+}
+
+_verbose = os.getenv('SENTICON_VERBOSE', '').strip().lower() in ('1', 'true', 'yes')
+
+
+def set_verbose(enabled: bool):
+    global _verbose
+    _verbose = bool(enabled)
+
+
+def is_verbose() -> bool:
+    return _verbose
+
+
+def debug(message: str):
+    """Per-selector / per-attempt log line; only printed with verbose logging (SENTICON_VERBOSE=1 or --verbose)"""
+    if _verbose:
+        print(message)
+
+
+LabelKey = Tuple[str, Tuple[Tuple[str, str], ...]]
+
+
+def _key(name: str, labels: Dict) -> LabelKey:
+    return name, tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _format_labels(labels: Tuple[Tuple[str, str], ...], extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(labels) + ([extra] if extra else [])
+    if not pairs:
+        return ''
+    escaped = [(k, v.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')) for k, v in pairs]
+    return '{' + ','.join(f'{k}="{v}"' for k, v in escaped) + '}'
+
+
+class Histogram:
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q: float) -> float:
+        """Estimate from the buckets, interpolating linearly inside the bucket that holds the quantile"""
+        if not self.count:
+            return 0.0
+        rank, seen = q * self.count, 0
+        for i, bucket_count in enumerate(self.counts):
+            if seen + bucket_count >= rank and bucket_count:
+                lower = self.buckets[i - 1] if i > 0 else 0.0
+                upper = self.buckets[i] if i < len(self.buckets) else self.buckets[-1]
+                return lower + (upper - lower) * (rank - seen) / bucket_count
+            seen += bucket_count
+        return self.buckets[-1]
+
+
+class MetricsRegistry:
+    """Thread-safe counters and histograms keyed by name and labels"""
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._counters: Dict[LabelKey, float] = {}
+        self._histograms: Dict[LabelKey, Histogram] = {}
+        self.started_at = time.time()
+
+    def inc(self, name: str, amount: float = 1.0, **labels):
+        key = _key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0.0) + amount
+
+    def observe(self, name: str, seconds: float, **labels):
+        key = _key(name, labels)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram(self.buckets)
+            histogram.observe(seconds)
+
+    @contextmanager
+    def timer(self, name: str, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def snapshot(self) -> Dict:
+        """Picklable copy, e.g. to send the numbers of an extraction worker process back to the parent"""
+        with self._lock:
+            return {
+                'counters': dict(self._counters),
+                'histograms': {key: (list(h.counts), h.sum, h.count) for key, h in self._histograms.items()}
+            }
+
+    def merge(self, snapshot: Dict):
+        with self._lock:
+            for key, value in snapshot.get('counters', {}).items():
+                self._counters[key] = self._counters.get(key, 0.0) + value
+            for key, (counts, total, count) in snapshot.get('histograms', {}).items():
+                histogram = self._histograms.get(key)
+                if histogram is None:
+                    histogram = self._histograms[key] = Histogram(self.buckets)
+                histogram.counts = [a + b for a, b in zip(histogram.counts, counts)]
+                histogram.sum += total
+                histogram.count += count
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+            self.started_at = time.time()
+
+    def render_prometheus(self) -> str:
+        lines, described = [], set()
+
+        def describe(name: str, kind: str):
+            if name not in described:
+                described.add(name)
+                help_text = METRIC_HELP.get(name)
+                if help_text:
+                    lines.append(f"# HELP {METRIC_PREFIX}{name} {help_text}")
+                lines.append(f"# TYPE {METRIC_PREFIX}{name} {kind}")
+
+        with self._lock:
+            for (name, labels), value in sorted(self._counters.items()):
+                describe(name, 'counter')
+                lines.append(f"{METRIC_PREFIX}{name}{_format_labels(labels)} {value:g}")
+            for (name, labels), histogram in sorted(self._histograms.items()):
+                describe(name, 'histogram')
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets, histogram.counts):
+                    cumulative += bucket_count
+                    lines.append(f"{METRIC_PREFIX}{name}_bucket{_format_labels(labels, ('le', f'{bound:g}'))} {cumulative}")
+                lines.append(f"{METRIC_PREFIX}{name}_bucket{_format_labels(labels, ('le', '+Inf'))} {histogram.count}")
+                lines.append(f"{METRIC_PREFIX}{name}_sum{_format_labels(labels)} {histogram.sum:.6f}")
+                lines.append(f"{METRIC_PREFIX}{name}_count{_format_labels(labels)} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: str):
+        """Write the text format atomically, e.g. for node_exporter's textfile collector"""
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(self.render_prometheus())
+        os.replace(tmp_path, path)
+
+    def summary(self) -> List[Dict]:
+        """Histogram rows for the metrics tab"""
+        with self._lock:
+            items = sorted(self._histograms.items())
+            return [{
+                'Metrik': name,
+                'Label': ", ".join(f"{k}={v}" for k, v in labels),
+                'Jumlah': h.count,
+                'Rata-rata (s)': round(h.sum / h.count, 4) if h.count else 0.0,
+                'p50 (s)': round(h.quantile(0.5), 4),
+                'p95 (s)': round(h.quantile(0.95), 4),
+                'Total (s)': round(h.sum, 2)
+            } for (name, labels), h in items]
+
+    def counters(self) -> List[Dict]:
+        with self._lock:
+            return [{'Metrik': name, 'Label': ", ".join(f"{k}={v}" for k, v in labels), 'Nilai': value}
+                    for (name, labels), value in sorted(self._counters.items())]
+
+
+# Shared by every module in this process
+METRICS = MetricsRegistry()
+
+
+def start_metrics_server(port: int, host: str = '127.0.0.1', registry: MetricsRegistry = METRICS) -> ThreadingHTTPServer:
+    """Serve `/metrics` on a daemon thread; binds to localhost unless told otherwise"""
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split('?')[0] not in ('/metrics', '/'):
+                self.send_error(404)
+                return
+            body = registry.render_prometheus().encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    threading.Thread(target=server.serve_forever, name='senticon-metrics', daemon=True).start()
+    print(f"📈 Metrics available at http://{host}:{port}/metrics")
+    return server
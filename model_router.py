@@ -0,0 +1,114 @@
+import threading
+from typing import Dict, List, Optional
+
+from content_compressor import estimate_tokens
+
+DEFAULT_MODEL_TIERS = {
+    'lite': 'models/gemini-2.5-flash-lite',
+    'standard': 'models/gemini-2.5-flash'
+}
+
+# Estimated USD per 1M tokens, only used to compare tiers in the job report
+DEFAULT_TIER_PRICING = {
+    'lite': {'input': 0.10, 'output': 0.40},
+    'standard': {'input': 0.30, 'output': 2.50}
+}
+
+# Rough output sizes per task, used until real usage numbers are available
+OUTPUT_TOKEN_ESTIMATE = {'sentiment': 80, 'category': 15, 'summary': 300}
+
+# Prompt instructions added around the article text
+PROMPT_OVERHEAD_TOKENS = 150
+
+ROUTING_POLICIES = ["Otomatis (Tugas & Panjang Input)", "Selalu Standard", "Selalu Lite"]
+
+
+class ModelRouter:
+    def __init__(self, model_tiers: Optional[Dict[str, str]] = None, tier_pricing: Optional[Dict[str, Dict]] = None,
+                 short_input_chars: int = 1500, long_summary_chars: int = 2000):
+        self.model_tiers = {**DEFAULT_MODEL_TIERS, **{k: v for k, v in (model_tiers or {}).items() if v}}
+        self.tier_pricing = {**DEFAULT_TIER_PRICING, **(tier_pricing or {})}
+        self.short_input_chars = short_input_chars
+        self.long_summary_chars = long_summary_chars
+
+    def route(self, task: str, input_chars: int, analysis_source: str, config: Dict) -> str:
+        """Pick a model tier for a (task, input length, analysis source) combination"""
+        policy = config.get('routing_policy', ROUTING_POLICIES[0])
+        if policy == "Selalu Standard":
+            return 'standard'
+        if policy == "Selalu Lite":
+            return 'lite'
+
+        is_title_like = analysis_source in ('title_only', 'title_fallback', 'snippet_fallback')
+
+        if task == 'category':
+            return 'lite'
+        if task == 'sentiment':
+            return 'lite' if is_title_like or input_chars < self.short_input_chars else 'standard'
+        if task == 'summary':
+            summary_type = config.get('summarize_config', {}).get('summary_type')
+            if summary_type == 'Detail' or input_chars >= self.long_summary_chars:
+                return 'standard'
+            return 'lite'
+        return 'standard'
+
+    def model_for(self, tier: str) -> str:
+        return self.model_tiers.get(tier, self.model_tiers['standard'])
+
+    def tier_for_model(self, model: Optional[str]) -> str:
+        """Map a model name (with or without the `models/` prefix) back to its tier"""
+        name = (model or '').split('/')[-1]
+        for tier, tier_model in self.model_tiers.items():
+            if tier_model.split('/')[-1] == name:
+                return tier
+        return 'standard'
+
+    def estimate_cost(self, tier: str, input_tokens: int, output_tokens: int) -> float:
+        pricing = self.tier_pricing.get(tier, self.tier_pricing['standard'])
+        return (input_tokens * pricing['input'] + output_tokens * pricing['output']) / 1_000_000
+
+
+class RoutingStats:
+    """Per-tier, per-task latency and estimated cost for one job"""
+
+    def __init__(self, router: ModelRouter):
+        self.router = router
+        self._lock = threading.Lock()
+        self._latencies: Dict[tuple, List[float]] = {}
+        self._costs: Dict[tuple, float] = {}
+
+    def record(self, tier: str, task: str, latency: float, input_text: str, output_tokens: Optional[int] = None,
+               cost: Optional[float] = None) -> float:
+        """Record one call; `cost` from real usage wins over the length-based estimate"""
+        if cost is None:
+            input_tokens = estimate_tokens(input_text) + PROMPT_OVERHEAD_TOKENS
+            if output_tokens is None:
+                output_tokens = OUTPUT_TOKEN_ESTIMATE.get(task, 100)
+            cost = self.router.estimate_cost(tier, input_tokens, output_tokens)
+
+        with self._lock:
+            self._latencies.setdefault((tier, task), []).append(latency)
+            self._costs[(tier, task)] = self._costs.get((tier, task), 0.0) + cost
+        return cost
+
+    def latencies(self) -> List[float]:
+        """Latency of every recorded call, all tiers and tasks"""
+        with self._lock:
+            return [latency for values in self._latencies.values() for latency in values]
+
+    def summary(self) -> List[Dict]:
+        rows = []
+        with self._lock:
+            for (tier, task), latencies in sorted(self._latencies.items()):
+                ordered = sorted(latencies)
+                p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+                rows.append({
+                    'Tier': tier,
+                    'Model': self.router.model_for(tier),
+                    'Tugas': task,
+                    'Panggilan': len(ordered),
+                    'Latensi Rata-rata (s)': round(sum(ordered) / len(ordered), 2),
+                    'Latensi p95 (s)': round(p95, 2),
+                    'Estimasi Biaya (USD)': round(self._costs[(tier, task)], 5)
+                })
+        return rows
@@ -0,0 +1,755 @@
+import asyncio
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+from typing import AsyncIterator, Callable, Dict, List, Optional, Union
+
+import pandas as pd
+
+from scraper import NewsScraper
+from article_store import ArticleStore
+from sentiment_analyzer import SentimentAnalyzer
+from journalist_detector import JournalistDetector
+from summarizer import ArticleSummarizer
+from category_analyzer import CategoryAnalyzer
+from content_compressor import ContentCompressor
+from relevance_filter import PREFILTER_SOURCES, RelevanceFilter
+from model_router import ModelRouter, RoutingStats
+from llm_pool import LLMEndpointPool, parse_endpoints
+from usage_tracker import BUDGET_SKIPPED, BudgetExhausted, UsageTracker, current_row_usage
+from pipeline import Stage, StagedPipeline, run_in_thread
+from checkpoint import CheckpointStore
+from input_reader import RowRecord, TableReader, dataframe_records
+from metrics import METRICS
+from tracing import ChromeTraceWriter, RowTrace, span
+from cassette import DEFAULT_CASSETTE_DIR, Cassette
+from export_writers import DEFAULT_EXPORT_DIR
+
+# on_progress(completed, total, label, usage_text)
+ProgressCallback = Callable[[int, int, str, str], None]
+# on_summary(url, label, summary_so_far, done)
+SummaryCallback = Callable[[str, str, str, bool], None]
+# on_result(row_result), called as soon as a row is finished
+ResultCallback = Callable[[Dict], None]
+
+
+class NewsProcessor:
+    """
+    Scraping and AI analysis of news URLs, independent of any UI.
+    Used by the Streamlit app and by the command-line runner; progress is reported through callbacks.
+    """
+
+    def __init__(self, api_key: Optional[str], base_url: Optional[str], api_keys=None, base_urls=None,
+                 endpoints: Optional[List[Dict]] = None, model_tiers: Optional[Dict[str, str]] = None,
+                 article_store: Optional[ArticleStore] = None):
+        self.scraper = NewsScraper()
+        # Scraped articles are archived here and reused by later jobs (None: always scrape, keep nothing)
+        self.article_store = article_store
+        self.scraper.article_store = article_store
+
+        # One endpoint pool shared by all AI modules; extra keys/URLs spread the load
+        self.llm_pool = LLMEndpointPool(parse_endpoints(api_keys or api_key, base_urls or base_url, endpoints))
+
+        # Initialize AI modules with credentials
+        self.sentiment_analyzer = SentimentAnalyzer(api_key=api_key, base_url=base_url, client=self.llm_pool or None)
+        self.journalist_detector = JournalistDetector()
+        self.summarizer = ArticleSummarizer(api_key=api_key, base_url=base_url, client=self.llm_pool or None)
+        self.category_analyzer = CategoryAnalyzer(api_key=api_key, base_url=base_url, client=self.llm_pool or None)
+        self.content_compressor = ContentCompressor()
+        self.relevance_filter = RelevanceFilter()
+        self.model_router = ModelRouter(model_tiers=model_tiers)
+        self._stats_lock = threading.Lock()
+
+    def _prepare_analysis_text(self, text: str, task: str, config: Dict) -> str:
+        """Compress the analysis text for one AI task and record the tokens saved for the job"""
+        compressed = self.content_compressor.compress_for_task(text, task, config)
+        if compressed is None:
+            return text
+
+        self._bump_stat(config, 'tokens_saved', compressed['tokens_saved'])
+        self._bump_stat(config, 'compressed_calls')
+        return compressed['text']
+
+    def _bump_stat(self, config: Dict, key: str, amount: int = 1):
+        # Analyses run on worker threads in the Excel pipeline, so counters are updated under a lock
+        with self._stats_lock:
+            job_stats = config.setdefault('job_stats', {})
+            job_stats[key] = job_stats.get(key, 0) + amount
+
+    def _new_job_stats(self) -> Dict:
+        return {'tokens_saved': 0, 'compressed_calls': 0, 'prefilter_skipped': 0, 'category_local': 0, 'category_llm': 0,
+                'routing': RoutingStats(self.model_router)}
+
+    def start_job(self, config: Dict):
+        """Reset per-job statistics and apply job-level AI settings"""
+        config['job_stats'] = self._new_job_stats()
+        hedging_config = config.get('hedging_config') or {}
+        self.llm_pool.configure_hedging(hedging_config.get('enabled', False), hedging_config.get('max_hedge_ratio', 0.1))
+        self.scraper.extraction_processes = (config.get('pipeline_config') or {}).get('extraction_processes', 0)
+        self.scraper.reuse_archived = config.get('reuse_archived_articles', True)
+
+        budget_config = config.get('budget_config') or {}
+        tracker = UsageTracker(self.model_router, budget_config.get('max_cost_usd', 0.0), budget_config.get('max_tokens', 0))
+        config['job_stats']['usage'] = tracker
+        for analyzer in (self.sentiment_analyzer, self.summarizer, self.category_analyzer):
+            analyzer.usage_tracker = tracker
+        self.llm_pool.usage_tracker = tracker
+
+        trace_config = config.get('trace_config') or {}
+        if trace_config.get('enabled'):
+            trace_path = trace_config.get('path') or os.path.join(DEFAULT_EXPORT_DIR, f"trace_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+            config['job_stats']['trace'] = ChromeTraceWriter(trace_path)
+
+        # Record every scraper/AI response of the job, or serve them from an earlier recording
+        cassette_config = config.get('cassette_config') or {}
+        cassette = None
+        if cassette_config.get('mode') in ('record', 'replay'):
+            cassette_path = cassette_config.get('path') or os.path.join(DEFAULT_CASSETTE_DIR, f"cassette_{datetime.now().strftime('%Y%m%d_%H%M%S')}.jsonl.gz")
+            cassette = Cassette(cassette_path, cassette_config['mode'], cassette_config.get('replay_latency', False))
+            config['job_stats']['cassette'] = cassette
+            print(f"📼 {'Recording to' if cassette.recording else 'Replaying'} cassette {cassette.path}")
+        self.scraper.cassette = self.llm_pool.cassette = self.journalist_detector.cassette = cassette
+
+    def _usage_tracker(self, config: Dict) -> UsageTracker:
+        job_stats = config.setdefault('job_stats', {})
+        if 'usage' not in job_stats:
+            job_stats['usage'] = UsageTracker(self.model_router)
+        return job_stats['usage']
+
+    def _row_usage_columns(self, row_usage: Dict, suffix: str = '') -> Dict:
+        return {
+            f'Tokens_Input{suffix}': row_usage['input_tokens'],
+            f'Tokens_Output{suffix}': row_usage['output_tokens'],
+            f'Biaya_USD{suffix}': round(row_usage['cost'], 6)
+        }
+
+    def _new_progress(self, total: int, on_progress: Optional[ProgressCallback]) -> Dict:
+        return {'lock': asyncio.Lock(), 'completed': 0, 'total': total, 'on_progress': on_progress}
+
+    async def _update_progress(self, progress_info: Dict, config: Dict, label: str):
+        """Count a finished item and report it with the running token/cost totals of the job"""
+        async with progress_info['lock']:
+            progress_info['completed'] += 1
+            if progress_info['on_progress']:
+                progress_info['on_progress'](progress_info['completed'], progress_info['total'], label, self._usage_tracker(config).progress_text())
+
+    def _routed_call(self, task: str, text: str, analysis_source: str, config: Dict, call_log: List[str], call):
+        """
+        Call an analyzer with the model tier picked by the router, recording latency and cost.
+        Raises BudgetExhausted instead of calling once the job budget is used up.
+        """
+        if self._usage_tracker(config).budget_exhausted():
+            raise BudgetExhausted(task)
+        tier = self.model_router.route(task, len(text), analysis_source, config)
+        row_usage = current_row_usage.get()
+        usage_before = dict(row_usage) if row_usage is not None else None
+        start = time.perf_counter()
+        try:
+            with span(f"llm.{task}", tier=tier):
+                return call(self.model_router.model_for(tier))
+        finally:
+            latency = time.perf_counter() - start
+            METRICS.observe('llm_seconds', latency, task=task, tier=tier)
+            routing_stats = config.setdefault('job_stats', {}).setdefault('routing', RoutingStats(self.model_router))
+            output_tokens = int(config.get('summarize_config', {}).get('max_length', 150) * 1.4) if task == 'summary' else None
+            # Prefer the cost from the usage the API reported; fall back to the estimate when it reported none
+            actual_cost = None
+            if usage_before is not None and row_usage['input_tokens'] + row_usage['output_tokens'] > usage_before['input_tokens'] + usage_before['output_tokens']:
+                actual_cost = row_usage['cost'] - usage_before['cost']
+            cost = routing_stats.record(tier, task, latency, text, output_tokens, cost=actual_cost)
+            call_log.append(f"{task}={tier} {latency:.1f}s ${cost:.5f}")
+
+    @staticmethod
+    def _planned_ai_tasks(analysis_text: str, config: Dict) -> List[str]:
+        """The AI tasks a row with this analysis text runs, in order"""
+        if not analysis_text:
+            return []
+        tasks = []
+        if config['enable_sentiment'] and config['sentiment_context']:
+            tasks.append('sentiment')
+        if config['enable_summarize'] and len(analysis_text.strip()) > 50:
+            tasks.append('summary')
+        if config['enable_categorization'] and config.get('categorization_config', {}).get('categories_with_desc'):
+            tasks.append('category')
+        return tasks
+
+    @staticmethod
+    def _budget_status(tasks: List[str], refused_task: str) -> str:
+        """`AI_Status` when the budget ran out at `refused_task`: the row, or the tasks from there on, were skipped"""
+        skipped = tasks[tasks.index(refused_task):] if refused_task in tasks else tasks
+        if skipped == tasks:
+            return BUDGET_SKIPPED
+        return f"{BUDGET_SKIPPED}: {', '.join(skipped)}"
+
+    def _analyze_sentiments(self, analysis_text: str, analysis_source: str, config: Dict, call_log: List[str]) -> Dict[str, Dict]:
+        """Run the local relevance pre-filter per context, then one AI call for the contexts that are mentioned"""
+        contexts = config.get('sentiment_contexts') or [config['sentiment_context']]
+        prefilter = config.get('sentiment_prefilter') or {}
+        results, remaining = {}, []
+
+        for context in contexts:
+            local_result = None
+            if prefilter.get('enabled') and analysis_source in PREFILTER_SOURCES:
+                local_result = self.relevance_filter.check(analysis_text, context, prefilter.get('aliases'))
+            if local_result:
+                self._bump_stat(config, 'prefilter_skipped')
+                METRICS.inc('local_answers_total', kind='prefilter')
+                results[context] = local_result
+            else:
+                remaining.append(context)
+
+        if len(remaining) == 1:
+            sentiment_text = self._prepare_analysis_text(analysis_text, 'sentiment', config)
+            results[remaining[0]] = self._routed_call('sentiment', sentiment_text, analysis_source, config, call_log,
+                lambda model_name: self.sentiment_analyzer.analyze_sentiment(sentiment_text, remaining[0], model_name=model_name))
+        elif remaining:
+            sentiment_text = self._prepare_analysis_text(analysis_text, 'sentiment', config)
+            results.update(self._routed_call('sentiment', sentiment_text, analysis_source, config, call_log,
+                lambda model_name: self.sentiment_analyzer.analyze_sentiment_multi(sentiment_text, remaining, model_name=model_name)))
+
+        return {context: results.get(context) for context in contexts}
+
+    def _summarize(self, analysis_text: str, analysis_source: str, config: Dict, call_log: List[str], on_update=None) -> Optional[Dict]:
+        summary_text = self._prepare_analysis_text(analysis_text, 'summary', config)
+        if on_update:
+            return self._routed_call('summary', summary_text, analysis_source, config, call_log,
+                lambda model_name: self.summarizer.summarize_article_stream(summary_text, config['summarize_config'], on_update, model_name=model_name))
+        return self._routed_call('summary', summary_text, analysis_source, config, call_log,
+            lambda model_name: self.summarizer.summarize_article(summary_text, config['summarize_config'], model_name=model_name))
+
+    def _sentiment_columns(self, sentiments: Dict[str, Dict], single_keys: Dict[str, str]) -> Dict:
+        """Map per-context results to columns: `single_keys` for one context, `Sentiment [konteks]` etc. for several"""
+        if len(sentiments) == 1:
+            sentiment = next(iter(sentiments.values()))
+            if not sentiment:
+                return {single_keys['sentiment']: 'Gagal AI'}
+            return {column: sentiment.get(key, 'Gagal' if key == 'sentiment' else '') for key, column in single_keys.items()}
+
+        columns = {}
+        for context, sentiment in sentiments.items():
+            sentiment = sentiment or {'sentiment': 'Gagal AI'}
+            columns[f'Sentiment [{context}]'] = sentiment.get('sentiment', 'Gagal')
+            columns[f'Confidence [{context}]'] = sentiment.get('confidence', '')
+            columns[f'Reasoning [{context}]'] = sentiment.get('reasoning', '')
+        return columns
+
+    def _analyze_category(self, analysis_text: str, analysis_source: str, config: Dict, call_log: List[str]) -> str:
+        """Answer from the local classifier when confident, otherwise ask the AI and learn from its answer"""
+        categorization_config = config['categorization_config']
+        classifier = categorization_config.get('local_classifier')
+
+        if classifier and classifier.is_ready():
+            prediction = classifier.predict(analysis_text)
+            if prediction and prediction[1] >= categorization_config.get('local_confidence_threshold', 0.8):
+                self._bump_stat(config, 'category_local')
+                METRICS.inc('local_answers_total', kind='local_classifier')
+                return prediction[0]
+
+        category_text = self._prepare_analysis_text(analysis_text, 'category', config)
+        category = self._routed_call('category', category_text, analysis_source, config, call_log,
+            lambda model_name: self.category_analyzer.analyze_category(category_text, categorization_config['categories_with_desc'], model_name=model_name))
+        self._bump_stat(config, 'category_llm')
+        if classifier:
+            classifier.add_example(analysis_text, category)
+        return category
+
+    def finish_job(self, config: Dict):
+        """Persist state learned during the job"""
+        # The pool's hedge counters are reset by start_job; keep this job's counts with its stats
+        config.setdefault('job_stats', {})['hedging'] = self.llm_pool.hedging.stats()
+        classifier = config.get('categorization_config', {}).get('local_classifier')
+        if classifier:
+            classifier.flush()
+        trace_writer = config.get('job_stats', {}).get('trace')
+        if trace_writer:
+            trace_writer.close()
+            print(f"🔍 Trace of {trace_writer.rows_written} rows written to {trace_writer.path}")
+        cassette = config.get('job_stats', {}).get('cassette')
+        if cassette:
+            cassette.close()
+            print(cassette.summary())
+        # The processor outlives the job (the app shares it across reruns); later jobs use the network again
+        self.scraper.cassette = self.llm_pool.cassette = self.journalist_detector.cassette = None
+
+    def _new_trace(self, config: Dict, label: str) -> Optional[RowTrace]:
+        return RowTrace(label) if (config.get('trace_config') or {}).get('enabled') else None
+
+    def _finish_trace(self, trace: Optional[RowTrace], result: Dict, config: Dict, suffix: str = ''):
+        """Add the row's timing columns and stream its spans to the job's trace file"""
+        if trace is None:
+            return
+        trace.finish()
+        result[f'Durasi_Detik{suffix}'] = round(trace.total_seconds(), 2)
+        result[f'Trace{suffix}'] = trace.summary()
+        trace_writer = config.get('job_stats', {}).get('trace')
+        if trace_writer:
+            trace_writer.write(trace)
+
+    async def process_single_url_async(self, url_data: Dict, config: Dict, progress_info: Dict):
+        trace = self._new_trace(config, url_data['url'])
+        with trace.activate() if trace else nullcontext():
+            result = await self._process_url(url_data, config, progress_info)
+        self._finish_trace(trace, result, config)
+        return result
+
+    async def _process_url(self, url_data: Dict, config: Dict, progress_info: Dict):
+        url = url_data['url']
+        manual_title = url_data.get('title')
+        
+        try:
+            result = {'URL': url}
+            if manual_title and config.get('use_manual_title', False):
+                result['Title'] = manual_title
+
+            content, scraping_success, article_data = "", False, {}
+            
+            # --- Smart Scraping Logic ---
+            # Determine if any form of scraping is needed at all.
+            is_full_scrape_needed = config['enable_scraping']
+            is_metadata_needed = config['enable_date'] or config['enable_journalist']
+            is_content_needed_for_analysis = config['analysis_source_option'] == 'Teks Lengkap (Fallback ke Judul)' and (config['enable_sentiment'] or config['enable_summarize'] or config['enable_categorization'])
+
+            needs_scraping = is_full_scrape_needed or is_metadata_needed or is_content_needed_for_analysis
+
+            if needs_scraping:
+                # If full text is explicitly requested, do a full scrape. Otherwise, a basic scrape might suffice.
+                basic_only = not is_full_scrape_needed
+                with span('fetch'):
+                    article_data = await self.scraper.scrape_article(url, timeout=config['scraping_timeout'], basic_only=basic_only)
+                
+                if article_data and article_data.get('content') and len(article_data.get('content', '').strip()) > 100:
+                    if 'Title' not in result: result['Title'] = article_data.get('title', 'Gagal mengambil judul')
+                    if config['enable_date']: result['Publish_Date'] = article_data.get('publish_date', '')
+                    if is_full_scrape_needed: result['Content'] = article_data.get('content', '')
+                    
+                    result['Scraping_Method'] = article_data.get('method', 'unknown')
+                    content, scraping_success = article_data.get('content', ''), True
+                else:
+                    # Even if scraping fails, we might get a title
+                    if 'Title' not in result:
+                        with span('title_fallback'):
+                            result['Title'] = self.scraper.get_title_newspaper3k(url)
+                    result.update({'Content': 'Gagal scraping', 'Scraping_Method': 'failed'})
+            
+            # --- Journalist Detection ---
+            # This can only run if scraping was performed and successful.
+            if config['enable_journalist']:
+                if scraping_success and content:
+                    with span('journalist'):
+                        result['Journalist'] = self.journalist_detector.detect_journalist(article_data, content)
+                else:
+                    result['Journalist'] = 'Tidak diproses (scraping gagal/dilewati)'
+            
+            # --- Smart Text Selection for Analysis ---
+            analysis_text, analysis_source = "", "none"
+            title = result.get('Title', '')
+            has_valid_content = scraping_success and content and len(content.strip()) > 100
+            has_valid_title = title and title != 'Gagal mengambil judul'
+
+            if config['analysis_source_option'] == 'Hanya Judul':
+                if has_valid_title:
+                    analysis_text, analysis_source = title, "title_only"
+            else: # Teks Lengkap (Fallback ke Judul)
+                if has_valid_content:
+                    analysis_text, analysis_source = content, "content"
+                elif has_valid_title:
+                    analysis_text, analysis_source = title, "title_fallback"
+            
+            result['Analysis_Source'] = analysis_source
+
+            # --- Run Analyses on the selected text ---
+            call_log = []
+            tracker = self._usage_tracker(config)
+            tasks = self._planned_ai_tasks(analysis_text, config)
+            if tasks and tracker.budget_exhausted():
+                result['AI_Status'] = BUDGET_SKIPPED
+                tasks = []
+
+            with tracker.row_scope() as row_usage:
+                try:
+                    if 'sentiment' in tasks:
+                        sentiments = self._analyze_sentiments(analysis_text, analysis_source, config, call_log)
+                        result.update(self._sentiment_columns(sentiments, {'sentiment': 'sentiment', 'confidence': 'confidence', 'reasoning': 'reasoning'}))
+
+                    if 'summary' in tasks:
+                        on_summary = progress_info.get('on_summary')
+                        label = result.get('Title') or url
+                        on_update = (lambda partial: on_summary(url, label, partial, False)) if on_summary else None
+                        summary = self._summarize(analysis_text, analysis_source, config, call_log, on_update)
+                        result['Summary'] = summary.get('summary', 'Gagal membuat ringkasan')
+                        if on_summary:
+                            on_summary(url, label, result['Summary'], True)
+
+                    if 'category' in tasks:
+                        category = self._analyze_category(analysis_text, analysis_source, config, call_log)
+                        result['Category'] = category
+                except BudgetExhausted as e:
+                    result['AI_Status'] = self._budget_status(tasks, e.task)
+
+            if call_log:
+                result['Model_Routing'] = "; ".join(call_log)
+                result.update(self._row_usage_columns(row_usage))
+
+            return result
+        except Exception as e:
+            return {'URL': url, 'Title': f'Error: {str(e)}', 'Content': 'Error'}
+        finally:
+            await self._update_progress(progress_info, config, url)
+
+    async def process_urls_async(self, url_data_list: List[Dict], config: Dict, on_progress: Optional[ProgressCallback] = None,
+                                 on_summary: Optional[SummaryCallback] = None, on_result: Optional[ResultCallback] = None) -> List[Dict]:
+        """Process a short list of URLs concurrently; `on_summary` receives streamed summaries as they are written"""
+        progress_info = self._new_progress(len(url_data_list), on_progress)
+        progress_info['on_summary'] = on_summary
+        self.start_job(config)
+
+        async def process_and_report(url_data: Dict) -> Dict:
+            result = await self.process_single_url_async(url_data, config, progress_info)
+            METRICS.inc('rows_total', outcome=self._row_outcome(result))
+            if on_result:
+                on_result(result)
+            return result
+
+        try:
+            results = await asyncio.gather(*[process_and_report(url_data) for url_data in url_data_list])
+        finally:
+            # Also on cancel/failure: close the trace and cassette files and keep the learned examples
+            self.finish_job(config)
+        
+        original_urls = [d['url'] for d in url_data_list]
+        url_map = {res['URL']: res for res in results}
+        ordered_results = [url_map[url] for url in original_urls]
+        return ordered_results
+
+    @contextmanager
+    def _stage_span(self, item: Dict, name: str):
+        """Record a pipeline stage, and everything called from it, on the row's trace"""
+        trace = item.get('trace')
+        if trace is None:
+            yield
+            return
+        with trace.activate(), span(name):
+            yield
+
+    async def _fetch_row(self, item: Dict, config: Dict) -> Dict:
+        """Pipeline stage 1 (network): scrape the row's URL"""
+        if item['url'] and config['enable_scraping']:
+            with self._stage_span(item, 'fetch'):
+                item['article_data'] = await self.scraper.scrape_article(item['url'], timeout=config['scraping_timeout'])
+        return item
+
+    async def _prepare_row(self, item: Dict, column_mapping: Dict, config: Dict) -> Dict:
+        """
+        Pipeline stage 2: fill the scraped columns, pick the text to analyze and detect the journalist.
+        HTML is parsed in the fetch stage; journalist detection can download the page again, so it runs on a thread.
+        """
+        if not item['url']:
+            return item
+        return await run_in_thread(self._prepare_row_sync, item, column_mapping, config)
+
+    def _prepare_row_sync(self, item: Dict, column_mapping: Dict, config: Dict) -> Dict:
+        result, row, url = item['result'], item['row'], item['url']
+        if not url:
+            return item
+
+        snippet = str(row.get(column_mapping.get('snippet_column')) or '') if column_mapping.get('snippet_column') else ""
+        content, scraping_success, article_data = "", False, item.get('article_data') or {}
+
+        if config['enable_scraping']:
+            if article_data and article_data.get('content') and len(article_data.get('content', '').strip()) > 100:
+                # If the user wants to use the title from the Excel file, we don't scrape for a new one.
+                if not config.get('excel_use_existing_title', False):
+                    result['Judul_New'] = article_data.get('title', 'Gagal')
+                result['Publish_Date_New'] = article_data.get('publish_date', '')
+                result['Content_New'] = article_data.get('content', '')
+                result['Scraping_Method_New'] = article_data.get('method', 'unknown')
+                content, scraping_success = article_data.get('content', ''), True
+            else:
+                result.update({'Content_New': 'Gagal scraping', 'Scraping_Method_New': 'failed'})
+        
+        # --- Smart Text Selection for Analysis ---
+        analysis_text, analysis_source = "", "none"
+        title = result.get('Judul_New', row.get('Judul') or '') # Use existing or new title
+        has_valid_content = scraping_success and content and len(content.strip()) > 100
+        has_valid_title = title and title != 'Gagal'
+        
+        if config['analysis_source_option'] == 'Hanya Judul':
+            if has_valid_title:
+                analysis_text, analysis_source = title, "title_only"
+            elif snippet:
+                analysis_text, analysis_source = snippet, "snippet_fallback"
+        else: # Teks Lengkap (Fallback ke Judul)
+            if has_valid_content:
+                analysis_text, analysis_source = content, "content"
+            elif has_valid_title:
+                analysis_text, analysis_source = title, "title_fallback"
+            elif snippet:
+                analysis_text, analysis_source = snippet, "snippet_fallback"
+
+        result['Analysis_Source_New'] = analysis_source
+
+        if config['enable_journalist'] and analysis_text:
+            with self._stage_span(item, 'journalist'):
+                result['Journalist_New'] = self.journalist_detector.detect_journalist(article_data, analysis_text)
+
+        item['analysis_text'], item['analysis_source'] = analysis_text, analysis_source
+        # The HTML-derived data is not needed any more; don't keep it alive in later queues
+        item.pop('article_data', None)
+        return item
+
+    def _analyze_row_sync(self, item: Dict, config: Dict) -> Dict:
+        result = item['result']
+        analysis_text, analysis_source = item.get('analysis_text', ''), item.get('analysis_source', 'none')
+
+        call_log = []
+        tracker = self._usage_tracker(config)
+        tasks = self._planned_ai_tasks(analysis_text, config)
+        if tasks and tracker.budget_exhausted():
+            result['AI_Status_New'] = BUDGET_SKIPPED
+            tasks = []
+
+        with tracker.row_scope() as row_usage:
+            try:
+                if 'sentiment' in tasks:
+                    sentiments = self._analyze_sentiments(analysis_text, analysis_source, config, call_log)
+                    result.update(self._sentiment_columns(sentiments, {'sentiment': 'Sentiment_New', 'confidence': 'Confidence_New', 'reasoning': 'Reasoning_New'}))
+
+                if 'summary' in tasks:
+                    summary = self._summarize(analysis_text, analysis_source, config, call_log)
+                    result['Summary_New'] = summary.get('summary', 'Gagal') if summary else 'Gagal AI'
+
+                if 'category' in tasks:
+                    category = self._analyze_category(analysis_text, analysis_source, config, call_log)
+                    result['Category_New'] = category
+            except BudgetExhausted as e:
+                result['AI_Status_New'] = self._budget_status(tasks, e.task)
+
+        if call_log:
+            result['Model_Routing_New'] = "; ".join(call_log)
+            result.update(self._row_usage_columns(row_usage, '_New'))
+        return item
+
+    async def _analyze_row(self, item: Dict, config: Dict) -> Dict:
+        """Pipeline stage 3 (AI): the analyzers are blocking, so they run on a worker thread"""
+        if not item['url']:
+            return item
+        # run_in_thread copies the context, so the analyzers' LLM calls land on this row's trace
+        with self._stage_span(item, 'analyze'):
+            return await run_in_thread(self._analyze_row_sync, item, config)
+
+    def _new_row_item(self, record: RowRecord, column_mapping: Dict, config: Dict) -> Dict:
+        index, row = record
+        result = dict(row)
+        result['original_index'] = index
+        url = row.get(column_mapping['url_column']) or ''
+        return {'row': row, 'result': result, 'url': url, 'trace': self._new_trace(config, str(url or index))}
+
+    async def _read_records(self, source: TableReader, chunk_size: int) -> AsyncIterator[RowRecord]:
+        """Parse the input in chunks on a thread of its own so the event loop keeps serving the pipeline"""
+        chunks = source.iter_chunks(chunk_size)
+        reader_thread = ThreadPoolExecutor(max_workers=1, thread_name_prefix="pipeline-read")
+        try:
+            while True:
+                chunk = await run_in_thread(next, chunks, None, executor=reader_thread)
+                if chunk is None:
+                    return
+                for record in chunk:
+                    yield record
+        finally:
+            chunks.close()
+            reader_thread.shutdown(wait=False)
+
+    async def process_single_row_async(self, record: RowRecord, column_mapping: Dict, config: Dict):
+        item = self._new_row_item(record, column_mapping, config)
+        item = await self._fetch_row(item, config)
+        item = await self._prepare_row(item, column_mapping, config)
+        item = await self._analyze_row(item, config)
+        self._finish_trace(item['trace'], item['result'], config, '_New')
+        return item['result']
+    
+    async def process_rows_async(self, source: Union[pd.DataFrame, TableReader], column_mapping: Dict, config: Dict,
+                                 on_progress: Optional[ProgressCallback] = None,
+                                 checkpoint: Optional[CheckpointStore] = None, job_id: Optional[str] = None,
+                                 on_result: Optional[ResultCallback] = None) -> pd.DataFrame:
+        """
+        Process the rows of a DataFrame or a streaming `TableReader` through the fetch → extract → analyze pipeline.
+        With a checkpoint store, finished rows are journaled under `job_id` and skipped when the job is run again.
+        """
+        # Counting the rows of a file would be another full pass over it; without a known count
+        # progress is reported with a total of 0 (unknown)
+        total = len(source) if isinstance(source, pd.DataFrame) else (source.known_length or 0)
+        progress_info = self._new_progress(total, on_progress)
+
+        processed_results = []
+        if (config.get('cassette_config') or {}).get('mode'):
+            # A recorded or replayed job has to run every row through the cassette; resuming would skip rows
+            checkpoint = None
+        if checkpoint and job_id:
+            processed_results = checkpoint.load_results(job_id)
+            checkpoint.start_job(job_id, config.get('job_name', ''), total)
+            if processed_results:
+                METRICS.inc('rows_resumed_total', len(processed_results))
+                print(f"♻️ Resuming job {job_id}: {len(processed_results)} rows already done")
+        done_indices = {result['original_index'] for result in processed_results}
+        if on_result:
+            for result in processed_results:
+                on_result(result)
+        progress_info['completed'] = len(done_indices)
+
+        pipeline_config = config.get('pipeline_config') or {}
+        pipeline = StagedPipeline([
+            Stage('fetch', lambda item: self._fetch_row(item, config), pipeline_config.get('fetch_workers', 8)),
+            Stage('extract', lambda item: self._prepare_row(item, column_mapping, config), pipeline_config.get('extract_workers', 2)),
+            Stage('analyze', lambda item: self._analyze_row(item, config), pipeline_config.get('analyze_workers', 4))
+        ], queue_size=pipeline_config.get('queue_size', 32), on_error=self._failed_row_result)
+
+        async def sink(item: Dict):
+            result = item['result']
+            self._finish_trace(item['trace'], result, config, '_New')
+            processed_results.append(result)
+            METRICS.inc('rows_total', outcome=self._row_outcome(result))
+            if on_result:
+                on_result(result)
+            # Failed or budget-skipped rows are not journaled, so a resumed job tries them again
+            if checkpoint and job_id and not result.get('Error_New') and not result.get('AI_Status_New'):
+                checkpoint.add(job_id, result['original_index'], result)
+            await self._update_progress(progress_info, config, str(item['url']))
+
+        # Rows are read lazily; at most `queue_size` rows wait between two stages
+        if isinstance(source, pd.DataFrame):
+            rows = (self._new_row_item(record, column_mapping, config) for record in dataframe_records(source)
+                    if record[0] not in done_indices)
+        else:
+            rows = (self._new_row_item(record, column_mapping, config)
+                    async for record in self._read_records(source, pipeline_config.get('read_chunk_size', 500))
+                    if record[0] not in done_indices)
+        self.start_job(config)
+        try:
+            await pipeline.run(rows, sink)
+        finally:
+            if checkpoint and job_id:
+                checkpoint.flush()
+            config['job_stats']['pipeline'] = pipeline.stats()
+            # Also on cancel/failure: close the trace and cassette files and keep the learned examples
+            self.finish_job(config)
+        if checkpoint and job_id:
+            checkpoint.finish_job(job_id, total=None if total else len(processed_results))
+        
+        results_df = pd.DataFrame(processed_results).set_index('original_index').sort_index()
+        return results_df
+
+    @staticmethod
+    def _row_outcome(result: Dict) -> str:
+        if result.get('Error_New'):
+            return 'error'
+        if result.get('AI_Status_New'):
+            return 'ai_skipped'
+        return 'ok'
+
+    def _failed_row_result(self, item: Dict, stage_name: str, error: Exception) -> Dict:
+        item['result']['Error_New'] = f"{stage_name}: {error}"
+        return item
+
+    def finalize_results(self, results, config: Dict, is_excel_data: bool = False) -> pd.DataFrame:
+        """Merge the `_New` columns, add `Media` and rename/order columns for display and export"""
+        df = results if isinstance(results, pd.DataFrame) else pd.DataFrame(results)
+        if df.empty:
+            return df
+
+        # --- Data Consolidation and Cleaning ---
+        
+        # Determine the primary URL column from the original data
+        original_url_col = config.get('column_mapping', {}).get('url_column', 'URL')
+
+        # If it's from Excel, ensure the original URL column is named 'URL' for consistency
+        if is_excel_data and original_url_col != 'URL' and original_url_col in df.columns:
+            df.rename(columns={original_url_col: 'URL'}, inplace=True)
+
+        # Standardize column names from scraping/analysis (e.g., Judul_New -> Title)
+        rename_map = {
+            'Judul_New': 'Title',
+            'Publish_Date_New': 'Publish_Date',
+            'Journalist_New': 'Journalist',
+            'Content_New': 'Content',
+            'Sentiment_New': 'Sentiment',
+            'Confidence_New': 'Confidence',
+            'Reasoning_New': 'Reasoning',
+            'Summary_New': 'Summary',
+            'Category_New': 'Category',
+            'Analysis_Source_New': 'Analysis_Source',
+            'Scraping_Method_New': 'Scraping_Method',
+            'Model_Routing_New': 'Model_Routing',
+            'Tokens_Input_New': 'Tokens_Input',
+            'Tokens_Output_New': 'Tokens_Output',
+            'Biaya_USD_New': 'Biaya_USD',
+            'AI_Status_New': 'AI_Status',
+            'Error_New': 'Error',
+            'Durasi_Detik_New': 'Durasi_Detik',
+            'Trace_New': 'Trace'
+        }
+        df.rename(columns={k: v for k, v in rename_map.items() if k in df.columns}, inplace=True)
+
+        # Merge new data into original columns if they exist
+        # For example, update 'Title' with new data, but keep old if new is null
+        for col_name in rename_map.values():
+            if col_name in df.columns:
+                # Find the original column name (case-insensitive search)
+                original_col = next((c for c in df.columns if c.lower() == col_name.lower() and c != col_name), None)
+                if original_col:
+                    df[original_col] = df[col_name].fillna(df[original_col])
+                    df.drop(columns=[col_name], inplace=True)
+                else:
+                    # If no original column, just rename the new one
+                    df.rename(columns={col_name: col_name}, inplace=True) # No real change, just for clarity
+
+        # --- Feature Engineering & Final Formatting ---
+
+        # 1. Create 'Media' column from the 'URL'
+        if 'URL' in df.columns:
+            df['Media'] = df['URL'].apply(lambda x: self.scraper._get_domain(x) if pd.notna(x) else '')
+
+        # 2. Final Rename to Indonesian user-friendly names
+        final_rename_map = {
+            'URL': 'URL',
+            'Media': 'Media',
+            'Title': 'Judul',
+            'Category': 'Kategori',
+            'Publish_Date': 'Tanggal Rilis',
+            'Journalist': 'Reporter',
+            'Content': 'Isi',
+            'Sentiment': 'Sentiment',
+            'Confidence': 'Confidence',
+            'Reasoning': 'Reasoning',
+            'Summary': 'Summary',
+            'Analysis_Source': 'Sumber Analisis',
+            'Scraping_Method': 'Scraping_Method'
+        }
+        
+        # Rename only the columns that actually exist in the DataFrame
+        df.rename(columns={k: v for k, v in final_rename_map.items() if k in df.columns}, inplace=True)
+
+        # 3. Define the final column order based on user request
+        final_desired_order = [
+            'URL', 'Media', 'Judul', 'Kategori', 'Tanggal Rilis', 'Reporter', 'Isi',
+            'Sentiment', 'Confidence', 'Reasoning', 'Summary', 'Sumber Analisis', 'Scraping_Method', 'Model_Routing',
+            'Tokens_Input', 'Tokens_Output', 'Biaya_USD', 'AI_Status', 'Error', 'Durasi_Detik', 'Trace'
+        ]
+        
+        # Per-context sentiment columns (multi-context analysis) go right after the single-context slot
+        context_cols = [col for col in df.columns if re.match(r'^(Sentiment|Confidence|Reasoning) \[', str(col))]
+        reasoning_pos = final_desired_order.index('Reasoning') + 1
+        final_desired_order = final_desired_order[:reasoning_pos] + context_cols + final_desired_order[reasoning_pos:]
+
+        # Get a list of original columns to keep them at the end
+        original_cols_to_keep = [col for col in df.columns if col not in final_desired_order]
+        
+        # Filter the desired order to only include columns present in the df
+        final_columns_present = [col for col in final_desired_order if col in df.columns]
+        
+        # Combine the ordered columns with the remaining original ones
+        df = df[final_columns_present + original_cols_to_keep]
+        return df
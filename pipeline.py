@@ -0,0 +1,131 @@
+import asyncio
+import contextvars
+import functools
+import time
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Any, AsyncIterable, Awaitable, Callable, Dict, Iterable, List, Optional, Union
+
+from metrics import METRICS
+
+# Marks the end of the input on a stage queue
+_END = object()
+
+# Thread pool of the pipeline stage the current task belongs to (None outside a pipeline: the loop's default executor)
+_stage_executor: contextvars.ContextVar[Optional[Executor]] = contextvars.ContextVar('stage_executor', default=None)
+
+
+async def run_in_thread(func: Callable, *args, executor: Optional[Executor] = None) -> Any:
+    """
+    Like `asyncio.to_thread`, but on `executor` or else the current stage's own thread pool, so a slow stage
+    cannot take the threads of the others. The context is copied, so the call lands on the row's trace.
+    """
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(executor or _stage_executor.get(), functools.partial(context.run, func, *args))
+
+
+class Stage:
+    """One pipeline step: an async function applied to every item by `workers` concurrent workers"""
+
+    def __init__(self, name: str, func: Callable[[Dict], Awaitable[Dict]], workers: int = 1):
+        self.name = name
+        self.func = func
+        self.workers = max(1, int(workers))
+        self.processed = 0
+        self.errors = 0
+        self.busy_seconds = 0.0
+        self.max_queue_depth = 0
+
+
+class StagedPipeline:
+    """
+    Runs items through a chain of stages (e.g. fetch → extract → analyze) into a sink.
+    Stages are connected by bounded queues, so a fast stage waits for a slow one instead of piling up
+    work in memory, and later stages start on the first item instead of after the whole input is read.
+    Every stage gets a thread pool with one thread per worker for its blocking calls (`run_in_thread`).
+    """
+
+    def __init__(self, stages: List[Stage], queue_size: int = 32,
+                 on_error: Optional[Callable[[Dict, str, Exception], Dict]] = None):
+        self.stages = stages
+        self.queue_size = queue_size
+        # Turns a failed item into a result for the sink; by default the item is passed on as it is
+        self.on_error = on_error or (lambda item, stage_name, error: item)
+
+    async def run(self, items: Union[Iterable[Dict], AsyncIterable[Dict]], sink: Callable[[Dict], Awaitable[None]]):
+        """Feed `items` (consumed lazily, sync or async iterable) through all stages and await `sink` for every finished item"""
+        queues = [asyncio.Queue(maxsize=self.queue_size) for _ in range(len(self.stages) + 1)]
+        executors = [ThreadPoolExecutor(max_workers=stage.workers, thread_name_prefix=f"pipeline-{stage.name}") for stage in self.stages]
+        tasks = [asyncio.create_task(self._feed(items, queues[0], self.stages[0].workers))]
+        for i, stage in enumerate(self.stages):
+            next_workers = self.stages[i + 1].workers if i + 1 < len(self.stages) else 1
+            tasks.append(asyncio.create_task(self._run_stage(stage, executors[i], queues[i], queues[i + 1], next_workers, queues[-1])))
+        tasks.append(asyncio.create_task(self._drain(queues[-1], sink)))
+
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            for executor in executors:
+                executor.shutdown(wait=False, cancel_futures=True)
+
+    async def _feed(self, items: Union[Iterable[Dict], AsyncIterable[Dict]], queue: asyncio.Queue, workers: int):
+        if hasattr(items, '__aiter__'):
+            async for item in items:
+                await queue.put(item)
+        else:
+            for item in items:
+                await queue.put(item)
+        for _ in range(workers):
+            await queue.put(_END)
+
+    async def _run_stage(self, stage: Stage, executor: Executor, inbox: asyncio.Queue, outbox: asyncio.Queue,
+                         next_workers: int, sink_queue: asyncio.Queue):
+        # The workers are tasks with their own copy of this context
+        _stage_executor.set(executor)
+        await asyncio.gather(*[self._worker(stage, inbox, outbox, sink_queue) for _ in range(stage.workers)])
+        # Every worker has seen the end marker: pass one on to each worker of the next stage
+        for _ in range(next_workers):
+            await outbox.put(_END)
+
+    async def _worker(self, stage: Stage, inbox: asyncio.Queue, outbox: asyncio.Queue, sink_queue: asyncio.Queue):
+        while True:
+            item = await inbox.get()
+            if item is _END:
+                return
+            stage.max_queue_depth = max(stage.max_queue_depth, inbox.qsize() + 1)
+            start = time.perf_counter()
+            try:
+                result = await stage.func(item)
+            except Exception as e:
+                stage.errors += 1
+                print(f"❌ Pipeline stage '{stage.name}' failed: {e}")
+                # A failed item skips the remaining stages
+                await sink_queue.put(self.on_error(item, stage.name, e))
+                continue
+            finally:
+                elapsed = time.perf_counter() - start
+                stage.busy_seconds += elapsed
+                METRICS.observe('pipeline_stage_seconds', elapsed, stage=stage.name)
+            stage.processed += 1
+            await outbox.put(result)
+
+    async def _drain(self, queue: asyncio.Queue, sink: Callable[[Dict], Awaitable[None]]):
+        while True:
+            item = await queue.get()
+            if item is _END:
+                return
+            await sink(item)
+
+    def stats(self) -> List[Dict]:
+        return [{
+            'Tahap': stage.name,
+            'Worker': stage.workers,
+            'Diproses': stage.processed,
+            'Gagal': stage.errors,
+            'Waktu Sibuk (s)': round(stage.busy_seconds, 2),
+            'Antrean Maks': stage.max_queue_depth
+        } for stage in self.stages]
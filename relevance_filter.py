@@ -0,0 +1,117 @@
+import re
+import unicodedata
+from difflib import SequenceMatcher
+from typing import Dict, List, Optional, Set
+
+from content_compressor import INDONESIAN_SUFFIXES, STOPWORDS
+
+# Marker written to `reasoning` so pre-filtered rows can be told apart from model answers
+PREFILTER_MARKER = "[Pre-filter lokal]"
+
+# Analysis sources the pre-filter may answer: only the full article shows that a context is never mentioned,
+# a headline or snippet that leaves it out still goes to the AI
+PREFILTER_SOURCES = ('content',)
+
+
+def normalize_text(text: str) -> str:
+    """Lowercase, strip accents and punctuation, collapse whitespace"""
+    if not text:
+        return ""
+    text = unicodedata.normalize('NFKD', text)
+    text = ''.join(ch for ch in text if not unicodedata.combining(ch))
+    text = re.sub(r'[^\w\s]', ' ', text.lower())
+    return re.sub(r'\s+', ' ', text).strip()
+
+
+def _strip_suffix(token: str) -> str:
+    for suffix in INDONESIAN_SUFFIXES:
+        if token.endswith(suffix) and len(token) - len(suffix) >= 4:
+            return token[:-len(suffix)]
+    return token
+
+
+class RelevanceFilter:
+    def __init__(self, fuzzy_threshold: float = 0.85):
+        self.fuzzy_threshold = fuzzy_threshold
+
+    def parse_aliases(self, aliases_input: Optional[str]) -> Dict[str, List[str]]:
+        """Parse `Konteks: alias1, alias2` lines into a mapping keyed by normalized context"""
+        aliases = {}
+        if not aliases_input:
+            return aliases
+        for line in aliases_input.split('\n'):
+            if ':' not in line:
+                continue
+            name, values = line.split(':', 1)
+            key = normalize_text(name)
+            if key:
+                aliases.setdefault(key, []).extend(v.strip() for v in values.split(',') if v.strip())
+        return aliases
+
+    def build_terms(self, context: str, aliases: Optional[Dict[str, List[str]]] = None) -> List[str]:
+        """Expand a context into normalized search phrases: the phrases, their aliases and acronyms"""
+        aliases = aliases or {}
+        terms = []
+        for phrase in re.split(r'[,;\n]+', context or ''):
+            phrase = normalize_text(phrase)
+            if not phrase:
+                continue
+            terms.append(phrase)
+            terms.extend(normalize_text(alias) for alias in aliases.get(phrase, []))
+
+            # "Bank Rakyat Indonesia" is often written as "BRI"
+            words = [w for w in phrase.split() if w not in STOPWORDS]
+            if len(words) >= 2:
+                terms.append(''.join(w[0] for w in words))
+
+        for key, values in aliases.items():
+            if key in terms:
+                continue
+            if any(key in term for term in terms):
+                terms.extend(normalize_text(alias) for alias in values)
+        return [t for t in dict.fromkeys(terms) if t]
+
+    def _fuzzy_token_match(self, word: str, tokens: Set[str]) -> bool:
+        for token in tokens:
+            if abs(len(token) - len(word)) > 2 or token[0] != word[0]:
+                continue
+            if SequenceMatcher(None, word, token).ratio() >= self.fuzzy_threshold:
+                return True
+        return False
+
+    def mentions(self, text: str, terms: List[str]) -> bool:
+        """True if any term occurs in the text, tolerating suffixes and small typos"""
+        normalized = normalize_text(text)
+        if not normalized:
+            return False
+        padded = f" {normalized} "
+        tokens = {_strip_suffix(t) for t in normalized.split()}
+
+        for term in terms:
+            if f" {term} " in padded:
+                return True
+
+            words = [_strip_suffix(w) for w in term.split() if w not in STOPWORDS]
+            significant = [w for w in words if len(w) >= 4]
+            if not significant:
+                # Short terms and acronyms must match exactly
+                if words and all(w in tokens for w in words):
+                    return True
+                continue
+
+            # A single significant word of the phrase is enough to hand the row to the model
+            for word in significant:
+                if word in tokens or self._fuzzy_token_match(word, tokens):
+                    return True
+        return False
+
+    def check(self, content: str, context: str, aliases: Optional[Dict[str, List[str]]] = None) -> Optional[Dict]:
+        """Return a ready "tidak terkait" result when the context is clearly absent, otherwise None"""
+        terms = self.build_terms(context, aliases)
+        if not terms or self.mentions(content, terms):
+            return None
+        return {
+            "sentiment": "tidak terkait",
+            "confidence": "tinggi",
+            "reasoning": f"{PREFILTER_MARKER} Konteks tidak disebutkan dalam teks, analisis AI dilewati."
+        }
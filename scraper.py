@@ -1,19 +1,91 @@
 import requests
 from bs4 import BeautifulSoup
-from newspaper import Article
 import re
-from typing import Dict, Optional, List
+from typing import Dict, Optional, List, Tuple
 import time
 import random
 import urllib.parse
 from urllib.robotparser import RobotFileParser
 import asyncio
-from playwright.async_api import async_playwright
-from playwright_stealth import stealth
-import pandas as pd
 import os
+import csv
+import json
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+
+from article_store import ArticleStore
+from cassette import Cassette, CassetteMiss, download_article, dump_response, load_response
+from metrics import METRICS, debug
+from pipeline import run_in_thread
+from tracing import span
 from datetime import datetime
 
+# --- Process-pool HTML extraction ---
+# Parsing and cleaning HTML is pure-Python CPU work; with many concurrent fetches it serializes on the GIL.
+# Each worker process builds its own NewsScraper once, so the selector registry is loaded per worker, not per task.
+_worker_scraper = None
+_extraction_pool: Optional[ProcessPoolExecutor] = None
+_extraction_pool_size = 0
+_extraction_pool_lock = threading.Lock()
+
+
+def _init_extraction_worker():
+    global _worker_scraper
+    _worker_scraper = NewsScraper()
+
+
+def _extract_in_worker(html: bytes, url: str, basic_only: bool, method: str, parser: str) -> Tuple[Optional[Dict], Dict]:
+    # The worker's timings travel back with the result and are merged into the parent's registry
+    METRICS.reset()
+    result = _worker_scraper._extract_article_from_html(html, url, basic_only, method, parser)
+    return result, METRICS.snapshot()
+
+
+# Replayed request errors are raised as these classes again, so the strategy outcomes stay the same
+_REPLAYED_REQUEST_ERRORS = {cls.__name__: cls for cls in (requests.exceptions.Timeout, requests.exceptions.ReadTimeout,
+                                                          requests.exceptions.ConnectTimeout, requests.exceptions.ConnectionError)}
+
+
+@contextmanager
+def _fetch_tier(tier: str):
+    """Time one scraping tier as a metric and as a span of the row trace; the block sets `outcome` on success"""
+    with span(tier, outcome='failed') as attrs:
+        start = time.perf_counter()
+        try:
+            yield attrs
+        finally:
+            METRICS.observe('fetch_seconds', time.perf_counter() - start, tier=tier, outcome=attrs['outcome'])
+
+
+def get_extraction_pool(processes: int) -> ProcessPoolExecutor:
+    """
+    The one process pool shared by all scrapers in this process (Streamlit reruns create new app objects).
+    Asking for another size replaces it; the old pool's workers exit once their current tasks are done.
+    """
+    global _extraction_pool, _extraction_pool_size
+    with _extraction_pool_lock:
+        if _extraction_pool is None or _extraction_pool_size != processes:
+            if _extraction_pool is not None:
+                _extraction_pool.shutdown(wait=False)
+            # spawn: forking a process that already runs Streamlit/asyncio threads is not safe
+            _extraction_pool = ProcessPoolExecutor(max_workers=processes, mp_context=multiprocessing.get_context('spawn'),
+                                                   initializer=_init_extraction_worker)
+            _extraction_pool_size = processes
+        return _extraction_pool
+
+
+def discard_extraction_pool(pool: ProcessPoolExecutor):
+    """Shut down a broken pool; the next `get_extraction_pool` starts a new one"""
+    global _extraction_pool
+    with _extraction_pool_lock:
+        if _extraction_pool is pool:
+            _extraction_pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
 class NewsScraper:
     def __init__(self):
         self.session = requests.Session()
@@ -238,36 +310,39 @@ class NewsScraper:
         # Set initial session
         self._setup_session()
 
+        # Number of worker processes for HTML extraction; 0 extracts on a thread of this process
+        self.extraction_processes = 0
+
+        # Record/replay cassette of the current job (set by NewsProcessor.start_job); None fetches normally
+        self.cassette: Optional[Cassette] = None
+
+        # Archive of scraped articles; every scraped article is stored, archived ones are reused when `reuse_archived`
+        self.article_store: Optional[ArticleStore] = None
+        self.reuse_archived = True
+
     def _load_selectors_from_csv(self, file_path: str) -> Dict:
         """Loads selectors from a CSV file and formats them."""
         if not os.path.exists(file_path):
             print(f"⚠️ Selector file not found: {file_path}")
             return {}
 
+        columns = {'Media': 'domain', 'Judul': 'title', 'Reporter': 'author', 'Isi': 'content'}
         try:
-            df = pd.read_csv(file_path)
-            df.rename(columns={
-                'Media': 'domain',
-                'Judul': 'title',
-                'Reporter': 'author',
-                'Isi': 'content'
-            }, inplace=True)
-
             selectors = {}
-            for _, row in df.iterrows():
-                domain = row['domain']
-                if pd.isna(domain):
-                    continue
+            # Plain csv module: this runs for every scraper (and every extraction worker), pandas is not needed
+            with open(file_path, newline='', encoding='utf-8-sig') as f:
+                for raw_row in csv.DictReader(f):
+                    row = {columns.get(key, key): value for key, value in raw_row.items()}
+                    domain = (row.get('domain') or '').strip()
+                    if not domain:
+                        continue
 
-                if domain not in selectors:
-                    selectors[domain] = {'title': [], 'content': [], 'author': []}
-                
-                if pd.notna(row.get('title')) and row.get('title').strip():
-                    selectors[domain]['title'].append(row['title'])
-                if pd.notna(row.get('content')) and row.get('content').strip():
-                    selectors[domain]['content'].append(row['content'])
-                if pd.notna(row.get('author')) and row.get('author').strip():
-                    selectors[domain]['author'].append(row['author'])
+                    if domain not in selectors:
+                        selectors[domain] = {'title': [], 'content': [], 'author': []}
+
+                    for field in ('title', 'content', 'author'):
+                        if row.get(field) and row[field].strip():
+                            selectors[domain][field].append(row[field])
 
             print(f"✅ Successfully loaded selectors for {len(selectors)} domains from {file_path}")
             return selectors
@@ -351,17 +426,18 @@ class NewsScraper:
     def get_title_newspaper3k(self, url: str) -> Optional[str]:
         """Get title using newspaper3k with enhanced error handling"""
         try:
+            from newspaper import Article
             self._setup_session()
             
             article = Article(url)
-            article.download()
+            download_article(article, self.cassette)
             article.parse()
             
             if article.title and len(article.title.strip()) > 5:
                 return article.title.strip()
             
         except Exception as e:
-            print(f"📰 Newspaper3k title failed for {url}: {str(e)}")
+            debug(f"📰 Newspaper3k title failed for {url}: {str(e)}")
         
         # Fallback to manual extraction
         return self._get_title_manual(url)
@@ -376,11 +452,11 @@ class NewsScraper:
             soup = BeautifulSoup(response.content, 'html.parser')
             domain = self._get_domain(url)
             
-            print(f"🔍 Extracting title from domain: {domain}")
+            debug(f"🔍 Extracting title from domain: {domain}")
             
             # Try site-specific selectors first
             if domain in self.indonesian_selectors:
-                print(f"📋 Using site-specific selectors for {domain}")
+                debug(f"📋 Using site-specific selectors for {domain}")
                 selectors = self.indonesian_selectors[domain]['title']
                 for selector in selectors:
                     try:
@@ -388,10 +464,10 @@ class NewsScraper:
                         if element and element.get_text(strip=True):
                             title = element.get_text(strip=True)
                             if len(title) > 5 and len(title) < 200:
-                                print(f"✅ Title found with selector '{selector}': {title[:50]}...")
+                                debug(f"✅ Title found with selector '{selector}': {title[:50]}...")
                                 return title
                     except Exception as e:
-                        print(f"⚠️ Error with selector '{selector}': {e}")
+                        debug(f"⚠️ Error with selector '{selector}': {e}")
                         continue
             
             # Generic selectors
@@ -403,7 +479,7 @@ class NewsScraper:
                 'title', 'h1', '.title', '.headline', '.Title'
             ]
             
-            print(f"🔄 Trying generic selectors...")
+            debug(f"🔄 Trying generic selectors...")
             for selector in title_selectors:
                 try:
                     if selector.startswith('['):
@@ -411,14 +487,14 @@ class NewsScraper:
                         if element:
                             title = element.get('content') or element.get_text(strip=True)
                             if title and 5 < len(title) < 200:
-                                print(f"✅ Title found with generic selector '{selector}': {title[:50]}...")
+                                debug(f"✅ Title found with generic selector '{selector}': {title[:50]}...")
                                 return title
                     else:
                         element = soup.select_one(selector)
                         if element:
                             title = element.get_text(strip=True)
                             if title and 5 < len(title) < 200:
-                                print(f"✅ Title found with generic selector '{selector}': {title[:50]}...")
+                                debug(f"✅ Title found with generic selector '{selector}': {title[:50]}...")
                                 return title
                 except Exception as e:
                     continue
@@ -432,6 +508,7 @@ class NewsScraper:
     def _make_request(self, url: str, timeout: int = 30) -> Optional[requests.Response]:
         """Make HTTP request with multiple retry strategies"""
         
+        strategy_names = ['browser', 'mobile', 'bot', 'minimal']
         strategies = [
             # Strategy 1: Standard browser request
             {'headers': self._get_browser_headers(), 'timeout': timeout},
@@ -447,38 +524,59 @@ class NewsScraper:
         ]
         
         for i, strategy in enumerate(strategies):
-            try:
-                print(f"🔄 Trying strategy {i+1}: {strategy['headers']['User-Agent'][:50]}...")
-                
-                # Add small delay between attempts
-                if i > 0:
-                    time.sleep(random.uniform(1, 3))
-                
-                response = requests.get(url, **strategy, allow_redirects=True, verify=False)
-                
-                # Check if response is valid
-                if response.status_code == 200 and len(response.content) > 1000:
-                    print(f"✅ Strategy {i+1} successful: {len(response.content)} bytes")
-                    return response
-                elif response.status_code in [301, 302, 303, 307, 308]:
-                    print(f"🔄 Redirect detected, following...")
-                    continue
-                else:
-                    print(f"⚠️ Strategy {i+1} failed: Status {response.status_code}")
-                    
-            except requests.exceptions.Timeout:
-                print(f"⏰ Strategy {i+1} timeout")
-                continue
-            except requests.exceptions.ConnectionError:
-                print(f"🌐 Strategy {i+1} connection error")
-                continue
-            except Exception as e:
-                print(f"❌ Strategy {i+1} error: {str(e)}")
-                continue
+            debug(f"🔄 Trying strategy {i+1}: {strategy['headers']['User-Agent'][:50]}...")
+
+            # Add small delay between attempts
+            if i > 0:
+                METRICS.inc('fetch_retries_total')
+                if self._waits():
+                    with span('backoff'):
+                        time.sleep(random.uniform(1, 3))
+
+            with span(f"request.{strategy_names[i]}") as attempt:
+                try:
+                    response = self._http_get(url, strategy_names[i], **strategy)
+
+                    # Check if response is valid
+                    if response.status_code == 200 and len(response.content) > 1000:
+                        attempt['outcome'] = 'ok'
+                    elif response.status_code in [301, 302, 303, 307, 308]:
+                        attempt['outcome'] = 'redirect'
+                    else:
+                        attempt['outcome'] = f"http_{response.status_code}"
+                except requests.exceptions.Timeout:
+                    attempt['outcome'] = 'timeout'
+                except requests.exceptions.ConnectionError:
+                    attempt['outcome'] = 'connection_error'
+                except Exception as e:
+                    attempt['outcome'] = 'error'
+                    debug(f"❌ Strategy {i+1} error: {str(e)}")
+            METRICS.inc('fetch_attempts_total', strategy=strategy_names[i], outcome=attempt['outcome'])
+
+            if attempt['outcome'] == 'ok':
+                debug(f"✅ Strategy {i+1} successful: {len(response.content)} bytes")
+                return response
+            elif attempt['outcome'] == 'redirect':
+                debug(f"🔄 Redirect detected, following...")
+            else:
+                debug(f"⚠️ Strategy {i+1} failed: {attempt['outcome']}")
         
-        print(f"❌ All strategies failed for {url}")
+        debug(f"❌ All strategies failed for {url}")
         return None
 
+    def _http_get(self, url: str, strategy_name: str, **kwargs) -> requests.Response:
+        """`requests.get` for one strategy, recorded to or replayed from the job's cassette when one is set"""
+        def fetch() -> requests.Response:
+            return requests.get(url, **kwargs, allow_redirects=True, verify=False)
+        if self.cassette is None:
+            return fetch()
+        return self.cassette.through('http', f"{strategy_name} {url}", fetch, dump_response, load_response,
+                                     errors=_REPLAYED_REQUEST_ERRORS)
+
+    def _waits(self) -> bool:
+        """Politeness delays only matter for real websites, not for a cassette replayed without its latency"""
+        return self.cassette is None or self.cassette.simulates_time
+
     def _get_browser_headers(self) -> Dict[str, str]:
         """Get realistic browser headers"""
         return {
@@ -523,8 +621,26 @@ class NewsScraper:
         }
 
     async def _scrape_with_playwright_async(self, url: str, timeout: int = 45000) -> Optional[str]:
+        """Rendered page HTML from Playwright, recorded to or replayed from the job's cassette when one is set"""
+        cassette = self.cassette
+        if cassette and cassette.replaying:
+            try:
+                return await run_in_thread(cassette.replay, 'playwright', url)
+            except CassetteMiss as e:
+                debug(f"📼 {e}")
+                return None
+        start = time.perf_counter()
+        content = await self._render_with_playwright_async(url, timeout)
+        if cassette:
+            cassette.record('playwright', url, content, time.perf_counter() - start)
+        return content
+
+    async def _render_with_playwright_async(self, url: str, timeout: int = 45000) -> Optional[str]:
         """Scrape using Playwright to handle JavaScript rendering."""
         try:
+            # Playwright is only needed for the last fallback tier
+            from playwright.async_api import async_playwright
+            from playwright_stealth import stealth
             async with async_playwright() as p:
                 browser = await p.chromium.launch(headless=True)
                 context = await browser.new_context()
@@ -533,7 +649,7 @@ class NewsScraper:
                 # Apply stealth measures
                 await stealth(page)
                 
-                print(f"🚀 Launching Playwright for {url[:60]}...")
+                debug(f"🚀 Launching Playwright for {url[:60]}...")
                 await page.goto(url, timeout=timeout, wait_until='networkidle')
                 
                 # Wait for potential dynamic content
@@ -543,16 +659,34 @@ class NewsScraper:
                 await browser.close()
                 
                 if content and len(content) > 500:
-                    print(f"✅ Playwright successfully fetched {len(content)} bytes.")
+                    debug(f"✅ Playwright successfully fetched {len(content)} bytes.")
                     return content
                 else:
-                    print("⚠️ Playwright fetched content but it seems empty.")
+                    debug("⚠️ Playwright fetched content but it seems empty.")
                     return None
         except Exception as e:
-            print(f"❌ Playwright failed for {url}: {str(e)}")
+            debug(f"❌ Playwright failed for {url}: {str(e)}")
             return None
 
     async def scrape_article(self, url: str, timeout: int = 30, basic_only: bool = False) -> Optional[Dict]:
+        """Article from the archive when it was scraped before, otherwise from the network tiers (then archived)"""
+        # A cassette reproduces a job's network traffic exactly, so the archive stays out of recorded and replayed jobs
+        store = self.article_store if self.cassette is None else None
+        if store and self.reuse_archived:
+            with _fetch_tier('archive') as tier:
+                article_data = store.get(url)
+                tier['outcome'] = 'hit' if article_data else 'miss'
+            METRICS.inc('article_store_lookups_total', outcome=tier['outcome'])
+            if article_data:
+                return article_data
+
+        article_data = await self._scrape_from_network(url, timeout, basic_only)
+        # Basic-only results have no title, author or date; they would shadow a complete article later
+        if store and article_data and not basic_only:
+            store.put(article_data)
+        return article_data
+
+    async def _scrape_from_network(self, url: str, timeout: int = 30, basic_only: bool = False) -> Optional[Dict]:
         """
         Enhanced scraping with a hybrid approach:
         1. Newspaper3k (fast)
@@ -560,46 +694,44 @@ class NewsScraper:
         3. Playwright headless browser (robust)
         """
         try:
-            print(f"🌐 Starting scrape: {url[:60]}...")
+            debug(f"🌐 Starting scrape: {url[:60]}...")
             
             # Add random delay
-            await asyncio.sleep(random.uniform(0.5, 1.5))
+            if self._waits():
+                with span('delay'):
+                    await asyncio.sleep(random.uniform(0.5, 1.5))
             
+            # The requests/newspaper3k tiers are blocking; run them on the fetch stage's threads so other rows keep going
             # --- Method 1: Try newspaper3k first ---
-            article_data = self._scrape_with_newspaper3k(url)
-            if article_data and self._is_valid_content(article_data.get('content', '')):
-                print(f"✅ Newspaper3k success: {len(article_data.get('content', ''))} chars")
-                return article_data
+            with _fetch_tier('newspaper3k') as tier:
+                article_data = await run_in_thread(self._scrape_with_newspaper3k, url)
+                if article_data and self._is_valid_content(article_data.get('content', '')):
+                    tier['outcome'] = 'success'
+                    debug(f"✅ Newspaper3k success: {len(article_data.get('content', ''))} chars")
+                    return article_data
             
             # --- Method 2: Enhanced manual scraping (requests) ---
-            print("🔄 Newspaper3k failed. Trying enhanced manual scraping...")
-            article_data = self._scrape_with_enhanced_manual(url, timeout, basic_only)
-            if article_data and self._is_valid_content(article_data.get('content', '')):
-                print(f"✅ Manual scraping success: {len(article_data.get('content', ''))} chars")
-                return article_data
+            debug("🔄 Newspaper3k failed. Trying enhanced manual scraping...")
+            with _fetch_tier('requests') as tier:
+                response = await run_in_thread(self._make_request, url, timeout)
+                if response:
+                    article_data = await self.extract_article(response.content, url, basic_only)
+                    if article_data and self._is_valid_content(article_data.get('content', '')):
+                        tier['outcome'] = 'success'
+                        debug(f"✅ Manual scraping success: {len(article_data.get('content', ''))} chars")
+                        return article_data
 
             # --- Method 3: Playwright as a final fallback ---
-            print("🔄 Manual scraping failed. Trying Playwright...")
-            html_content = await self._scrape_with_playwright_async(url, timeout * 1000)
-            
-            if html_content:
-                soup = BeautifulSoup(html_content, 'lxml')
-                domain = self._get_domain(url)
-                self._clean_soup(soup)
-                
-                content = self._extract_content_enhanced(soup, domain)
+            debug("🔄 Manual scraping failed. Trying Playwright...")
+            with _fetch_tier('playwright') as tier:
+                html_content = await self._scrape_with_playwright_async(url, timeout * 1000)
                 
-                if self._is_valid_content(content):
-                    title = self._extract_title_from_soup(soup, domain)
-                    publish_date = self._extract_publish_date_from_soup(soup, domain)
-                    print(f"✅ Playwright success: {len(content)} chars")
-                    return {
-                        'content': content,
-                        'title': title,
-                        'publish_date': publish_date,
-                        'url': url,
-                        'method': 'playwright'
-                    }
+                if html_content:
+                    article_data = await self.extract_article(html_content, url, False, method='playwright', parser='lxml')
+                    if article_data and self._is_valid_content(article_data.get('content', '')):
+                        tier['outcome'] = 'success'
+                        debug(f"✅ Playwright success: {len(article_data['content'])} chars")
+                        return article_data
 
             print(f"❌ All methods failed for {url}")
             return None
@@ -611,8 +743,9 @@ class NewsScraper:
     def _scrape_with_newspaper3k(self, url: str) -> Optional[Dict]:
         """Enhanced newspaper3k with better error handling"""
         try:
+            from newspaper import Article
             article = Article(url)
-            article.download()
+            download_article(article, self.cassette)
             article.parse()
             
             content = article.text.strip() if article.text else ""
@@ -628,39 +761,64 @@ class NewsScraper:
                 }
             
         except Exception as e:
-            print(f"📰 Newspaper3k detailed error: {str(e)}")
+            debug(f"📰 Newspaper3k detailed error: {str(e)}")
         
         return None
 
-    def _scrape_with_enhanced_manual(self, url: str, timeout: int, basic_only: bool) -> Optional[Dict]:
-        """Enhanced manual scraping with site-specific selectors"""
+    async def extract_article(self, html, url: str, basic_only: bool, method: str = 'manual_enhanced',
+                              parser: str = 'html.parser') -> Optional[Dict]:
+        """Run `_extract_article_from_html` in the extraction process pool, or on a thread when it is disabled"""
+        with span('extract_html') as attrs:
+            start = time.perf_counter()
+            if self.extraction_processes > 0:
+                loop = asyncio.get_running_loop()
+                pool = get_extraction_pool(self.extraction_processes)
+                try:
+                    result, worker_metrics = await loop.run_in_executor(pool, _extract_in_worker, html, url, basic_only, method, parser)
+                    METRICS.merge(worker_metrics)
+                    METRICS.observe('extraction_seconds', time.perf_counter() - start, mode='process')
+                    attrs['mode'] = 'process'
+                    return result
+                except BrokenProcessPool:
+                    print("⚠️ Extraction process pool crashed; extracting in-process and restarting the pool")
+                    discard_extraction_pool(pool)
+            result = await run_in_thread(self._extract_article_from_html, html, url, basic_only, method, parser)
+            METRICS.observe('extraction_seconds', time.perf_counter() - start, mode='thread')
+            attrs['mode'] = 'thread'
+            return result
+
+    def _extract_article_from_html(self, html, url: str, basic_only: bool, method: str = 'manual_enhanced',
+                                   parser: str = 'html.parser') -> Optional[Dict]:
+        """Extract the article from fetched HTML with site-specific selectors; returns a plain (picklable) dict"""
         try:
-            response = self._make_request(url, timeout)
-            if not response:
-                return None
-            
-            soup = BeautifulSoup(response.content, 'html.parser')
+            with METRICS.timer('parse_seconds', parser=parser):
+                soup = BeautifulSoup(html, parser)
             domain = self._get_domain(url)
             
-            print(f"🔍 Processing domain: {domain}")
+            debug(f"🔍 Processing domain: {domain}")
             
             # Remove unwanted elements first
-            self._clean_soup(soup)
+            with METRICS.timer('clean_seconds'):
+                self._clean_soup(soup)
             
             # Extract content using site-specific selectors
-            content = self._extract_content_enhanced(soup, domain)
+            with METRICS.timer('extract_seconds', field='content'):
+                content = self._extract_content_enhanced(soup, domain)
             
             if basic_only:
                 return {'content': content, 'url': url, 'method': 'manual_basic'}
             
             # Extract title
-            title = self._extract_title_from_soup(soup, domain)
+            with METRICS.timer('extract_seconds', field='title'):
+                title = self._extract_title_from_soup(soup, domain)
             
             # Extract author
-            author = self._extract_author_from_soup(soup, domain)
+            with METRICS.timer('extract_seconds', field='author'):
+                author = self._extract_author_from_soup(soup, domain)
             
             # Extract publish date
-            publish_date = self._extract_publish_date_from_soup(soup, domain)
+            with METRICS.timer('extract_seconds', field='publish_date'):
+                publish_date = self._extract_publish_date_from_soup(soup, domain)
 
             return {
                 'content': content,
@@ -668,7 +826,7 @@ class NewsScraper:
                 'author': author,
                 'publish_date': publish_date,
                 'url': url,
-                'method': 'manual_enhanced'
+                'method': method
             }
             
         except Exception as e:
@@ -734,11 +892,11 @@ class NewsScraper:
     def _extract_content_enhanced(self, soup: BeautifulSoup, domain: str) -> str:
         """Enhanced content extraction with site-specific selectors"""
         
-        print(f"🎯 Extracting content for domain: {domain}")
+        debug(f"🎯 Extracting content for domain: {domain}")
         
         # Try site-specific selectors first
         if domain in self.indonesian_selectors:
-            print(f"📋 Using site-specific content selectors for {domain}")
+            debug(f"📋 Using site-specific content selectors for {domain}")
             selectors = self.indonesian_selectors[domain]['content']
             for selector in selectors:
                 try:
@@ -746,10 +904,11 @@ class NewsScraper:
                     for element in elements:
                         content = element.get_text(separator=' ', strip=True)
                         if len(content) > 200:
-                            print(f"✅ Content found with selector '{selector}': {len(content)} chars")
+                            METRICS.inc('extract_total', field='content', source='site')
+                            debug(f"✅ Content found with selector '{selector}': {len(content)} chars")
                             return self._clean_content(content)
                 except Exception as e:
-                    print(f"⚠️ Error with content selector '{selector}': {e}")
+                    debug(f"⚠️ Error with content selector '{selector}': {e}")
                     continue
         
         # Generic high-priority selectors
@@ -762,33 +921,35 @@ class NewsScraper:
             '.StoryContent__Wrapper', '.DetailStory__Content'  # Kumparan fallback
         ]
         
-        print(f"🔄 Trying priority selectors...")
+        debug(f"🔄 Trying priority selectors...")
         for selector in priority_selectors:
             try:
                 elements = soup.select(selector)
                 for element in elements:
                     content = element.get_text(separator=' ', strip=True)
                     if len(content) > 200:
-                        print(f"✅ Content found with priority selector '{selector}': {len(content)} chars")
+                        METRICS.inc('extract_total', field='content', source='priority')
+                        debug(f"✅ Content found with priority selector '{selector}': {len(content)} chars")
                         return self._clean_content(content)
             except Exception as e:
                 continue
         
         # Fallback to article tag or main content
-        print(f"🔄 Trying fallback selectors...")
+        debug(f"🔄 Trying fallback selectors...")
         for tag in ['article', 'main', '.content']:
             try:
                 elements = soup.select(tag) if tag.startswith('.') else soup.find_all(tag)
                 for element in elements:
                     content = element.get_text(separator=' ', strip=True)
                     if len(content) > 200:
-                        print(f"✅ Content found with fallback selector '{tag}': {len(content)} chars")
+                        METRICS.inc('extract_total', field='content', source='fallback')
+                        debug(f"✅ Content found with fallback selector '{tag}': {len(content)} chars")
                         return self._clean_content(content)
             except Exception as e:
                 continue
         
         # Last resort: paragraph extraction
-        print(f"🔄 Trying paragraph extraction...")
+        debug(f"🔄 Trying paragraph extraction...")
         paragraphs = []
         for p in soup.find_all('p'):
             text = p.get_text(strip=True)
@@ -797,20 +958,22 @@ class NewsScraper:
         
         if paragraphs:
             content = ' '.join(paragraphs)
-            print(f"✅ Content found with paragraph extraction: {len(content)} chars")
+            METRICS.inc('extract_total', field='content', source='paragraphs')
+            debug(f"✅ Content found with paragraph extraction: {len(content)} chars")
             return self._clean_content(content)
         
-        print(f"❌ No content found for {domain}")
+        METRICS.inc('extract_total', field='content', source='none')
+        debug(f"❌ No content found for {domain}")
         return ""
 
     def _extract_title_from_soup(self, soup: BeautifulSoup, domain: str) -> str:
         """Extract title from soup with site-specific selectors"""
         
-        print(f"🎯 Extracting title for domain: {domain}")
+        debug(f"🎯 Extracting title for domain: {domain}")
         
         # Try site-specific selectors first
         if domain in self.indonesian_selectors:
-            print(f"📋 Using site-specific title selectors for {domain}")
+            debug(f"📋 Using site-specific title selectors for {domain}")
             selectors = self.indonesian_selectors[domain]['title']
             for selector in selectors:
                 try:
@@ -818,14 +981,15 @@ class NewsScraper:
                     if element:
                         title = element.get_text(strip=True)
                         if 5 < len(title) < 200:
-                            print(f"✅ Title found with selector '{selector}': {title[:50]}...")
+                            METRICS.inc('extract_total', field='title', source='site')
+                            debug(f"✅ Title found with selector '{selector}': {title[:50]}...")
                             return title
                 except Exception as e:
-                    print(f"⚠️ Error with title selector '{selector}': {e}")
+                    debug(f"⚠️ Error with title selector '{selector}': {e}")
                     continue
         
         # Generic selectors
-        print(f"🔄 Trying generic title selectors...")
+        debug(f"🔄 Trying generic title selectors...")
         title_selectors = ['h1', '.title', '.headline', '.Title', 'title']
         for selector in title_selectors:
             try:
@@ -833,16 +997,18 @@ class NewsScraper:
                 if element:
                     title = element.get_text(strip=True)
                     if 5 < len(title) < 200:
-                        print(f"✅ Title found with generic selector '{selector}': {title[:50]}...")
+                        METRICS.inc('extract_total', field='title', source='generic')
+                        debug(f"✅ Title found with generic selector '{selector}': {title[:50]}...")
                         return title
             except Exception as e:
                 continue
         
+        METRICS.inc('extract_total', field='title', source='none')
         return "No title found"
 
     def _extract_publish_date_from_soup(self, soup: BeautifulSoup, domain: str) -> Optional[str]:
         """Extract publish date from soup with various strategies."""
-        print(f"🎯 Extracting publish date for domain: {domain}")
+        debug(f"🎯 Extracting publish date for domain: {domain}")
 
         # Strategy 1: Meta tags
         meta_selectors = [
@@ -857,7 +1023,8 @@ class NewsScraper:
             if element and element.get('content'):
                 date_str = element.get('content').strip()
                 if date_str:
-                    print(f"✅ Date found with meta selector '{selector}': {date_str}")
+                    METRICS.inc('extract_total', field='publish_date', source='meta')
+                    debug(f"✅ Date found with meta selector '{selector}': {date_str}")
                     return date_str
 
         # Strategy 2: Time tag
@@ -865,12 +1032,14 @@ class NewsScraper:
         if time_element and time_element.get('datetime'):
             date_str = time_element.get('datetime').strip()
             if date_str:
-                print(f"✅ Date found with <time> tag: {date_str}")
+                METRICS.inc('extract_total', field='publish_date', source='time')
+                debug(f"✅ Date found with <time> tag: {date_str}")
                 return date_str
         elif time_element and time_element.get_text():
              date_str = time_element.get_text().strip()
              if date_str:
-                print(f"✅ Date found with <time> tag text: {date_str}")
+                METRICS.inc('extract_total', field='publish_date', source='time')
+                debug(f"✅ Date found with <time> tag text: {date_str}")
                 return date_str
 
         # Strategy 3: JSON-LD script
@@ -880,10 +1049,12 @@ class NewsScraper:
                 data = json.loads(script.string)
                 if isinstance(data, dict):
                     if 'datePublished' in data:
-                        print(f"✅ Date found in JSON-LD: {data['datePublished']}")
+                        METRICS.inc('extract_total', field='publish_date', source='json_ld')
+                        debug(f"✅ Date found in JSON-LD: {data['datePublished']}")
                         return data['datePublished']
                     if 'uploadDate' in data: # For video objects
-                        print(f"✅ Date found in JSON-LD: {data['uploadDate']}")
+                        METRICS.inc('extract_total', field='publish_date', source='json_ld')
+                        debug(f"✅ Date found in JSON-LD: {data['uploadDate']}")
                         return data['uploadDate']
         except Exception:
             pass # Ignore JSON parsing errors
@@ -897,20 +1068,22 @@ class NewsScraper:
                 if element:
                     date_str = element.get_text(strip=True)
                     if date_str:
-                        print(f"✅ Date found with specific selector '{selector}': {date_str}")
+                        METRICS.inc('extract_total', field='publish_date', source='site')
+                        debug(f"✅ Date found with specific selector '{selector}': {date_str}")
                         return date_str
         
-        print("🔄 No specific date found, returning None.")
+        METRICS.inc('extract_total', field='publish_date', source='none')
+        debug("🔄 No specific date found, returning None.")
         return None
 
     def _extract_author_from_soup(self, soup: BeautifulSoup, domain: str) -> str:
         """Extract author from soup with site-specific selectors"""
         
-        print(f"🎯 Extracting author for domain: {domain}")
+        debug(f"🎯 Extracting author for domain: {domain}")
         
         # Try site-specific selectors first
         if domain in self.indonesian_selectors and 'author' in self.indonesian_selectors[domain]:
-            print(f"📋 Using site-specific author selectors for {domain}")
+            debug(f"📋 Using site-specific author selectors for {domain}")
             selectors = self.indonesian_selectors[domain]['author']
             for selector in selectors:
                 try:
@@ -918,12 +1091,14 @@ class NewsScraper:
                     if element:
                         author = element.get_text(strip=True)
                         if author:
-                            print(f"✅ Author found with selector '{selector}': {author[:50]}...")
+                            METRICS.inc('extract_total', field='author', source='site')
+                            debug(f"✅ Author found with selector '{selector}': {author[:50]}...")
                             return author
                 except Exception as e:
-                    print(f"⚠️ Error with author selector '{selector}': {e}")
+                    debug(f"⚠️ Error with author selector '{selector}': {e}")
                     continue
         
+        METRICS.inc('extract_total', field='author', source='none')
         return None
 
     def _is_unwanted_paragraph(self, text: str) -> bool:
@@ -1,17 +1,23 @@
 import json
 import re
-from typing import Dict, Optional
-from openai import OpenAI
+from typing import Dict, List, Optional
 
 class SentimentAnalyzer:
-    def __init__(self, api_key: str, base_url: str):
+    def __init__(self, api_key: str, base_url: str, client=None):
         self.api_key = api_key
         self.base_url = base_url
         self.model_name = 'models/gemini-2.5-flash'
-        self.client = None
-        if self.api_key and self.base_url:
+        # Optional UsageTracker shared by the job; receives `response.usage` of every call
+        self.usage_tracker = None
+        self.client = client
+        if not self.client and self.api_key and self.base_url:
+            from openai import OpenAI
             self.client = OpenAI(api_key=self.api_key, base_url=self.base_url)
 
+    def _record_usage(self, task: str, response, model_name: Optional[str]):
+        if self.usage_tracker and getattr(response, 'usage', None):
+            self.usage_tracker.record(task, getattr(response, 'model', None) or model_name or self.model_name, response.usage)
+
     def _create_sentiment_prompt(self, content: str, context: str) -> str:
         return f"""
         Analisis sentimen dari artikel berita berikut berdasarkan konteks yang diberikan.
@@ -32,13 +38,64 @@ class SentimentAnalyzer:
         Pastikan output HANYA berupa JSON yang valid.
         """
 
+    def _create_multi_sentiment_prompt(self, content: str, contexts: List[str]) -> str:
+        context_list = "\n".join(f"{i + 1}. {context}" for i, context in enumerate(contexts))
+        return f"""
+        Analisis sentimen dari artikel berita berikut terhadap SETIAP konteks yang diberikan secara terpisah.
+        
+        DAFTAR KONTEKS:
+        {context_list}
+        
+        ARTIKEL:
+        {content[:3000]}
+        
+        Berikan analisis sentimen dalam format JSON dengan struktur berikut, satu entri per konteks dengan urutan yang sama:
+        {{
+            "results": [
+                {{
+                    "context": "konteks persis seperti di daftar",
+                    "sentiment": "positif/negatif/netral",
+                    "confidence": "tinggi/sedang/rendah",
+                    "reasoning": "penjelasan singkat mengapa sentimen tersebut dipilih berdasarkan konteks"
+                }}
+            ]
+        }}
+        
+        Fokus analisis setiap entri hanya pada konteksnya. Jika sebuah konteks tidak ditemukan dalam artikel, berikan sentimen "tidak terkait" untuk konteks tersebut.
+        Pastikan output HANYA berupa JSON yang valid.
+        """
+
+    def _parse_multi_sentiment_response(self, response_text: str, contexts: List[str]) -> Dict[str, Dict]:
+        fallback = {"sentiment": "netral", "confidence": "rendah", "reasoning": "Respons bukan JSON yang valid."}
+        try:
+            data = json.loads(response_text)
+            entries = data.get("results", []) if isinstance(data, dict) else data
+        except (json.JSONDecodeError, AttributeError):
+            return {context: dict(fallback) for context in contexts}
+        if not isinstance(entries, list):
+            return {context: dict(fallback) for context in contexts}
+
+        results = {}
+        by_name = {str(e.get("context", "")).strip().lower(): e for e in entries if isinstance(e, dict)}
+        claimed = {id(by_name[c.strip().lower()]) for c in contexts if c.strip().lower() in by_name}
+        for i, context in enumerate(contexts):
+            # Match by name first, then by position in case the model rephrased the context
+            entry = by_name.get(context.strip().lower())
+            if entry is None and i < len(entries) and isinstance(entries[i], dict) and id(entries[i]) not in claimed:
+                entry = entries[i]
+            if entry is None:
+                results[context] = {"sentiment": "gagal", "confidence": "rendah", "reasoning": "Konteks tidak ada dalam respons."}
+            else:
+                results[context] = {key: entry.get(key, fallback[key]) for key in ("sentiment", "confidence", "reasoning")}
+        return results
+
     def _parse_sentiment_response(self, response_text: str) -> Dict:
         try:
             return json.loads(response_text)
         except json.JSONDecodeError:
             return {"sentiment": "netral", "confidence": "rendah", "reasoning": "Respons bukan JSON yang valid."}
 
-    def analyze_sentiment(self, content: str, context: str) -> Optional[Dict]:
+    def analyze_sentiment(self, content: str, context: str, model_name: Optional[str] = None) -> Optional[Dict]:
         if not self.client:
             print("OpenAI client tidak diinisialisasi. Periksa API Key atau Base URL.")
             return {"sentiment": "error", "confidence": "rendah", "reasoning": "OpenAI client not initialized."}
@@ -47,7 +104,7 @@ class SentimentAnalyzer:
         
         try:
             response = self.client.chat.completions.create(
-                model=self.model_name,
+                model=model_name or self.model_name,
                 messages=[
                     {"role": "user", "content": prompt}
                 ],
@@ -55,7 +112,8 @@ class SentimentAnalyzer:
                 temperature=0.2,
                 timeout=120
             )
-            
+            self._record_usage('sentiment', response, model_name)
+
             if response.choices:
                 message_content = response.choices[0].message.content
                 return self._parse_sentiment_response(message_content)
@@ -65,3 +123,33 @@ class SentimentAnalyzer:
         except Exception as e:
             print(f"Error saat menghubungi proxy OpenAI: {e}")
             return {"sentiment": "error", "confidence": "rendah", "reasoning": str(e)}
+
+    def analyze_sentiment_multi(self, content: str, contexts: List[str], model_name: Optional[str] = None) -> Dict[str, Dict]:
+        """Analyze sentiment toward several contexts with a single request"""
+        if not self.client:
+            print("OpenAI client tidak diinisialisasi. Periksa API Key atau Base URL.")
+            return {context: {"sentiment": "error", "confidence": "rendah", "reasoning": "OpenAI client not initialized."} for context in contexts}
+
+        prompt = self._create_multi_sentiment_prompt(content, contexts)
+
+        try:
+            response = self.client.chat.completions.create(
+                model=model_name or self.model_name,
+                messages=[
+                    {"role": "user", "content": prompt}
+                ],
+                response_format={"type": "json_object"},
+                temperature=0.2,
+                timeout=120
+            )
+            self._record_usage('sentiment', response, model_name)
+
+            if response.choices:
+                message_content = response.choices[0].message.content
+                return self._parse_multi_sentiment_response(message_content, contexts)
+
+            return {context: {"sentiment": "gagal", "confidence": "rendah", "reasoning": "Struktur respons tidak valid."} for context in contexts}
+
+        except Exception as e:
+            print(f"Error saat menghubungi proxy OpenAI: {e}")
+            return {context: {"sentiment": "error", "confidence": "rendah", "reasoning": str(e)} for context in contexts}
@@ -1,15 +1,23 @@
-from typing import Dict, Optional
-from openai import OpenAI
+import json
+import re
+from typing import Callable, Dict, Optional
 
 class ArticleSummarizer:
-    def __init__(self, api_key: str, base_url: str):
+    def __init__(self, api_key: str, base_url: str, client=None):
         self.api_key = api_key
         self.base_url = base_url
         self.model_name = 'models/gemini-2.5-flash'
-        self.client = None
-        if self.api_key and self.base_url:
+        # Optional UsageTracker shared by the job; receives `response.usage` of every call
+        self.usage_tracker = None
+        self.client = client
+        if not self.client and self.api_key and self.base_url:
+            from openai import OpenAI
             self.client = OpenAI(api_key=self.api_key, base_url=self.base_url)
 
+    def _record_usage(self, task: str, response, model_name: Optional[str]):
+        if self.usage_tracker and getattr(response, 'usage', None):
+            self.usage_tracker.record(task, getattr(response, 'model', None) or model_name or self.model_name, response.usage)
+
     def _create_summary_prompt(self, content: str, config: Dict) -> str:
         summary_type = config.get('summary_type', 'Ringkas')
         max_length = config.get('max_length', 150)
@@ -63,7 +71,103 @@ class ArticleSummarizer:
             word_count = len(summary.split())
             return {"summary": "Gagal parsing JSON response.", "word_count": 0}
 
-    def summarize_article(self, content: str, config: Dict) -> Optional[Dict]:
+    @staticmethod
+    def _hex_escape(text: str, i: int) -> Optional[int]:
+        """Code unit of the `\\uXXXX` escape starting at `i`, or None if it is incomplete or invalid"""
+        digits = text[i + 2:i + 6]
+        if text[i:i + 2] != '\\u' or len(digits) < 4 or not all(c in '0123456789abcdefABCDEF' for c in digits):
+            return None
+        return int(digits, 16)
+
+    def _extract_partial_summary(self, partial_json: str) -> str:
+        """Best-effort read of the `summary` string from an incomplete JSON response"""
+        match = re.search(r'"summary"\s*:\s*"', partial_json)
+        if not match:
+            return ""
+        chars, i, text = [], match.end(), partial_json
+        escapes = {'n': '\n', 't': '\t', 'r': '\r', 'b': '\b', 'f': '\f', '"': '"', '\\': '\\', '/': '/'}
+        while i < len(text):
+            ch = text[i]
+            if ch == '"':
+                break
+            if ch == '\\':
+                if i + 1 >= len(text):
+                    break  # Escape sequence cut off mid-stream
+                if text[i + 1] == 'u':
+                    code = self._hex_escape(text, i)
+                    if code is None:
+                        break  # Cut off mid-stream or not valid hex: stop at the last complete character
+                    i += 6
+                    if 0xD800 <= code <= 0xDBFF:
+                        # Characters outside the BMP (emoji) arrive as a \uD83D\uDE00 surrogate pair
+                        rest = text[i:i + 6]
+                        if len(rest) < 6 and rest[:2] == '\\u'[:len(rest)] and all(c in '0123456789abcdefABCDEF' for c in rest[2:]):
+                            break
+                        low = self._hex_escape(text, i)
+                        if low is not None and 0xDC00 <= low <= 0xDFFF:
+                            code = 0x10000 + ((code - 0xD800) << 10) + (low - 0xDC00)
+                            i += 6
+                        else:
+                            code = 0xFFFD
+                    elif 0xDC00 <= code <= 0xDFFF:
+                        code = 0xFFFD
+                    chars.append(chr(code))
+                    continue
+                chars.append(escapes.get(text[i + 1], text[i + 1]))
+                i += 2
+                continue
+            chars.append(ch)
+            i += 1
+        return ''.join(chars)
+
+    def summarize_article_stream(self, content: str, config: Dict, on_update: Callable[[str], None],
+                                 model_name: Optional[str] = None) -> Optional[Dict]:
+        """Like `summarize_article`, but streams the completion and reports the partial summary as it grows"""
+        if not self.client:
+            print("OpenAI client tidak diinisialisasi. Periksa API Key atau Base URL.")
+            return {"summary": "Gagal: OpenAI client not initialized.", "word_count": 0}
+
+        prompt = self._create_summary_prompt(content, config)
+
+        try:
+            stream = self.client.chat.completions.create(
+                model=model_name or self.model_name,
+                messages=[
+                    {"role": "user", "content": prompt}
+                ],
+                response_format={"type": "json_object"},
+                temperature=0.5,
+                timeout=120,
+                stream=True,
+                # The last chunk then carries the token usage of the whole completion
+                stream_options={"include_usage": True}
+            )
+
+            response_text, last_partial = "", ""
+            for chunk in stream:
+                if getattr(chunk, 'usage', None):
+                    self._record_usage('summary', chunk, model_name)
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content or ""
+                if not delta:
+                    continue
+                response_text += delta
+                partial = self._extract_partial_summary(response_text)
+                if partial != last_partial:
+                    on_update(partial)
+                    last_partial = partial
+
+            if response_text:
+                return self._parse_summary_response(response_text)
+
+            return {"summary": "Gagal membuat ringkasan: Struktur respons tidak valid.", "word_count": 0}
+
+        except Exception as e:
+            print(f"Error saat menghubungi proxy OpenAI: {e}")
+            return {"summary": f"Gagal membuat ringkasan: {e}", "word_count": 0}
+
+    def summarize_article(self, content: str, config: Dict, model_name: Optional[str] = None) -> Optional[Dict]:
         if not self.client:
             print("OpenAI client tidak diinisialisasi. Periksa API Key atau Base URL.")
             return {"summary": "Gagal: OpenAI client not initialized.", "word_count": 0}
@@ -72,7 +176,7 @@ class ArticleSummarizer:
         
         try:
             response = self.client.chat.completions.create(
-                model=self.model_name,
+                model=model_name or self.model_name,
                 messages=[
                     {"role": "user", "content": prompt}
                 ],
@@ -80,7 +184,8 @@ class ArticleSummarizer:
                 temperature=0.5,
                 timeout=120
             )
-            
+            self._record_usage('summary', response, model_name)
+
             if response.choices:
                 message_content = response.choices[0].message.content
                 return self._parse_summary_response(message_content)
@@ -0,0 +1,80 @@
+import json
+import os
+from types import SimpleNamespace
+
+import pandas as pd
+
+from batch_runner import BatchJobBuilder, LocalFileBatchBackend, merge_results, select_analysis_rows
+from category_analyzer import CategoryAnalyzer
+from model_router import ModelRouter
+from sentiment_analyzer import SentimentAnalyzer
+from summarizer import ArticleSummarizer
+
+AVANZA = "Toyota Avanza kembali menjadi mobil terlaris di Indonesia. " * 5
+CABAI = "Harga cabai rawit naik tajam di pasar induk menjelang akhir pekan. " * 5
+CONFIG = {
+    'enable_sentiment': True, 'sentiment_contexts': ['Toyota Avanza'],
+    'sentiment_prefilter': {'enabled': True, 'aliases': {}},
+    'enable_summarize': True, 'summarize_config': {},
+    'enable_categorization': True, 'categorization_config': {'categories_with_desc': ['Otomotif', 'Ekonomi']},
+}
+
+
+class FakeBatchClient:
+    """Answers chat completions by task (told apart by temperature); refuses to summarize the cabai article"""
+
+    def __init__(self):
+        self.calls = 0
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    def _create(self, **body):
+        self.calls += 1
+        prompt = body['messages'][0]['content']
+        if body['temperature'] == 0.2:
+            content = json.dumps({'sentiment': 'positif', 'confidence': 'tinggi', 'reasoning': 'laris'})
+        elif body['temperature'] == 0.5:
+            content = None if 'cabai' in prompt else json.dumps({'summary': 'Avanza terlaris.'})
+        else:
+            content = json.dumps({'category': 'Ekonomi' if 'cabai' in prompt else 'Otomotif'})
+        return {'choices': [{'message': {'role': 'assistant', 'content': content}}]}
+
+
+def test_build_run_and_merge_with_the_local_backend(tmp_path):
+    df = pd.DataFrame({'Judul': ['Avanza', 'Cabai'], 'Isi': [AVANZA, CABAI]}, index=[10, 11])
+    analyzers = (SentimentAnalyzer(api_key=None, base_url=None), ArticleSummarizer(api_key=None, base_url=None),
+                 CategoryAnalyzer(api_key=None, base_url=None))
+    builder = BatchJobBuilder(*analyzers, ModelRouter())
+    job_file, local_file = str(tmp_path / 'input.jsonl'), str(tmp_path / 'local_results.jsonl')
+
+    # The cabai article never mentions the context, so its sentiment is answered locally
+    assert builder.write_job_file(select_analysis_rows(df, 'Isi', 'Judul'), CONFIG, job_file, local_file) == 5
+    assert builder.stats['prefilter_skipped'] == 1
+
+    client = FakeBatchClient()
+    backend = LocalFileBatchBackend(str(tmp_path / 'backend'), client)
+    batch_id = backend.submit(job_file)
+    assert backend.status(batch_id) == 'completed' and client.calls == 5
+    output_file = str(tmp_path / 'output.jsonl')
+    backend.download_results(batch_id, output_file)
+
+    merged = merge_results(df, [output_file, local_file], CONFIG, *analyzers)
+    assert merged.loc[10, 'Sentiment'] == 'positif'
+    assert merged.loc[11, 'Sentiment'] == 'tidak terkait'
+    assert merged.loc[10, 'Summary'] == 'Avanza terlaris.'
+    assert merged.loc[11, 'Summary'] == 'Gagal membuat ringkasan: Konten kosong dari model.'
+    assert list(merged['Kategori']) == ['Otomotif', 'Ekonomi']
+
+
+def test_null_content_after_a_failed_record_reports_its_own_error(tmp_path):
+    df = pd.DataFrame({'Isi': ['a', 'b']})
+    lines = [
+        {'custom_id': '0|summary', 'response': None, 'error': {'message': 'rate limited'}},
+        {'custom_id': '1|summary', 'response': {'status_code': 200, 'body': {'choices': [{'message': {'content': None}}]}}, 'error': None},
+    ]
+    path = str(tmp_path / 'output.jsonl')
+    with open(path, 'w', encoding='utf-8') as f:
+        f.writelines(json.dumps(line) + '\n' for line in lines)
+
+    merged = merge_results(df, [path], CONFIG, None, ArticleSummarizer(api_key=None, base_url=None), None)
+    assert merged.loc[0, 'Summary'] == 'Gagal membuat ringkasan: rate limited'
+    assert merged.loc[1, 'Summary'] == 'Gagal membuat ringkasan: Konten kosong dari model.'
@@ -0,0 +1,17 @@
+from bench_extraction import compare, missing_extractors
+
+RESULT = {'accuracy': {'title': 1.0}, 'per_domain': {'a.html': {'title': True}}, 'p50_ms': 1.0}
+BASELINE = {'extractors': {'manual': RESULT, 'trafilatura': RESULT}}
+
+
+def test_baseline_extractor_that_did_not_run_is_reported():
+    report = {'extractors': {'manual': RESULT}, 'skipped': {'trafilatura': 'trafilatura is not installed'}}
+    assert compare(report, BASELINE, 0.0, 0.5) == []
+    assert missing_extractors(report, BASELINE) == ['trafilatura']
+    assert missing_extractors(report, BASELINE, ['manual']) == []
+
+
+def test_accuracy_drop_is_a_regression():
+    worse = {**RESULT, 'accuracy': {'title': 0.5}, 'per_domain': {'a.html': {'title': False}}}
+    problems = compare({'extractors': {'manual': worse, 'trafilatura': RESULT}}, BASELINE, 0.0, 0.5)
+    assert len(problems) == 2
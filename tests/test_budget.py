@@ -0,0 +1,60 @@
+from news_processor import NewsProcessor
+from usage_tracker import BUDGET_SKIPPED
+
+TEXT = "Toyota Avanza kembali menjadi mobil terlaris di Indonesia bulan ini. " * 3
+
+
+def _processor_spending(tokens_per_call):
+    processor = NewsProcessor('k', 'http://127.0.0.1:9/v1')
+    calls = []
+
+    def spend(task, answer):
+        def call(*args, **kwargs):
+            calls.append(task)
+            processor.sentiment_analyzer.usage_tracker.record(task, 'm', {'prompt_tokens': tokens_per_call, 'completion_tokens': 0})
+            return answer
+        return call
+    processor.sentiment_analyzer.analyze_sentiment = spend('sentiment', {'sentiment': 'positif', 'confidence': 'tinggi', 'reasoning': ''})
+    processor.summarizer.summarize_article = spend('summary', {'summary': 'Avanza terlaris.'})
+    processor.category_analyzer.analyze_category = spend('category', 'Otomotif')
+    return processor, calls
+
+
+def _config(max_tokens):
+    return {
+        'enable_sentiment': True, 'sentiment_context': 'Toyota Avanza', 'sentiment_contexts': ['Toyota Avanza'],
+        'enable_summarize': True, 'summarize_config': {},
+        'enable_categorization': True, 'categorization_config': {'categories_with_desc': ['Otomotif']},
+        'budget_config': {'max_tokens': max_tokens},
+    }
+
+
+def _analyze(processor, config):
+    item = {'result': {}, 'analysis_text': TEXT, 'analysis_source': 'content'}
+    return processor._analyze_row_sync(item, config)['result']
+
+
+def test_budget_is_checked_before_every_call_of_a_row():
+    processor, calls = _processor_spending(100)
+    config = _config(max_tokens=100)
+    processor.start_job(config)
+
+    result = _analyze(processor, config)
+    assert calls == ['sentiment']
+    assert result['Sentiment_New'] == 'positif'
+    assert result['AI_Status_New'] == f"{BUDGET_SKIPPED}: summary, category"
+    assert 'Summary_New' not in result
+
+    # The next row makes no call at all
+    assert _analyze(processor, config)['AI_Status_New'] == BUDGET_SKIPPED
+    assert calls == ['sentiment']
+
+
+def test_rows_within_the_budget_run_every_task():
+    processor, calls = _processor_spending(10)
+    config = _config(max_tokens=1000)
+    processor.start_job(config)
+
+    result = _analyze(processor, config)
+    assert calls == ['sentiment', 'summary', 'category']
+    assert 'AI_Status_New' not in result
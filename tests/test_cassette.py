@@ -0,0 +1,43 @@
+import pytest
+
+from cassette import Cassette, CassetteMiss, ReplayedError, request_key
+
+
+def _record(path):
+    cassette = Cassette(path, 'record')
+    key = request_key({'model': 'm', 'messages': [{'role': 'user', 'content': 'halo'}]})
+    cassette.through('llm', key, lambda: 'pertama')
+    cassette.through('llm', key, lambda: 'kedua')
+    with pytest.raises(ValueError):
+        cassette.through('http', 'http://x/404', lambda: (_ for _ in ()).throw(ValueError('404')))
+    stream = cassette.through('llm', 'stream', lambda: iter(['a', 'b']), stream=True)
+    assert list(stream) == ['a', 'b']
+    cassette.close()
+    return key
+
+
+def test_recorded_responses_replay_in_order(tmp_path):
+    path = str(tmp_path / 'job.jsonl.gz')
+    key = _record(path)
+
+    replay = Cassette(path, 'replay')
+    fail = lambda: pytest.fail("replay must not fetch")
+    assert replay.through('llm', key, fail) == 'pertama'
+    assert replay.through('llm', key, fail) == 'kedua'
+    # Used up: the last recording repeats
+    assert replay.through('llm', key, fail) == 'kedua'
+    assert replay.through('llm', 'stream', fail, stream=True) == ['a', 'b']
+
+
+def test_recorded_errors_and_unknown_requests(tmp_path):
+    path = str(tmp_path / 'job.jsonl.gz')
+    _record(path)
+
+    replay = Cassette(path, 'replay')
+    with pytest.raises(ReplayedError):
+        replay.replay('http', 'http://x/404')
+    with pytest.raises(ValueError):
+        replay.replay('http', 'http://x/404', errors={'ValueError': ValueError})
+    with pytest.raises(CassetteMiss):
+        replay.replay('http', 'http://x/baru')
+    assert replay.misses == 1
@@ -0,0 +1,45 @@
+import pytest
+
+from category_classifier import SKLEARN_AVAILABLE, LocalCategoryClassifier
+
+pytestmark = pytest.mark.skipif(not SKLEARN_AVAILABLE, reason="scikit-learn is not installed")
+
+TEXTS = {
+    'Politik': ["pemilu presiden partai koalisi dprd kampanye", "menteri kebijakan pemerintah parlemen undang-undang"],
+    'Ekonomi': ["saham investasi bursa inflasi rupiah", "harga bisnis perusahaan laba ekspor"],
+}
+
+
+def _examples(times=10):
+    texts, labels = [], []
+    for label, samples in TEXTS.items():
+        for _ in range(times):
+            texts.extend(samples)
+            labels.extend([label] * len(samples))
+    return texts, labels
+
+
+def test_category_names_are_case_insensitive(tmp_path):
+    trained = LocalCategoryClassifier(['Politik', 'Ekonomi'], model_dir=str(tmp_path), min_samples=10)
+    assert trained.train(*_examples()) == 40
+    trained.save()
+
+    other = LocalCategoryClassifier(['politik', 'EKONOMI'], model_dir=str(tmp_path), min_samples=10)
+    assert other.model_path == trained.model_path and other.is_ready()
+    other.add_example("saham bursa investasi naik", 'ekonomi')
+    other.flush()
+    assert other.predict("partai kampanye pemilu presiden")[0] == 'politik'
+    assert other.n_samples == 41
+
+
+def test_flush_keeps_training_saved_by_another_instance(tmp_path):
+    job = LocalCategoryClassifier(['Politik', 'Ekonomi'], model_dir=str(tmp_path), min_samples=10)
+    job.add_example("menteri kebijakan pemerintah", 'Politik')
+
+    upload = LocalCategoryClassifier(['Politik', 'Ekonomi'], model_dir=str(tmp_path), min_samples=10)
+    upload.train(*_examples())
+    upload.save()
+
+    job.flush()
+    reloaded = LocalCategoryClassifier(['Politik', 'Ekonomi'], model_dir=str(tmp_path), min_samples=10)
+    assert reloaded.n_samples == 41
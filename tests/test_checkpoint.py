@@ -0,0 +1,75 @@
+import pytest
+
+from checkpoint import CheckpointStore, make_job_id
+
+BASE_CONFIG = {
+    'enable_sentiment': True, 'sentiment_contexts': ['Toyota'],
+    'sentiment_prefilter': {'enabled': True, 'aliases': {}},
+    'compression_config': {'enabled': True, 'token_budget': 500},
+    'routing_policy': 'Otomatis (Tugas & Panjang Input)',
+}
+
+
+def test_job_id_is_stable_for_the_same_input_and_settings():
+    assert make_job_id(b'data', dict(BASE_CONFIG)) == make_job_id(b'data', dict(BASE_CONFIG))
+    assert make_job_id(b'data', BASE_CONFIG) != make_job_id(b'other', BASE_CONFIG)
+
+
+@pytest.mark.parametrize('key, value', [
+    ('sentiment_prefilter', {'enabled': False, 'aliases': {}}),
+    ('compression_config', {'enabled': False, 'token_budget': 500}),
+    ('compression_config', {'enabled': True, 'token_budget': 800}),
+    ('routing_policy', 'Selalu Standard'),
+])
+def test_settings_that_change_results_start_a_new_job(key, value):
+    assert make_job_id(b'data', BASE_CONFIG) != make_job_id(b'data', {**BASE_CONFIG, key: value})
+
+
+def test_unrelated_settings_keep_the_job_id():
+    assert make_job_id(b'data', BASE_CONFIG) == make_job_id(b'data', {**BASE_CONFIG, 'pipeline_config': {'fetch_workers': 2}})
+
+
+def test_finished_rows_survive_a_restart(tmp_path):
+    path = str(tmp_path / 'jobs.sqlite')
+    store = CheckpointStore(path, batch_size=2)
+    store.start_job('job', 'berita.xlsx', 3)
+    store.add('job', 0, {'original_index': 0, 'Sentiment_New': 'positif'})
+    store.add('job', 2, {'original_index': 2, 'Sentiment_New': 'negatif'})
+    store.add('job', 1, {'original_index': 1, 'Sentiment_New': 'netral'})
+    # The third row is still buffered when the process goes away; close() flushes it
+    store.close()
+
+    reopened = CheckpointStore(path)
+    assert reopened.completed_indices('job') == {0, 1, 2}
+    assert sorted(r['Sentiment_New'] for r in reopened.load_results('job')) == ['negatif', 'netral', 'positif']
+    info = reopened.job_info('job')
+    assert (info['status'], info['total'], info['completed']) == ('running', 3, 3)
+    reopened.finish_job('job')
+    assert reopened.job_info('job')['status'] == 'finished'
+    reopened.delete_job('job')
+    assert reopened.job_info('job') is None and reopened.load_results('job') == []
+    reopened.close()
+
+
+def test_rows_are_committed_in_batches(tmp_path):
+    path = str(tmp_path / 'jobs.sqlite')
+    store = CheckpointStore(path, batch_size=2, max_delay=3600)
+    store.add('job', 0, {'original_index': 0})
+    reader = CheckpointStore(path)
+    assert reader.completed_indices('job') == set()
+    store.add('job', 1, {'original_index': 1})
+    assert reader.completed_indices('job') == {0, 1}
+    store.close()
+    reader.close()
+
+
+def test_unknown_total_is_recorded_when_the_job_finishes(tmp_path):
+    store = CheckpointStore(str(tmp_path / 'jobs.sqlite'))
+    store.start_job('job', 'file.csv', 0)
+    store.finish_job('job', total=3)
+    assert store.job_info('job')['total'] == 3
+
+    # Resuming without a count keeps the recorded total
+    store.start_job('job', 'file.csv', 0)
+    assert store.job_info('job')['total'] == 3
+    store.close()
@@ -0,0 +1,53 @@
+import json
+
+import pytest
+
+from cli import build_config, build_parser
+
+
+@pytest.fixture
+def job_config(tmp_path):
+    path = tmp_path / 'job.json'
+    path.write_text(json.dumps({
+        'enable_scraping': True, 'enable_summarize': True, 'scraping_timeout': 45,
+        'sentiment_prefilter': {'enabled': True, 'aliases': {'toyota': ['TAM']}},
+        'summarize_config': {'summary_type': 'Detail', 'max_length': 300, 'language': 'English', 'focus_aspect': 'harga'},
+        'compression_config': {'enabled': True, 'token_budget': 800},
+        'hedging_config': {'enabled': False, 'max_hedge_ratio': 0.2},
+        'pipeline_config': {'fetch_workers': 16, 'queue_size': 64}
+    }))
+    return str(path)
+
+
+def config_for(*flags):
+    return build_config(build_parser().parse_args(['--input', 'in.csv', '--output', 'out.csv', *flags]))
+
+
+def test_passed_flags_override_the_config_file(job_config):
+    config = config_for('--config', job_config, '--no-prefilter', '--summary-type', 'Ringkas', '--no-compression',
+                        '--hedging', '--no-scrape', '--fetch-workers', '4')
+    assert config['enable_scraping'] is False
+    assert config['sentiment_prefilter'] == {'enabled': False, 'aliases': {'toyota': ['TAM']}}
+    assert config['summarize_config'] == {'summary_type': 'Ringkas', 'max_length': 300, 'language': 'English', 'focus_aspect': 'harga'}
+    assert config['compression_config'] == {'enabled': False, 'token_budget': 800}
+    assert config['hedging_config'] == {'enabled': True, 'max_hedge_ratio': 0.2}
+    assert config['pipeline_config']['fetch_workers'] == 4 and config['pipeline_config']['queue_size'] == 64
+
+
+def test_config_file_values_win_over_defaults_when_no_flag_is_passed(job_config):
+    config = config_for('--config', job_config)
+    assert config['enable_scraping'] is True and config['enable_summarize'] is True
+    assert config['scraping_timeout'] == 45
+    assert config['summarize_config']['summary_type'] == 'Detail'
+    assert config['compression_config'] == {'enabled': True, 'token_budget': 800}
+
+
+def test_defaults_without_config_file():
+    config = config_for()
+    assert config['enable_scraping'] is False
+    assert config['sentiment_prefilter'] == {'enabled': True, 'aliases': {}}
+    assert config['compression_config'] == {'enabled': True, 'token_budget': 500}
+    assert config['scraping_timeout'] == 30
+    assert config['reuse_archived_articles'] is True
+    assert config['pipeline_config'] == {'fetch_workers': 8, 'extract_workers': 2, 'analyze_workers': 4,
+                                         'extraction_processes': 0, 'queue_size': 32}
@@ -0,0 +1,43 @@
+from content_compressor import ContentCompressor, estimate_tokens
+
+COMPRESSOR = ContentCompressor()
+FILLER = "Cuaca di Jakarta cerah berawan sepanjang hari dengan suhu sekitar tiga puluh derajat. "
+
+
+def test_short_content_is_returned_unchanged():
+    result = COMPRESSOR.compress("Toyota Avanza laris.", ['avanza'], token_budget=100)
+    assert result['text'] == "Toyota Avanza laris."
+    assert result['tokens_saved'] == 0
+
+
+def test_output_stays_within_the_budget():
+    content = FILLER * 200
+    result = COMPRESSOR.compress(content, [], token_budget=100)
+    assert estimate_tokens(result['text']) <= 100
+    assert result['compressed_tokens'] < result['original_tokens']
+    assert result['tokens_saved'] == result['original_tokens'] - result['compressed_tokens']
+
+
+def test_keyword_sentences_are_kept_beyond_the_lead():
+    content = "Judul berita hari ini.\n\n" + FILLER * 40 + "Penjualan Toyota Avanza naik 20 persen. " + FILLER * 40
+    result = COMPRESSOR.compress(content, COMPRESSOR.extract_keywords("Toyota Avanza"), token_budget=60)
+    assert result['text'].startswith("Judul berita hari ini.")
+    assert "Penjualan Toyota Avanza naik 20 persen." in result['text']
+
+
+def test_keywords_match_whole_words_only():
+    pattern = COMPRESSOR.keyword_pattern(['bri', 'toyota avanza'])
+    assert pattern.search("laba bri-nya naik")
+    assert pattern.search("penjualan toyota avanzanya naik")
+    assert not pattern.search("kinerja brilian pemain muda")
+    assert COMPRESSOR.keyword_pattern([]) is None
+
+
+def test_lead_without_closing_punctuation_does_not_swallow_the_next_paragraph():
+    lead = "Jakarta - Toyota resmi meluncurkan Avanza terbaru"
+    second = "Paragraf kedua berisi detail harga yang sangat panjang " * 10 + "."
+    content = f"{lead}\n\n{second}\n\n" + FILLER * 60
+    result = COMPRESSOR.compress(content, [], token_budget=30)
+    assert result['text'].startswith(lead)
+    # Only the lead paragraph is guaranteed; the long second paragraph does not fit the budget
+    assert "Paragraf kedua" not in result['text']
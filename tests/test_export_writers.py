@@ -0,0 +1,17 @@
+import pandas as pd
+import pytest
+
+from export_writers import CsvStreamWriter, ExportWriter, export_dataframe
+
+
+def test_export_writer_is_abstract(tmp_path):
+    with pytest.raises(TypeError):
+        ExportWriter(str(tmp_path / 'x.csv'), ['a'])
+    assert issubclass(CsvStreamWriter, ExportWriter)
+
+
+def test_csv_export_round_trip(tmp_path):
+    df = pd.DataFrame({'URL': ['http://a', 'http://b'], 'Isi': ['satu', 'dua']})
+    paths = export_dataframe(df, str(tmp_path / 'out.csv'), chunk_size=1)
+    assert paths['sidecar'] is None
+    assert pd.read_csv(paths['main']).to_dict('records') == df.to_dict('records')
@@ -0,0 +1,40 @@
+import asyncio
+import time
+
+import scraper
+from scraper import NewsScraper, discard_extraction_pool, get_extraction_pool
+
+HTML = b"<html><head><title>Judul Uji</title></head><body><article>" + b"<p>Kalimat isi artikel yang cukup panjang.</p>" * 20 + b"</article></body></html>"
+
+
+def _wait_exited(processes, timeout=10):
+    deadline = time.time() + timeout
+    while time.time() < deadline and any(p.is_alive() for p in processes):
+        time.sleep(0.05)
+    return not any(p.is_alive() for p in processes)
+
+
+def test_resizing_replaces_the_pool_and_stops_the_old_workers():
+    news_scraper = NewsScraper()
+    news_scraper.extraction_processes = 1
+    try:
+        result = asyncio.run(news_scraper.extract_article(HTML, 'https://contoh.co.id/berita/1', False))
+        assert 'Kalimat isi artikel' in result['content']
+        first = get_extraction_pool(1)
+        workers = list(first._processes.values())
+        assert workers
+
+        second = get_extraction_pool(2)
+        assert second is not first and get_extraction_pool(2) is second
+        assert _wait_exited(workers)
+    finally:
+        discard_extraction_pool(get_extraction_pool(1))
+    assert scraper._extraction_pool is None
+
+
+def test_discarding_a_broken_pool_starts_a_new_one():
+    pool = get_extraction_pool(1)
+    discard_extraction_pool(pool)
+    replacement = get_extraction_pool(1)
+    assert replacement is not pool
+    discard_extraction_pool(replacement)
@@ -0,0 +1,17 @@
+import pytest
+
+from input_reader import TableReader
+
+CSV = "URL,Judul\nhttp://a,Satu\nhttp://b,Dua\n".encode('utf-8')
+
+
+def test_known_length_skips_counting():
+    reader = TableReader(CSV, 'berita.csv', length=2)
+    assert reader.known_length == 2
+    assert TableReader(CSV, 'berita.csv').known_length is None
+    assert len(TableReader(CSV, 'berita.csv')) == 2
+
+
+def test_non_utf8_csv_raises_decode_error():
+    with pytest.raises(UnicodeDecodeError):
+        TableReader("URL,Judul\nhttp://a,Café\n".encode('utf-16'), 'berita.csv')
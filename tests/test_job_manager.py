@@ -0,0 +1,86 @@
+import asyncio
+import time
+
+import pandas as pd
+
+from cli import build_config, build_parser
+from job_manager import JobManager
+from news_processor import NewsProcessor
+
+
+def _wait_for(predicate, timeout=5.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def _sleeper(seconds):
+    async def run(job):
+        await asyncio.sleep(seconds)
+        return job.id
+    return run
+
+
+def test_jobs_are_scoped_to_their_owner():
+    manager = JobManager()
+    mine = manager.submit('a', 'manual', {}, _sleeper(0), owner='alice')
+    theirs = manager.submit('b', 'manual', {}, _sleeper(0), owner='bob')
+
+    assert [job.id for job in manager.jobs('alice')] == [mine.id]
+    assert [row['Job'] for row in manager.summary('bob')] == [theirs.id]
+    assert manager.get(theirs.id, 'alice') is None
+    assert manager.get(theirs.id, 'bob') is theirs
+    assert len(manager.jobs()) == 2
+
+
+def test_cancel_ignores_other_owners():
+    manager = JobManager()
+    running = manager.submit('long', 'manual', {}, _sleeper(2), owner='alice')
+    assert _wait_for(lambda: running.status == 'running')
+
+    manager.cancel(running.id, 'bob')
+    time.sleep(0.05)
+    assert running.status == 'running'
+
+    manager.cancel(running.id, 'alice')
+    assert _wait_for(lambda: running.status == 'cancelled')
+
+
+def test_queue_position_counts_jobs_of_every_owner():
+    manager = JobManager()
+    first = manager.submit('first', 'manual', {}, _sleeper(0.3), owner='alice')
+    second = manager.submit('second', 'manual', {}, _sleeper(0), owner='bob')
+    third = manager.submit('third', 'manual', {}, _sleeper(0), owner='carol')
+
+    assert manager.queue_position(third) == 2
+    assert _wait_for(lambda: third.status == 'finished')
+    assert first.status == second.status == 'finished'
+    assert manager.queue_position(third) == 0
+
+
+def test_cancelled_job_closes_its_trace_and_cassette(tmp_path):
+    trace_path, cassette_path = str(tmp_path / 'trace.json'), str(tmp_path / 'job.jsonl.gz')
+    config = build_config(build_parser().parse_args(
+        ['--input', 'in.csv', '--output', 'out.csv', '--trace', trace_path, '--record', cassette_path]))
+    processor = NewsProcessor('k', 'http://127.0.0.1:9/v1')
+
+    async def hang(item, config):
+        await asyncio.sleep(60)
+    processor._fetch_row = hang
+
+    manager = JobManager()
+    rows = pd.DataFrame({'URL': ['http://x/1', 'http://x/2']})
+    job = manager.submit('hang', 'excel', config,
+                         lambda job: processor.process_rows_async(rows, config['column_mapping'], config), owner='alice')
+    assert _wait_for(lambda: job.status == 'running' and 'trace' in config.get('job_stats', {}))
+    manager.cancel(job.id, 'alice')
+    assert _wait_for(lambda: job.status == 'cancelled')
+
+    assert config['job_stats']['trace']._file.closed
+    assert config['job_stats']['cassette']._file is None
+    assert processor.scraper.cassette is None
+    with open(trace_path, encoding='utf-8') as f:
+        assert f.read().rstrip().endswith(']')
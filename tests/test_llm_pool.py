@@ -0,0 +1,200 @@
+import threading
+import time
+from types import SimpleNamespace
+
+import openai
+import pytest
+
+from llm_pool import LLMEndpointPool, parse_endpoints
+from llm_stub_server import build_parser, start_stub_server
+
+
+class FakeClient:
+    """Stands in for an `OpenAI` client; `behaviour` is called with the request kwargs"""
+
+    def __init__(self, name, behaviour):
+        self.name = name
+        self.calls = 0
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+        self._behaviour = behaviour
+
+    def _create(self, **kwargs):
+        self.calls += 1
+        return self._behaviour(**kwargs)
+
+
+def connection_error(**kwargs):
+    raise openai.APIConnectionError(request=None)
+
+
+def answer(text):
+    return lambda **kwargs: SimpleNamespace(text=text, usage=None)
+
+
+def make_pool(behaviours, **kwargs):
+    clients = {}
+
+    def factory(api_key, base_url):
+        clients[base_url] = FakeClient(base_url, behaviours[base_url])
+        return clients[base_url]
+    endpoints = [{'name': url, 'api_key': 'k', 'base_url': url} for url in behaviours]
+    return LLMEndpointPool(endpoints, client_factory=factory, **kwargs), clients
+
+
+def test_parse_endpoints_pairs_single_key_with_every_url():
+    endpoints = parse_endpoints('key', 'http://a/v1, http://b/v1')
+    assert [(e['api_key'], e['base_url']) for e in endpoints] == [('key', 'http://a/v1'), ('key', 'http://b/v1')]
+
+
+def test_failover_to_next_endpoint_on_connection_error():
+    pool, clients = make_pool({'down': connection_error, 'up': answer('ok')})
+    for _ in range(3):
+        assert pool.chat.completions.create(model='m', messages=[]).text == 'ok'
+    assert clients['up'].calls == 3
+
+
+def test_failing_endpoint_is_ejected_after_threshold():
+    pool, clients = make_pool({'down': connection_error, 'up': answer('ok')}, failure_threshold=2, ejection_seconds=60)
+    for _ in range(5):
+        pool.chat.completions.create(model='m', messages=[])
+    # Two failures eject it; afterwards every call goes straight to the healthy endpoint
+    assert clients['down'].calls == 2
+    status = {row['Endpoint']: row for row in pool.status()}
+    assert status['down']['Sehat'] is False and status['up']['Sehat'] is True
+
+
+def test_request_errors_are_not_retried_elsewhere():
+    def bad_request(**kwargs):
+        raise ValueError("invalid schema")
+    pool, clients = make_pool({'a': bad_request, 'b': bad_request})
+    with pytest.raises(ValueError):
+        pool.chat.completions.create(model='m', messages=[])
+    assert sum(client.calls for client in clients.values()) == 1
+    assert all(row['Sehat'] for row in pool.status())
+
+
+def test_all_endpoints_failing_raises_last_error():
+    pool, _ = make_pool({'a': connection_error, 'b': connection_error})
+    with pytest.raises(openai.APIConnectionError):
+        pool.chat.completions.create(model='m', messages=[])
+
+
+def test_least_outstanding_endpoint_is_preferred():
+    release = threading.Event()
+
+    def slow(**kwargs):
+        release.wait(5)
+        return SimpleNamespace(text='slow', usage=None)
+    pool, clients = make_pool({'a': slow, 'b': answer('fast')})
+    worker = threading.Thread(target=pool.chat.completions.create, kwargs={'model': 'm', 'messages': []})
+    worker.start()
+    deadline = time.time() + 5
+    while not any(row['Request Aktif'] for row in pool.status()) and time.time() < deadline:
+        time.sleep(0.01)
+    busy = next(row['Endpoint'] for row in pool.status() if row['Request Aktif'])
+    pool.chat.completions.create(model='m', messages=[])
+    release.set()
+    worker.join()
+    idle = 'b' if busy == 'a' else 'a'
+    assert clients[idle].calls >= 1
+
+
+@pytest.fixture
+def stub_url():
+    args = build_parser().parse_args(['--port', '0', '--default-latency', 'fixed:0'])
+    server = start_stub_server(args)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/v1"
+    server.shutdown()
+    server.server_close()
+
+
+def test_pool_fails_over_from_dead_endpoint_to_stub(stub_url):
+    # Port 9 (discard) is closed: the connection is refused straight away
+    pool = LLMEndpointPool(parse_endpoints('stub', ['http://127.0.0.1:9/v1', stub_url]))
+    for _ in range(4):
+        response = pool.chat.completions.create(
+            model='stub-model', messages=[{'role': 'user', 'content': "CATEGORY LIST:\n- Ekonomi\n- Politik\n"}])
+        assert response.choices[0].message.content.startswith('{"category"')
+    status = {row['Base URL']: row for row in pool.status()}
+    assert status[stub_url]['Total Request'] == 4
+    assert status['http://127.0.0.1:9/v1']['Total Gagal'] >= 1
+
+
+def usage_answer(delays):
+    """Answer with fixed usage after the next delay in `delays` (0 once they are used up)"""
+    lock = threading.Lock()
+
+    def behaviour(**kwargs):
+        with lock:
+            delay = delays.pop(0) if delays else 0
+        time.sleep(delay)
+        return SimpleNamespace(model='models/gemini-2.5-flash-lite', usage={'prompt_tokens': 100, 'completion_tokens': 10})
+    return behaviour
+
+
+def prime_hedging(pool, samples=20):
+    pool.hedging.min_delay = 0.02
+    key = pool.hedging.latency_key({'model': 'm', 'messages': []})
+    for _ in range(samples):
+        pool.hedging.observe(key, 0.001)
+
+
+def test_hedge_ratio_is_counted_per_job_and_only_while_enabled():
+    pool, _ = make_pool({'a': answer('ok')})
+    for _ in range(50):
+        pool.chat.completions.create(model='m', messages=[])
+    assert pool.hedging.stats()['calls'] == 0
+
+    pool.configure_hedging(True, 0.1)
+    prime_hedging(pool)
+    # Every call is slower than the primed p95, so only the cap limits hedging
+    pool.hedging.observe = lambda key, latency: None
+    pool.endpoints[0]._client = FakeClient('a', usage_answer([0.05] * 80))
+    for _ in range(40):
+        pool.chat.completions.create(model='m', messages=[])
+    stats = pool.hedging.stats()
+    assert stats['calls'] == 40
+    assert stats['hedged'] == 4
+
+    # The next job starts from zero instead of inheriting the previous job's headroom
+    pool.configure_hedging(True, 0.1)
+    assert pool.hedging.stats() == {'calls': 0, 'hedged': 0, 'hedge_wins': 0}
+
+
+def test_losing_hedged_request_is_charged_to_job_and_row():
+    from model_router import ModelRouter
+    from usage_tracker import UsageTracker
+
+    pool, _ = make_pool({'a': usage_answer([0.3]), 'b': usage_answer([])})
+    pool.configure_hedging(True, 1.0)
+    prime_hedging(pool)
+    tracker = UsageTracker(ModelRouter())
+    pool.usage_tracker = tracker
+    with tracker.row_scope() as row_usage:
+        pool.chat.completions.create(model='m', messages=[])
+        deadline = time.time() + 5
+        while tracker.calls < 1 and time.time() < deadline:
+            time.sleep(0.01)
+        assert pool.hedging.stats()['hedge_wins'] == 1
+        assert [row['Tugas'] for row in tracker.summary()] == ['hedge']
+        assert row_usage['input_tokens'] == 100
+
+
+def test_each_job_keeps_its_own_hedge_counts():
+    from news_processor import NewsProcessor
+
+    processor = NewsProcessor('k', 'http://127.0.0.1:9/v1')
+    first, second = {'hedging_config': {'enabled': True}}, {'hedging_config': {'enabled': True}}
+    processor.start_job(first)
+    for _ in range(3):
+        processor.llm_pool.hedging.record_call()
+    processor.finish_job(first)
+
+    processor.start_job(second)
+    processor.llm_pool.hedging.record_call()
+    processor.finish_job(second)
+
+    assert first['job_stats']['hedging']['calls'] == 3
+    assert second['job_stats']['hedging']['calls'] == 1
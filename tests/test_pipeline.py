@@ -0,0 +1,126 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from pipeline import Stage, StagedPipeline, run_in_thread
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_items_flow_through_all_stages_in_order_of_completion():
+    async def add(key):
+        async def func(item):
+            item[key] = True
+            return item
+        return func
+
+    async def main():
+        results = []
+
+        async def sink(item):
+            results.append(item)
+        pipeline = StagedPipeline([Stage('a', await add('a'), 2), Stage('b', await add('b'), 3)], queue_size=2)
+        await pipeline.run(({'id': i} for i in range(20)), sink)
+        return results, pipeline.stats()
+
+    results, stats = run(main())
+    assert sorted(item['id'] for item in results) == list(range(20))
+    assert all(item['a'] and item['b'] for item in results)
+    assert [row['Diproses'] for row in stats] == [20, 20]
+
+
+def test_failed_item_skips_later_stages_and_reaches_sink_via_on_error():
+    async def fail_odd(item):
+        if item['id'] % 2:
+            raise ValueError("boom")
+        return item
+
+    async def mark(item):
+        item['analyzed'] = True
+        return item
+
+    async def main():
+        results = []
+
+        async def sink(item):
+            results.append(item)
+        pipeline = StagedPipeline([Stage('fetch', fail_odd, 2), Stage('analyze', mark, 2)],
+                                  on_error=lambda item, stage, error: {**item, 'error': f"{stage}: {error}"})
+        await pipeline.run([{'id': i} for i in range(6)], sink)
+        return results, pipeline.stats()
+
+    results, stats = run(main())
+    failed = [item for item in results if 'error' in item]
+    assert sorted(item['id'] for item in failed) == [1, 3, 5]
+    assert all(item['error'] == 'fetch: boom' and 'analyzed' not in item for item in failed)
+    assert stats[0]['Gagal'] == 3 and stats[1]['Diproses'] == 3
+
+
+def test_cancelling_the_run_stops_all_stage_tasks():
+    async def main():
+        first = asyncio.Event()
+
+        async def slow(item):
+            first.set()
+            await asyncio.sleep(10)
+            return item
+
+        async def sink(item):
+            pass
+        pipeline = StagedPipeline([Stage('slow', slow, 2)])
+        task = asyncio.create_task(pipeline.run(({'id': i} for i in range(100)), sink))
+        await first.wait()
+        before = len(asyncio.all_tasks())
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        # Only this test's own task is left
+        return before, len(asyncio.all_tasks())
+
+    before, after = run(main())
+    assert before > 1 and after == 1
+
+
+def test_each_stage_blocks_on_its_own_thread_pool():
+    lock = threading.Lock()
+    in_fetch, peak_fetch, analyze_threads = [0], [0], set()
+
+    def blocking_fetch():
+        with lock:
+            in_fetch[0] += 1
+            peak_fetch[0] = max(peak_fetch[0], in_fetch[0])
+        time.sleep(0.05)
+        with lock:
+            in_fetch[0] -= 1
+        return threading.current_thread().name
+
+    async def fetch(item):
+        item['fetch_thread'] = await run_in_thread(blocking_fetch)
+        return item
+
+    async def analyze(item):
+        analyze_threads.add(await run_in_thread(lambda: threading.current_thread().name))
+        return item
+
+    async def main():
+        results = []
+
+        async def sink(item):
+            results.append(item)
+        await StagedPipeline([Stage('fetch', fetch, 3), Stage('analyze', analyze, 2)]).run([{'id': i} for i in range(12)], sink)
+        return results
+
+    results = run(main())
+    assert peak_fetch[0] <= 3
+    assert all(item['fetch_thread'].startswith('pipeline-fetch') for item in results)
+    assert analyze_threads and all(name.startswith('pipeline-analyze') for name in analyze_threads)
+
+
+def test_run_in_thread_outside_a_pipeline_uses_the_default_executor():
+    async def main():
+        return await run_in_thread(lambda x: x * 2, 21)
+    assert run(main()) == 42
@@ -0,0 +1,54 @@
+import pytest
+
+from relevance_filter import PREFILTER_MARKER, RelevanceFilter
+
+FILTER = RelevanceFilter()
+
+
+def _relevant(text, context, aliases=None):
+    return FILTER.check(text, context, aliases) is None
+
+
+@pytest.mark.parametrize('text', [
+    "Penjualan Toyota Avanza naik tajam bulan ini.",
+    "Avanzanya laris di pasar mobil bekas.",              # Indonesian suffix
+    "Toyota Avansa tetap jadi pilihan keluarga.",         # light typo
+    "TOYOTA menambah kapasitas pabrik di Karawang.",      # one significant word is enough
+])
+def test_mentions_are_sent_to_the_ai(text):
+    assert _relevant(text, "Toyota Avanza")
+
+
+def test_unrelated_text_is_answered_locally():
+    result = FILTER.check("Harga cabai naik di pasar induk hari ini.", "Toyota Avanza")
+    assert result['sentiment'] == 'tidak terkait'
+    assert result['reasoning'].startswith(PREFILTER_MARKER)
+
+
+def test_acronyms_of_multi_word_contexts_match_exactly():
+    assert _relevant("Laba BRI tumbuh 10 persen.", "Bank Rakyat Indonesia")
+    assert not _relevant("Laba BRIS tumbuh 10 persen.", "Bank Rakyat Indonesia")
+
+
+def test_aliases_count_as_mentions():
+    aliases = FILTER.parse_aliases("Toyota Avanza: TMMIN, Astra")
+    assert _relevant("TMMIN memperluas ekspor ke Timur Tengah.", "Toyota Avanza", aliases)
+    assert not _relevant("TMMIN memperluas ekspor ke Timur Tengah.", "Toyota Avanza")
+
+
+def test_empty_context_never_answers_locally():
+    assert _relevant("Harga cabai naik.", "")
+
+
+@pytest.mark.parametrize('source, ai_called', [('content', False), ('title_fallback', True), ('title_only', True)])
+def test_processor_prefilters_only_full_content(source, ai_called):
+    from news_processor import NewsProcessor
+
+    processor = NewsProcessor('k', 'http://127.0.0.1:9/v1')
+    calls = []
+    processor._routed_call = lambda task, text, *args: calls.append(task) or {'sentiment': 'netral'}
+    config = {'sentiment_contexts': ['Toyota Avanza'], 'sentiment_prefilter': {'enabled': True, 'aliases': {}}}
+
+    results = processor._analyze_sentiments("Harga cabai naik di pasar induk hari ini.", source, config, [])
+    assert bool(calls) == ai_called
+    assert (results['Toyota Avanza']['sentiment'] == 'tidak terkait') != ai_called
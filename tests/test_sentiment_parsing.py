@@ -0,0 +1,64 @@
+import json
+
+import pytest
+
+from sentiment_analyzer import SentimentAnalyzer
+
+PARSE = SentimentAnalyzer(api_key=None, base_url=None)._parse_multi_sentiment_response
+CONTEXTS = ['Toyota Avanza', 'Honda Brio']
+
+
+def _entry(context, sentiment):
+    return {'context': context, 'sentiment': sentiment, 'confidence': 'tinggi', 'reasoning': f"soal {context}"}
+
+
+def _response(*entries):
+    return json.dumps({'results': list(entries)})
+
+
+def test_reordered_entries_are_matched_by_name():
+    results = PARSE(_response(_entry('honda brio', 'negatif'), _entry('Toyota Avanza ', 'positif')), CONTEXTS)
+    assert results['Toyota Avanza']['sentiment'] == 'positif'
+    assert results['Honda Brio']['sentiment'] == 'negatif'
+
+
+def test_rephrased_entry_falls_back_to_its_unclaimed_position():
+    results = PARSE(_response(_entry('Avanza', 'positif'), _entry('Honda Brio', 'negatif')), CONTEXTS)
+    assert results['Toyota Avanza']['sentiment'] == 'positif'
+    assert results['Honda Brio']['sentiment'] == 'negatif'
+
+
+def test_entry_claimed_by_name_is_not_reused_by_position():
+    # Only Honda Brio answered, in the first slot: Toyota Avanza must not take it positionally
+    results = PARSE(_response(_entry('Honda Brio', 'negatif')), CONTEXTS)
+    assert results['Honda Brio']['sentiment'] == 'negatif'
+    assert results['Toyota Avanza']['sentiment'] == 'gagal'
+
+
+def test_missing_and_extra_entries():
+    results = PARSE(_response(_entry('Toyota Avanza', 'positif'), _entry('Suzuki Ertiga', 'netral'),
+                              _entry('Daihatsu Xenia', 'negatif')), CONTEXTS)
+    assert set(results) == set(CONTEXTS)
+    assert results['Toyota Avanza']['sentiment'] == 'positif'
+    # The second slot belongs to an extra context, which still counts as a positional answer
+    assert results['Honda Brio']['sentiment'] == 'netral'
+
+    results = PARSE(_response(_entry('Toyota Avanza', 'positif')), CONTEXTS)
+    assert results['Honda Brio'] == {'sentiment': 'gagal', 'confidence': 'rendah', 'reasoning': 'Konteks tidak ada dalam respons.'}
+
+
+def test_missing_fields_use_the_fallback_values():
+    results = PARSE(_response({'context': 'Toyota Avanza', 'sentiment': 'positif'}), CONTEXTS[:1])
+    assert results['Toyota Avanza'] == {'sentiment': 'positif', 'confidence': 'rendah', 'reasoning': 'Respons bukan JSON yang valid.'}
+
+
+def test_bare_list_is_accepted():
+    results = PARSE(json.dumps([_entry('Toyota Avanza', 'positif'), _entry('Honda Brio', 'netral')]), CONTEXTS)
+    assert [r['sentiment'] for r in results.values()] == ['positif', 'netral']
+
+
+@pytest.mark.parametrize('text', ['bukan json', '42', '{"results": {"Toyota Avanza": "positif"}}', 'null'])
+def test_malformed_responses_fall_back_for_every_context(text):
+    results = PARSE(text, CONTEXTS)
+    assert set(results) == set(CONTEXTS)
+    assert all(r['confidence'] == 'rendah' for r in results.values())
@@ -0,0 +1,36 @@
+import json
+
+import pytest
+
+from summarizer import ArticleSummarizer
+
+
+@pytest.fixture
+def summarizer():
+    return ArticleSummarizer(api_key=None, base_url=None)
+
+
+def test_partial_summary_grows_with_every_prefix(summarizer):
+    full = json.dumps({'summary': 'Laba naik 😀 "tajam"\ndi kuartal ini é'})
+    expected = json.loads(full)['summary']
+    previous = ''
+    for end in range(len(full) + 1):
+        partial = summarizer._extract_partial_summary(full[:end])
+        # Every prefix is encodable and never runs ahead of the final text
+        partial.encode('utf-8')
+        assert expected.startswith(partial)
+        assert len(partial) >= len(previous)
+        previous = partial
+    assert previous == expected
+
+
+def test_surrogate_pair_is_combined(summarizer):
+    assert summarizer._extract_partial_summary('{"summary": "a \\ud83d\\ude00 b') == 'a 😀 b'
+    # The low half has not arrived yet
+    assert summarizer._extract_partial_summary('{"summary": "a \\ud83d\\ude') == 'a '
+
+
+def test_invalid_escapes_do_not_raise(summarizer):
+    assert summarizer._extract_partial_summary('{"summary": "ok \\uZZZZ rest"}') == 'ok '
+    assert summarizer._extract_partial_summary('{"summary": "x \\ude00 y"}') == 'x � y'
+    assert summarizer._extract_partial_summary('{"summary": "x \\ud83d y"}') == 'x � y'
@@ -0,0 +1,108 @@
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, List, Optional
+
+from metrics import METRICS
+
+# Usage of the row currently being processed; set per row so concurrent rows don't mix their numbers
+current_row_usage: ContextVar[Optional[Dict]] = ContextVar('current_row_usage', default=None)
+
+# `AI_Status` of a row whose AI tasks were skipped because the job budget ran out
+BUDGET_SKIPPED = 'Dilewati (budget habis)'
+
+
+class BudgetExhausted(RuntimeError):
+    """Raised instead of an AI call once the job budget is used up; `task` is the call that was refused"""
+
+    def __init__(self, task: str):
+        super().__init__(f"Budget AI habis sebelum {task}")
+        self.task = task
+
+
+def _usage_value(usage, name: str) -> int:
+    if usage is None:
+        return 0
+    value = usage.get(name) if isinstance(usage, dict) else getattr(usage, name, None)
+    return int(value or 0)
+
+
+class UsageTracker:
+    """
+    Token and cost accounting for one job, aggregated per task and per model.
+    A budget (cost and/or tokens) stops new AI calls once it is used up.
+    """
+
+    def __init__(self, model_router, max_cost_usd: float = 0.0, max_tokens: int = 0):
+        self.model_router = model_router
+        self.max_cost_usd = max_cost_usd or 0.0
+        self.max_tokens = max_tokens or 0
+        self._lock = threading.Lock()
+        self._by_key: Dict[tuple, Dict] = {}
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self.cost = 0.0
+        self.calls = 0
+
+    def record(self, task: str, model: str, usage) -> Dict:
+        """Record `response.usage` of one call; returns the tokens and cost attributed to it"""
+        input_tokens = _usage_value(usage, 'prompt_tokens')
+        output_tokens = _usage_value(usage, 'completion_tokens')
+        tier = self.model_router.tier_for_model(model)
+        cost = self.model_router.estimate_cost(tier, input_tokens, output_tokens)
+        entry = {'input_tokens': input_tokens, 'output_tokens': output_tokens, 'cost': cost}
+
+        with self._lock:
+            totals = self._by_key.setdefault((task, model), {'calls': 0, 'input_tokens': 0, 'output_tokens': 0, 'cost': 0.0})
+            totals['calls'] += 1
+            totals['input_tokens'] += input_tokens
+            totals['output_tokens'] += output_tokens
+            totals['cost'] += cost
+            self.calls += 1
+            self.input_tokens += input_tokens
+            self.output_tokens += output_tokens
+            self.cost += cost
+        METRICS.inc('llm_tokens_total', input_tokens, task=task, direction='input')
+        METRICS.inc('llm_tokens_total', output_tokens, task=task, direction='output')
+
+        row_usage = current_row_usage.get()
+        if row_usage is not None:
+            for key, value in entry.items():
+                row_usage[key] = row_usage.get(key, 0) + value
+        return entry
+
+    @contextmanager
+    def row_scope(self):
+        """Collect the usage of every call made inside the block into a per-row dict"""
+        row_usage = {'input_tokens': 0, 'output_tokens': 0, 'cost': 0.0}
+        token = current_row_usage.set(row_usage)
+        try:
+            yield row_usage
+        finally:
+            current_row_usage.reset(token)
+
+    def budget_exhausted(self) -> bool:
+        with self._lock:
+            if self.max_cost_usd and self.cost >= self.max_cost_usd:
+                return True
+            if self.max_tokens and self.input_tokens + self.output_tokens >= self.max_tokens:
+                return True
+        return False
+
+    def progress_text(self) -> str:
+        with self._lock:
+            text = f"🔢 {self.input_tokens + self.output_tokens:,} token | 💲{self.cost:.4f}"
+            if self.max_cost_usd:
+                text += f" / {self.max_cost_usd:.2f}"
+        return text
+
+    def summary(self) -> List[Dict]:
+        with self._lock:
+            return [{
+                'Tugas': task,
+                'Model': model,
+                'Panggilan': totals['calls'],
+                'Token Input': totals['input_tokens'],
+                'Token Output': totals['output_tokens'],
+                'Biaya (USD)': round(totals['cost'], 5)
+            } for (task, model), totals in sorted(self._by_key.items())]